@@ -1,8 +1,11 @@
-from flask import Flask, render_template, redirect, url_for, flash, session
+from flask import Flask, render_template, redirect, url_for, flash, session, request, Response, abort
 from flask_wtf.csrf import CSRFProtect
+from jinja2 import FileSystemBytecodeCache
 import os
+import tempfile
+import hmac
 from dotenv import load_dotenv
-from asgiref.wsgi import WsgiToAsgi
+from a2wsgi import WSGIMiddleware
 
 # Load environment variables
 load_dotenv()
@@ -10,6 +13,9 @@ load_dotenv()
 # Import blueprints
 from routes.auth import auth_bp
 from routes.ideas import ideas_bp
+from routes.assets import assets_bp
+from services.metrics import render_metrics
+from services.workflow_registry import prewarm_workflow
 
 
 app = Flask(__name__)
@@ -20,12 +26,19 @@ app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 16777216)
 app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
 app.config['WTF_CSRF_ENABLED'] = os.getenv('WTF_CSRF_ENABLED', 'True').lower() == 'true'
     
+    # Compiled templates persist on disk, so fresh workers skip recompiling them
+if os.getenv('JINJA_BYTECODE_CACHE_ENABLED', 'True').lower() == 'true':
+    bytecode_cache_dir = os.getenv('JINJA_BYTECODE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'idea-jinja-cache')
+    os.makedirs(bytecode_cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    
     # Initialize CSRF protection
 csrf = CSRFProtect(app)
     
     # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
 app.register_blueprint(ideas_bp, url_prefix='/ideas')
+app.register_blueprint(assets_bp, url_prefix='/assets')
     
     # Main routes
 @app.route('/')
@@ -40,14 +53,29 @@ def dashboard():
         return redirect(url_for('auth.login'))
     return redirect(url_for('ideas.dashboard'))
     
+@app.route('/metrics')
+def metrics():
+    # Prometheus scrape endpoint; set METRICS_TOKEN to require a bearer token
+    token = os.getenv('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+    
     # Create upload folder if it doesn't exist
 upload_folder = app.config['UPLOAD_FOLDER']
 if not os.path.exists(upload_folder):
     os.makedirs(upload_folder)
 
 
-# ASGI wrapper so Uvicorn can serve this Flask app: `uvicorn app:asgi_app`
-asgi_app = WsgiToAsgi(app)
+# Opt-in: build the workflow on a background thread right after startup instead of on first use
+if os.getenv('WORKFLOW_PREWARM', 'False').lower() == 'true':
+    prewarm_workflow()
+
+
+# ASGI wrapper so Uvicorn can serve this Flask app: `uvicorn app:asgi_app`.
+# Each request runs on one of WSGI_THREADS pool threads, so a worker serves that many at once.
+asgi_app = WSGIMiddleware(app, workers=int(os.getenv('WSGI_THREADS', 32)))
 
 
 if __name__ == '__main__':
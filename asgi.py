@@ -1,5 +1,3 @@
-from asgiref.wsgi import WsgiToAsgi
-from app import app
+from app import asgi_app
 
-# Wrap the Flask WSGI app so it can run under ASGI servers like Uvicorn
-asgi_app = WsgiToAsgi(app)
+# Uvicorn entry point kept for `uvicorn asgi:asgi_app`; the thread-pool bridge is configured in app.py
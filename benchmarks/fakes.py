@@ -0,0 +1,163 @@
+"""In-process stand-ins for the paid/remote services, for load benchmarks.
+
+Each fake sleeps for a configurable latency (plus jitter) instead of doing
+network I/O, so the app's own overhead and concurrency behaviour can be
+measured without API keys or spend.
+"""
+import time
+import random
+import hashlib
+from typing import Optional, List, Dict, Any
+from langchain_core.messages import AIMessageChunk
+from services.ai_workflow import BusinessIdeasResponse
+from storage.base import StorageBackend
+
+
+class LatencyProfile:
+    """Mean latency in seconds with +/- `jitter` fraction of uniform noise"""
+
+    def __init__(self, mean: float, jitter: float = 0.2):
+        self.mean = mean
+        self.jitter = jitter
+
+    def sample(self) -> float:
+        if self.mean <= 0:
+            return 0.0
+        return max(0.0, self.mean * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def sleep(self) -> None:
+        time.sleep(self.sample())
+
+
+def fake_ideas(prompt: str) -> BusinessIdeasResponse:
+    """Three deterministic, realistically sized ideas derived from the prompt"""
+    seed = hashlib.sha1(prompt.encode()).hexdigest()[:6]
+    return BusinessIdeasResponse.model_validate({'ideas': [{
+        'name': f'Venture {seed}-{i}',
+        'pitch': ('A focused product that removes a costly manual step for a clearly defined '
+                  'customer segment, sold through a low-touch self-serve funnel. ') * 3,
+        'audience': 'Small and mid-sized businesses in the target niche',
+        'revenue_model': 'Tiered monthly subscription with usage-based add-ons'
+    } for i in range(1, 4)]})
+
+
+class _FakeStructuredLLM:
+    def __init__(self, latency: LatencyProfile):
+        self.latency = latency
+
+    def invoke(self, prompt, *args, **kwargs) -> BusinessIdeasResponse:
+        self.latency.sleep()
+        return fake_ideas(str(prompt))
+
+
+class _FakeToolStreamingLLM:
+    """Streams the ideas as tool-call argument chunks, like a forced OpenAI tool call"""
+
+    def __init__(self, latency: LatencyProfile, chunks: int = 20):
+        self.latency = latency
+        self.chunks = chunks
+
+    def stream(self, prompt, *args, **kwargs):
+        arguments = fake_ideas(str(prompt)).model_dump_json()
+        step = max(1, len(arguments) // self.chunks)
+        delay = self.latency.sample() / self.chunks
+        for start in range(0, len(arguments), step):
+            time.sleep(delay)
+            yield AIMessageChunk(content='', tool_call_chunks=[{
+                'name': 'BusinessIdeasResponse' if start == 0 else None,
+                'args': arguments[start:start + step],
+                'id': None,
+                'index': 0
+            }])
+
+
+class FakeChatOpenAI:
+    """Drop-in for langchain_openai.ChatOpenAI as used by BusinessIdeaWorkflow"""
+
+    latency = LatencyProfile(1.0)
+
+    def __init__(self, *args, **kwargs):
+        self.model_name = kwargs.get('model', 'fake')
+
+    def with_structured_output(self, schema, **kwargs):
+        return _FakeStructuredLLM(self.latency)
+
+    def bind_tools(self, tools, **kwargs):
+        return _FakeToolStreamingLLM(self.latency)
+
+
+class FakeTavilySearchAPIWrapper:
+    """Drop-in for TavilySearchAPIWrapper's results()"""
+
+    latency = LatencyProfile(0.5)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @staticmethod
+    def _results(query: str, max_results: int) -> List[Dict[str, str]]:
+        return [{
+            'title': f'{query} - market report {i}',
+            'url': f'https://example.com/report/{i}',
+            'content': 'Analysts expect steady growth driven by automation and new regulation. ' * 6
+        } for i in range(max_results)]
+
+    def results(self, query: str, max_results: int = 5, **kwargs) -> List[Dict[str, str]]:
+        self.latency.sleep()
+        return self._results(query, max_results)
+
+
+class LatencyBackend(StorageBackend):
+    """Wraps a storage backend and adds a simulated round trip to every call.
+
+    Around the in-memory SQLite backend this stands in for Supabase's
+    PostgREST API: same rows and query shapes, with HTTP-like latency.
+    """
+
+    def __init__(self, backend: StorageBackend, latency: LatencyProfile):
+        self.backend = backend
+        self.latency = latency
+        self.name = f'{backend.name}+latency'
+
+    def _call(self, method: str, *args, **kwargs):
+        self.latency.sleep()
+        return getattr(self.backend, method)(*args, **kwargs)
+
+    def create_user(self, email: str, password_hash: str, created_at: str) -> Optional[Dict[str, Any]]:
+        return self._call('create_user', email, password_hash, created_at)
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._call('get_user_by_email', email)
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._call('get_user_by_id', user_id)
+
+    def update_user_password_hash(self, user_id: int, password_hash: str, updated_at: str) -> bool:
+        return self._call('update_user_password_hash', user_id, password_hash, updated_at)
+
+    def insert_ideas(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._call('insert_ideas', rows)
+
+    def get_ideas_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        return self._call('get_ideas_by_user', user_id, limit)
+
+    def get_idea_summaries_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        return self._call('get_idea_summaries_by_user', user_id, limit)
+
+    def get_ideas_page(self, user_id: int, limit: int, before=None, after=None) -> List[Dict[str, Any]]:
+        return self._call('get_ideas_page', user_id, limit, before=before, after=after)
+
+    def get_idea_by_id(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        return self._call('get_idea_by_id', idea_id)
+
+    def get_idea_version(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        return self._call('get_idea_version', idea_id)
+
+    def get_latest_idea_version(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._call('get_latest_idea_version', user_id)
+
+    def search_ideas(self, user_id: int, query: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        return self._call('search_ideas', user_id, query, limit, offset)
+
+    def close(self) -> None:
+        self.backend.close()
@@ -0,0 +1,322 @@
+"""End-to-end load and latency benchmark with local fakes.
+
+Starts app:asgi_app under uvicorn in this process with fake OpenAI, Tavily
+and database backends (see benchmarks/fakes.py), then drives a weighted mix
+of login, dashboard, history, view, search and generate requests at rising
+concurrency. Reports throughput and p50/p95/p99 latency per route.
+
+Usage:
+    python -m benchmarks.load_benchmark --concurrency 1 8 32 --duration 15
+    python -m benchmarks.load_benchmark --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_benchmark --baseline benchmarks/baseline.json --tolerance 0.2
+
+With --baseline the run exits non-zero when any route's p95 latency grows,
+or its throughput drops, by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+from typing import Dict, List, Tuple
+
+DEFAULT_MIX = 'login=1,dashboard=4,history=3,view=3,search=2,generate=1,generate_stream=1'
+PASSWORD = 'benchmark-password'
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        route, _, weight = part.partition('=')
+        mix[route.strip()] = float(weight or 1)
+    unknown = set(mix) - set(ROUTES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown routes in mix: {', '.join(sorted(unknown))}")
+    return {route: weight for route, weight in mix.items() if weight > 0}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def configure_environment(args) -> None:
+    """Environment the app must see before it is imported"""
+    state_dir = tempfile.mkdtemp(prefix='idea-bench-')
+    os.environ.update({
+        'OPENAI_API_KEY': 'benchmark-fake',
+        'TAVILY_API_KEY': 'benchmark-fake',
+        'WTF_CSRF_ENABLED': 'False',
+        'FLASK_DEBUG': 'False',
+        'SECRET_KEY': 'benchmark',
+        'IDEA_CACHE_ENABLED': 'True' if args.cache else 'False',
+        'ADMISSION_ENABLED': 'True' if args.admission else 'False',
+        'SEARCH_CACHE_PATH': os.path.join(state_dir, 'search.sqlite3'),
+        'ADMISSION_PATH': os.path.join(state_dir, 'admission.sqlite3'),
+        'COALESCE_PATH': os.path.join(state_dir, 'inflight.sqlite3'),
+        'JOB_QUEUE_PATH': os.path.join(state_dir, 'jobs.sqlite3'),
+    })
+    if args.storage == 'fake':
+        os.environ['STORAGE_BACKEND'] = 'sqlite'
+
+
+def install_fakes(args) -> None:
+    """Swap the remote services for the in-process fakes"""
+    import services.ai_workflow
+    import services.web_search
+    from benchmarks import fakes
+
+    fakes.FakeChatOpenAI.latency = fakes.LatencyProfile(args.llm_latency)
+    fakes.FakeTavilySearchAPIWrapper.latency = fakes.LatencyProfile(args.search_latency)
+    services.ai_workflow.ChatOpenAI = fakes.FakeChatOpenAI
+    services.web_search.TavilySearchAPIWrapper = fakes.FakeTavilySearchAPIWrapper
+
+    if args.storage == 'fake':
+        from storage import set_storage
+        from storage.sqlite_backend import SQLiteBackend
+        set_storage(fakes.LatencyBackend(SQLiteBackend(), fakes.LatencyProfile(args.db_latency)))
+
+
+def seed(users: int, ideas_per_user: int) -> List[Dict]:
+    """Create benchmark users with some idea history; returns [{email, idea_ids}]"""
+    from datetime import datetime, timedelta
+    from werkzeug.security import generate_password_hash
+    from storage import get_storage
+    from benchmarks.fakes import fake_ideas
+
+    storage = get_storage()
+    password_hash = generate_password_hash(PASSWORD, os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256'))
+    run_id = f'{int(time.time())}{random.randint(0, 999):03d}'
+    start = datetime.now() - timedelta(days=ideas_per_user)
+    accounts = []
+    for n in range(users):
+        email = f'bench-{run_id}-{n}@example.com'
+        user = storage.create_user(email, password_hash, start.isoformat())
+        rows = [{
+            'user_id': user['id'],
+            'niche': f'niche {i} for user {n}',
+            'ideas': [idea.model_dump() for idea in fake_ideas(f'{n}-{i}').ideas],
+            'web_search_used': i % 3 == 0,
+            'created_at': (start + timedelta(days=i)).isoformat()
+        } for i in range(ideas_per_user)]
+        inserted = storage.insert_ideas(rows) if rows else []
+        accounts.append({'email': email, 'idea_ids': [row['id'] for row in inserted]})
+    return accounts
+
+
+class _ThreadedServer:
+    """uvicorn server running on a background thread"""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        class Server(uvicorn.Server):
+            def install_signal_handlers(self):
+                pass
+
+        self.server = Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning',
+                                            access_log=False, lifespan='off'))
+        self.thread = threading.Thread(target=self.server.run, name='benchmark-uvicorn', daemon=True)
+
+    def start(self, timeout: float = 10) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+# Route drivers: each sends one request and returns whether it succeeded
+async def _login(client, account, rng):
+    response = await client.post('/auth/login', data={'email': account['email'], 'password': PASSWORD})
+    return response.status_code == 302
+
+
+async def _dashboard(client, account, rng):
+    return (await client.get('/ideas/dashboard')).status_code == 200
+
+
+async def _history(client, account, rng):
+    return (await client.get('/ideas/history')).status_code == 200
+
+
+async def _view(client, account, rng):
+    if not account['idea_ids']:
+        return (await client.get('/ideas/history')).status_code == 200
+    return (await client.get(f"/ideas/view/{rng.choice(account['idea_ids'])}")).status_code == 200
+
+
+async def _search(client, account, rng):
+    query = rng.choice(['niche', 'venture', 'subscription', 'small business', 'niche 1'])
+    return (await client.get('/ideas/search', params={'q': query})).status_code == 200
+
+
+def _generate_form(rng):
+    form = {'niche': f'benchmark niche {rng.randint(0, 10 ** 9)}'}
+    if rng.random() < 0.3:
+        form['web_search'] = 'on'
+    return form
+
+
+async def _generate(client, account, rng):
+    return (await client.post('/ideas/generate', data=_generate_form(rng))).status_code == 200
+
+
+async def _generate_stream(client, account, rng):
+    async with client.stream('POST', '/ideas/generate/stream', data=_generate_form(rng)) as response:
+        body = b''.join([chunk async for chunk in response.aiter_bytes()])
+    return response.status_code == 200 and b'event: done' in body
+
+
+ROUTES = {
+    'login': _login,
+    'dashboard': _dashboard,
+    'history': _history,
+    'view': _view,
+    'search': _search,
+    'generate': _generate,
+    'generate_stream': _generate_stream,
+}
+
+
+async def run_level(base_url: str, accounts: List[Dict], concurrency: int, duration: float,
+                    mix: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """Run `concurrency` virtual users for `duration` seconds; returns stats per route"""
+    import httpx
+
+    routes, weights = list(mix), list(mix.values())
+    samples: Dict[str, List[float]] = {route: [] for route in routes}
+    errors: Dict[str, int] = {route: 0 for route in routes}
+    deadline = time.monotonic() + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(index)
+        account = accounts[index % len(accounts)]
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            await _login(client, account, rng)
+            while time.monotonic() < deadline:
+                route = rng.choices(routes, weights)[0]
+                start = time.perf_counter()
+                try:
+                    ok = await ROUTES[route](client, account, rng)
+                except httpx.HTTPError:
+                    ok = False
+                samples[route].append((time.perf_counter() - start) * 1000)
+                if not ok:
+                    errors[route] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    return {route: {
+        'requests': len(samples[route]),
+        'errors': errors[route],
+        'throughput': round(len(samples[route]) / elapsed, 2),
+        'p50': round(percentile(samples[route], 50), 1),
+        'p95': round(percentile(samples[route], 95), 1),
+        'p99': round(percentile(samples[route], 99), 1),
+    } for route in routes if samples[route]}
+
+
+def print_report(report: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    print(f"{'conc':>5} {'route':<16} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for level, routes in report.items():
+        for route, stats in routes.items():
+            print(f"{level:>5} {route:<16} {stats['requests']:>7} {stats['errors']:>7} {stats['throughput']:>8.2f} "
+                  f"{stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[Tuple[str, str, str]]:
+    """Regressions against a saved baseline as (level, route, description)"""
+    regressions = []
+    for level, routes in baseline.get('results', {}).items():
+        for route, before in routes.items():
+            after = report.get(level, {}).get(route)
+            if after is None:
+                continue
+            if before['p95'] > 0 and after['p95'] > before['p95'] * (1 + tolerance):
+                regressions.append((level, route, f"p95 {before['p95']:.1f} -> {after['p95']:.1f} ms"))
+            if before['throughput'] > 0 and after['throughput'] < before['throughput'] * (1 - tolerance):
+                regressions.append((level, route, f"throughput {before['throughput']:.2f} -> {after['throughput']:.2f} req/s"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app against local fakes of OpenAI, Tavily and the database.")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64], help="Virtual users per level")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help=f"Route weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--users', type=int, default=20, help="Seeded accounts")
+    parser.add_argument('--ideas-per-user', type=int, default=30, help="Seeded history rows per account")
+    parser.add_argument('--llm-latency', type=float, default=1.0, help="Fake OpenAI latency in seconds")
+    parser.add_argument('--search-latency', type=float, default=0.5, help="Fake Tavily latency in seconds")
+    parser.add_argument('--db-latency', type=float, default=0.02, help="Fake database round trip in seconds")
+    parser.add_argument('--storage', choices=['fake', 'env'], default='fake',
+                        help="'fake': in-memory SQLite with --db-latency; 'env': the backend configured by STORAGE_BACKEND")
+    parser.add_argument('--cache', action='store_true', help="Keep the idea result cache enabled")
+    parser.add_argument('--admission', action='store_true',
+                        help="Keep admission control enabled (generate routes may answer 429/503)")
+    parser.add_argument('--save-baseline', help="Write the report to this JSON file")
+    parser.add_argument('--baseline', help="Compare against this saved report")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    install_fakes(args)
+    from app import asgi_app
+
+    accounts = seed(args.users, args.ideas_per_user)
+    port = free_port()
+    server = _ThreadedServer(asgi_app, port)
+    server.start()
+
+    report = {}
+    try:
+        for level in args.concurrency:
+            print(f"Running {level} virtual users for {args.duration:g}s...", file=sys.stderr)
+            report[str(level)] = asyncio.run(
+                run_level(f'http://127.0.0.1:{port}', accounts, level, args.duration, args.mix)
+            )
+    finally:
+        server.stop()
+
+    print_report(report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': {key: value for key, value in vars(args).items()
+                                  if key not in ('save_baseline', 'baseline')},
+                       'results': report}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for level, route, description in regressions:
+            print(f"REGRESSION at concurrency {level}, {route}: {description}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Worker startup time: import cost per module and time to first response.
+
+Usage:
+    python -m benchmarks.startup_benchmark --profile --top 25
+    python -m benchmarks.startup_benchmark --runs 10 --save-baseline startup.json
+    python -m benchmarks.startup_benchmark --runs 10 --baseline startup.json --tolerance 0.2
+
+Each run starts a fresh interpreter, the way a uvicorn worker does, imports
+app and serves GET /auth/login through the test client, with the app's
+default settings (WORKFLOW_PREWARM is inherited, not forced off). --profile runs
+`python -X importtime` instead and lists the most expensive modules and
+top-level packages.
+
+The run exits non-zero when a module that should load lazily (the AI
+workflow, LangChain/LangGraph, database clients) is imported at startup, or,
+with --baseline, when the median import or first-response time grows by
+more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import statistics
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported until the first generation or database call
+LAZY_MODULES = ('services.ai_workflow', 'langgraph', 'langchain_openai', 'langchain_community',
+                'langchain_core', 'supabase', 'psycopg2')
+
+CHILD = r'''
+import sys, json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/auth/login')
+finished = time.perf_counter()
+print(json.dumps({'import': imported - started, 'first_response': finished - started,
+                  'status': response.status_code, 'modules': sorted(sys.modules)}))
+'''
+
+METRICS = ('process', 'import', 'first_response')
+
+
+def child_environment(cache_dir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        'FLASK_DEBUG': 'False',
+        'SECRET_KEY': 'benchmark',
+        'STORAGE_BACKEND': 'sqlite',
+        'SQLITE_DATABASE_PATH': ':memory:',
+        'JINJA_BYTECODE_CACHE_DIR': cache_dir,
+        'UPLOAD_FOLDER': os.path.join(cache_dir, 'uploads'),
+    })
+    return env
+
+
+def run_once(env: Dict[str, str]) -> Dict:
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env,
+                               capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if result['status'] >= 500:
+        raise RuntimeError(f"GET /auth/login returned {result['status']}")
+    result['process'] = elapsed
+    return result
+
+
+def eager_imports(modules: List[str]) -> List[str]:
+    return sorted(name for name in modules
+                  if any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) from `python -X importtime` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile(env: Dict[str, str], top: int) -> None:
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT, env=env,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{completed.stderr}")
+    rows = parse_importtime(completed.stderr)
+    total = sum(self_us for _, self_us, _ in rows)
+
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split('.')[0]] += self_us
+
+    print(f"Importing app loads {len(rows)} modules in {total / 1000:.1f} ms\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    print(f"\n{'self ms':>14} {'share':>9}  top-level package")
+    for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:>14.1f} {self_us / total:>9.1%}  {name}")
+
+
+def summarize(runs: List[Dict]) -> Dict[str, Dict[str, float]]:
+    report = {}
+    for metric in METRICS:
+        samples = sorted(run[metric] * 1000 for run in runs)
+        report[metric] = {'median_ms': statistics.median(samples), 'min_ms': samples[0], 'max_ms': samples[-1]}
+    return report
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for metric in ('import', 'first_response'):
+        before = baseline['results'].get(metric, {}).get('median_ms')
+        after = report[metric]['median_ms']
+        if before and after > before * (1 + tolerance):
+            regressions.append(f"{metric} median {before:.1f} ms -> {after:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker startup: import cost and time to first response.")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument('--warmup', type=int, default=1,
+                        help="Untimed runs first, so .pyc and Jinja bytecode caches are warm")
+    parser.add_argument('--profile', action='store_true', help="Report per-module import cost instead")
+    parser.add_argument('--top', type=int, default=20, help="Rows to show with --profile")
+    parser.add_argument('--save-baseline', help="Write the report to this JSON file")
+    parser.add_argument('--baseline', help="Compare against this saved report")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    env = child_environment(tempfile.mkdtemp(prefix='idea-startup-'))
+    if args.profile:
+        profile(env, args.top)
+        return
+
+    for _ in range(args.warmup):
+        run_once(env)
+    runs = [run_once(env) for _ in range(args.runs)]
+    report = summarize(runs)
+
+    print(f"{'':<16} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+    for metric in METRICS:
+        stats = report[metric]
+        print(f"{metric:<16} {stats['median_ms']:>10.1f} {stats['min_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+
+    failed = False
+    eager = eager_imports(runs[-1]['modules'])
+    if eager:
+        print(f"EAGER IMPORTS at startup: {', '.join(eager)}")
+        failed = True
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': {'runs': args.runs, 'warmup': args.warmup}, 'results': report}, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for description in regressions:
+            print(f"REGRESSION: {description}")
+        failed = failed or bool(regressions)
+        if not regressions:
+            print("No regressions against baseline.", file=sys.stderr)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
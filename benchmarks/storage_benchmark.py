@@ -0,0 +1,91 @@
+"""Compare storage backends on the queries the app runs most.
+
+Usage:
+    python -m benchmarks.storage_benchmark --backends sqlite postgres supabase
+
+Each backend gets a throwaway user with --rows idea rows, then every
+operation is timed --iterations times. Rows are inserted through the
+backend directly, so they are left in place for supabase/postgres; point
+those at a scratch database.
+"""
+import time
+import uuid
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+SAMPLE_IDEAS = [
+    {'name': f'Idea {i}', 'pitch': 'A short pitch ' * 10, 'target_audience': 'Everyone',
+     'revenue_model': 'Subscription', 'key_features': ['One', 'Two', 'Three']}
+    for i in range(5)
+]
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _time(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def benchmark_backend(backend, rows: int, iterations: int, batch_size: int):
+    """Time the common operations against one backend; returns {operation: samples_ms}"""
+    now = datetime.now()
+    user = backend.create_user(f'bench-{uuid.uuid4().hex[:12]}@example.com', 'x', now.isoformat())
+    user_id = user['id']
+
+    def make_rows(count, offset=0):
+        return [{'user_id': user_id, 'niche': f'niche {offset + i}', 'ideas': SAMPLE_IDEAS,
+                 'web_search_used': False, 'created_at': (now + timedelta(seconds=offset + i)).isoformat()}
+                for i in range(count)]
+
+    results = {}
+    results[f'insert_ideas x{batch_size}'] = _time(lambda: backend.insert_ideas(make_rows(batch_size)), max(1, rows // batch_size))
+    seeded = backend.get_ideas_by_user(user_id, 1)
+    first = seeded[0]
+
+    results['insert_ideas x1'] = _time(lambda: backend.insert_ideas(make_rows(1, rows)), iterations)
+    results['get_user_by_id'] = _time(lambda: backend.get_user_by_id(user_id), iterations)
+    results['get_user_by_email'] = _time(lambda: backend.get_user_by_email(user['email']), iterations)
+    results['get_idea_summaries_by_user'] = _time(lambda: backend.get_idea_summaries_by_user(user_id, 10), iterations)
+    results['get_ideas_page'] = _time(lambda: backend.get_ideas_page(user_id, 6), iterations)
+    results['get_ideas_page before'] = _time(
+        lambda: backend.get_ideas_page(user_id, 6, before=(first['created_at'], first['id'])), iterations
+    )
+    results['get_idea_by_id'] = _time(lambda: backend.get_idea_by_id(first['id']), iterations)
+    return results
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Benchmark storage backends against each other.")
+    parser.add_argument('--backends', nargs='+', default=['sqlite'], choices=['sqlite', 'postgres', 'supabase'])
+    parser.add_argument('--rows', type=int, default=200, help="Idea rows to seed per backend")
+    parser.add_argument('--iterations', type=int, default=100, help="Timed calls per operation")
+    parser.add_argument('--batch-size', type=int, default=25, help="Rows per multi-row insert while seeding")
+    args = parser.parse_args()
+
+    from storage import create_backend
+
+    print(f"{'backend':<10} {'operation':<30} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name in args.backends:
+        backend = create_backend(name)
+        try:
+            for operation, samples in benchmark_backend(backend, args.rows, args.iterations, args.batch_size).items():
+                print(f"{name:<10} {operation:<30} {statistics.mean(samples):>9.2f} "
+                      f"{_percentile(samples, 50):>9.2f} {_percentile(samples, 95):>9.2f}")
+        finally:
+            backend.close()
+
+
+if __name__ == '__main__':
+    main()
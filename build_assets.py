@@ -0,0 +1,20 @@
+import os
+import argparse
+from services.assets import build_assets, ASSET_SOURCES
+
+
+def main():
+    """Minify, fingerprint and precompress static assets into static/dist (run at deploy/image build)."""
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets.")
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'),
+                        help="Static folder containing the sources")
+    parser.add_argument('sources', nargs='*', default=list(ASSET_SOURCES),
+                        help="Files relative to the static folder (default: %(default)s)")
+    args = parser.parse_args()
+
+    manifest = build_assets(args.static, args.sources)
+    print(f"Wrote {len(manifest)} assets to {os.path.join(args.static, 'dist')}")
+
+
+if __name__ == '__main__':
+    main()
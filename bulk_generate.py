@@ -0,0 +1,49 @@
+import os
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+
+
+def main():
+    """Generate ideas for a list or CSV of niches, writing NDJSON results to stdout."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Generate business ideas for many niches at once.")
+    parser.add_argument('input', help="CSV or text file with one niche per line ('-' for stdin)")
+    parser.add_argument('--web-search', action='store_true', help="Enhance ideas with web search")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('BULK_MAX_CONCURRENCY', 8)),
+                        help="Number of niches generated in parallel")
+    parser.add_argument('--rpm', type=float, default=float(os.getenv('BULK_REQUESTS_PER_MINUTE', 60)),
+                        help="Global limit on workflow runs per minute")
+    parser.add_argument('--user-id', type=int, help="Save results for this user (omit to only print them)")
+    parser.add_argument('--batch-size', type=int, default=25, help="Rows per database insert")
+    args = parser.parse_args()
+
+    # Imported after load_dotenv so the database and LLM clients see the environment
+    from services.bulk_generation import generate_bulk, parse_niches
+
+    if args.input == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+    niches = parse_niches(text)
+    if not niches:
+        print("Error: no niches found in input.", file=sys.stderr)
+        sys.exit(1)
+
+    failed = 0
+    for row in generate_bulk(niches, web_search_enabled=args.web_search, concurrency=args.concurrency,
+                             requests_per_minute=args.rpm, user_id=args.user_id,
+                             batch_size=args.batch_size):
+        if row.get('error'):
+            failed += 1
+        print(json.dumps(row), flush=True)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,11 +20,38 @@ CREATE TABLE IF NOT EXISTS public.business_ideas (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Older rows were written with json.dumps(...), so ideas holds a JSON string
+-- rather than an array; unwrap those before deriving columns from it
+UPDATE public.business_ideas SET ideas = (ideas #>> '{}')::jsonb WHERE jsonb_typeof(ideas) = 'string';
+
+-- Summary columns for list pages, derived from the ideas JSONB when a row is written
+ALTER TABLE public.business_ideas
+    ADD COLUMN IF NOT EXISTS headline_name TEXT GENERATED ALWAYS AS (ideas->0->>'name') STORED,
+    ADD COLUMN IF NOT EXISTS headline_pitch TEXT GENERATED ALWAYS AS (LEFT(ideas->0->>'pitch', 200)) STORED,
+    ADD COLUMN IF NOT EXISTS idea_count INTEGER GENERATED ALWAYS AS (
+        CASE jsonb_typeof(ideas) WHEN 'array' THEN jsonb_array_length(ideas) ELSE 0 END
+    ) STORED;
+
+-- Full-text search over the niche and each idea's name, pitch, audience and revenue model
+-- (weights: niche and names A, pitches B, audience and revenue model C)
+ALTER TABLE public.business_ideas
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', niche), 'A') ||
+        setweight(to_tsvector('english', jsonb_path_query_array(ideas, '$[*].name')::text), 'A') ||
+        setweight(to_tsvector('english', jsonb_path_query_array(ideas, '$[*].pitch')::text), 'B') ||
+        setweight(to_tsvector('english', jsonb_path_query_array(ideas, '$[*].audience')::text || ' ' ||
+                                         jsonb_path_query_array(ideas, '$[*].revenue_model')::text), 'C')
+    ) STORED;
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON public.users(email);
 CREATE INDEX IF NOT EXISTS idx_business_ideas_user_id ON public.business_ideas(user_id);
 CREATE INDEX IF NOT EXISTS idx_business_ideas_created_at ON public.business_ideas(created_at DESC);
+-- Keyset pagination of a user's history: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+-- (id sorts in the same direction so one index serves both the order and the row-value cursor)
+CREATE INDEX IF NOT EXISTS idx_business_ideas_user_created_id ON public.business_ideas(user_id, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_business_ideas_niche ON public.business_ideas(niche);
+CREATE INDEX IF NOT EXISTS idx_business_ideas_search ON public.business_ideas USING GIN (search_vector);
 
 -- Enable Row Level Security (RLS) for better security
 ALTER TABLE public.users ENABLE ROW LEVEL SECURITY;
@@ -50,6 +77,23 @@ CREATE POLICY "Users can update their own ideas" ON public.business_ideas
 CREATE POLICY "Users can delete their own ideas" ON public.business_ideas
     FOR DELETE USING (auth.uid()::text = user_id::text);
 
+-- Ranked, paginated search of one user's ideas. p_query is a tsquery string
+-- built by the app (prefix terms joined with &, e.g. 'pet:* & food:*').
+CREATE OR REPLACE FUNCTION public.search_business_ideas(
+    p_user_id INTEGER, p_query TEXT, p_limit INTEGER DEFAULT 10, p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    id INTEGER, user_id INTEGER, niche VARCHAR, web_search_used BOOLEAN, created_at TIMESTAMP,
+    headline_name TEXT, headline_pitch TEXT, idea_count INTEGER, rank REAL
+) AS $$
+    SELECT b.id, b.user_id, b.niche, b.web_search_used, b.created_at,
+           b.headline_name, b.headline_pitch, b.idea_count, ts_rank(b.search_vector, q) AS rank
+    FROM public.business_ideas b, to_tsquery('english', p_query) q
+    WHERE b.user_id = p_user_id AND b.search_vector @@ q
+    ORDER BY rank DESC, b.created_at DESC, b.id DESC
+    LIMIT p_limit OFFSET p_offset
+$$ LANGUAGE sql STABLE;
+
 -- Create a function to update the updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -73,4 +117,8 @@ CREATE TRIGGER update_users_updated_at
 COMMENT ON TABLE public.users IS 'Stores user account information';
 COMMENT ON TABLE public.business_ideas IS 'Stores generated business ideas for each user';
 COMMENT ON COLUMN public.business_ideas.ideas IS 'JSONB array containing 3 business ideas with name, pitch, audience, and revenue_model';
+COMMENT ON COLUMN public.business_ideas.headline_name IS 'Name of the first idea, for list views (generated)';
+COMMENT ON COLUMN public.business_ideas.headline_pitch IS 'First 200 characters of the first idea''s pitch, for list views (generated)';
+COMMENT ON COLUMN public.business_ideas.idea_count IS 'Number of ideas in the ideas array (generated)';
 COMMENT ON COLUMN public.business_ideas.web_search_used IS 'Boolean flag indicating if web search was used during idea generation';
+COMMENT ON COLUMN public.business_ideas.search_vector IS 'Weighted full-text vector of the niche and idea fields, used by search_business_ideas (generated)';
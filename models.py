@@ -1,29 +1,10 @@
-from supabase import create_client, Client
-import os
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator
+import base64
 import json
-
-class Database:
-    def __init__(self):
-        self.url = os.getenv('SUPABASE_URL')
-        self.key = os.getenv('SUPABASE_KEY')
-        self.service_role_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        
-        if not self.url or not self.key or not self.service_role_key:
-            raise ValueError("SUPABASE_URL, SUPABASE_KEY, and SUPABASE_SERVICE_ROLE_KEY must be set in environment variables")
-        
-        self.client: Client = create_client(self.url, self.key)
-        self.service_client: Client = create_client(self.url, self.service_role_key)
-
-    def get_client(self) -> Client:
-        return self.client
-
-    def get_service_role_client(self) -> Client:
-        return self.service_client
-
-# Initialize database connection
-db = Database()
+from storage import get_storage
+from storage.base import SUMMARY_COLUMNS
+from services.metrics import timed_db_call
 
 class User:
     def __init__(self, id: int = None, email: str = None, password_hash: str = None, 
@@ -35,73 +16,94 @@ class User:
         self.updated_at = updated_at
     
     @staticmethod
+    def from_row(user_data: Dict[str, Any]) -> 'User':
+        """Build a User from a users row"""
+        return User(
+            id=user_data['id'],
+            email=user_data['email'],
+            password_hash=user_data['password_hash'],
+            created_at=user_data['created_at'],
+            updated_at=user_data['updated_at']
+        )
+    
+    @staticmethod
+    @timed_db_call
     def create(email: str, password_hash: str) -> Optional['User']:
         """Create a new user in the database"""
         try:
-            # Use service role client to bypass RLS for user creation
-            result = db.get_service_role_client().table('users').insert({
-                'email': email,
-                'password_hash': password_hash,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }).execute()
-            
-            if result.data:
-                user_data = result.data[0]
-                return User(
-                    id=user_data['id'],
-                    email=user_data['email'],
-                    password_hash=user_data['password_hash'],
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
-            return None
+            user_data = get_storage().create_user(email, password_hash, datetime.now().isoformat())
+            return User.from_row(user_data) if user_data else None
         except Exception as e:
             print(f"Error creating user: {e}")
             return None
     
     @staticmethod
+    @timed_db_call
     def get_by_email(email: str) -> Optional['User']:
         """Get user by email"""
         try:
-            # Use service role client to bypass RLS for checking user existence
-            result = db.get_service_role_client().table('users').select('*').eq('email', email).execute()
-            
-            if result.data:
-                user_data = result.data[0]
-                return User(
-                    id=user_data['id'],
-                    email=user_data['email'],
-                    password_hash=user_data['password_hash'],
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
-            return None
+            user_data = get_storage().get_user_by_email(email)
+            return User.from_row(user_data) if user_data else None
         except Exception as e:
             print(f"Error getting user by email: {e}")
             return None
     
     @staticmethod
+    @timed_db_call
     def get_by_id(user_id: int) -> Optional['User']:
         """Get user by ID"""
         try:
-            # Use service role client to bypass RLS for user lookups
-            result = db.get_service_role_client().table('users').select('*').eq('id', user_id).execute()
-            
-            if result.data:
-                user_data = result.data[0]
-                return User(
-                    id=user_data['id'],
-                    email=user_data['email'],
-                    password_hash=user_data['password_hash'],
-                    created_at=user_data['created_at'],
-                    updated_at=user_data['updated_at']
-                )
-            return None
+            user_data = get_storage().get_user_by_id(user_id)
+            return User.from_row(user_data) if user_data else None
         except Exception as e:
             print(f"Error getting user by ID: {e}")
             return None
 
+    @staticmethod
+    @timed_db_call
+    def update_password_hash(user_id: int, password_hash: str) -> bool:
+        """Replace a user's stored password hash"""
+        try:
+            return get_storage().update_user_password_hash(user_id, password_hash, datetime.now().isoformat())
+        except Exception as e:
+            print(f"Error updating password hash: {e}")
+            return False
+
+class BusinessIdeaSummary:
+    """Lightweight view of a business_ideas row for list pages
+    Carries only the headline (first idea's name and truncated pitch) and the
+    idea count, which the database derives from the ideas JSONB on insert."""
+    
+    COLUMNS = ','.join(SUMMARY_COLUMNS)
+    
+    def __init__(self, id: int = None, user_id: int = None, niche: str = None,
+                 web_search_used: bool = False, created_at: datetime = None,
+                 headline_name: str = None, headline_pitch: str = None, idea_count: int = 0,
+                 rank: float = None):
+        self.id = id
+        self.user_id = user_id
+        self.niche = niche
+        self.web_search_used = web_search_used
+        self.created_at = created_at
+        self.headline_name = headline_name
+        self.headline_pitch = headline_pitch
+        self.idea_count = idea_count or 0
+        self.rank = rank
+    
+    @staticmethod
+    def from_row(row: Dict[str, Any]) -> 'BusinessIdeaSummary':
+        return BusinessIdeaSummary(
+            id=row['id'],
+            user_id=row['user_id'],
+            niche=row['niche'],
+            web_search_used=row['web_search_used'],
+            created_at=row['created_at'],
+            headline_name=row.get('headline_name'),
+            headline_pitch=row.get('headline_pitch'),
+            idea_count=row.get('idea_count'),
+            rank=row.get('rank')
+        )
+
 class BusinessIdea:
     def __init__(self, id: int = None, user_id: int = None, niche: str = None,
                  ideas: List[Dict[str, Any]] = None, web_search_used: bool = False,
@@ -114,72 +116,188 @@ class BusinessIdea:
         self.created_at = created_at
     
     @staticmethod
+    def from_row(idea_data: Dict[str, Any]) -> 'BusinessIdea':
+        """Build a BusinessIdea from a business_ideas row"""
+        return BusinessIdea(
+            id=idea_data['id'],
+            user_id=idea_data['user_id'],
+            niche=idea_data['niche'],
+            ideas=json.loads(idea_data['ideas']) if isinstance(idea_data['ideas'], str) else idea_data['ideas'],
+            web_search_used=idea_data['web_search_used'],
+            created_at=idea_data['created_at']
+        )
+    
+    @property
+    def cursor(self) -> str:
+        """Opaque keyset cursor for this row's (created_at, id) position"""
+        return BusinessIdea.encode_cursor(self.created_at, self.id)
+    
+    @staticmethod
+    def encode_cursor(created_at: str, idea_id: int) -> str:
+        raw = json.dumps([created_at, idea_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+        """Decode a cursor from encode_cursor; returns None if it is malformed"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, idea_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return str(created_at), int(idea_id)
+        except Exception:
+            return None
+    
+    @staticmethod
+    @timed_db_call
     def create(user_id: int, niche: str, ideas: List[Dict[str, Any]], 
                web_search_used: bool = False) -> Optional['BusinessIdea']:
         """Create a new business idea record in the database"""
         try:
-            result = db.get_service_role_client().table('business_ideas').insert({
+            rows = get_storage().insert_ideas([{
                 'user_id': user_id,
                 'niche': niche,
-                'ideas': json.dumps(ideas),
+                'ideas': ideas,  # JSONB column: send the list as-is
                 'web_search_used': web_search_used,
                 'created_at': datetime.now().isoformat()
-            }).execute()
+            }])
             
-            if result.data:
-                idea_data = result.data[0]
-                return BusinessIdea(
-                    id=idea_data['id'],
-                    user_id=idea_data['user_id'],
-                    niche=idea_data['niche'],
-                    ideas=json.loads(idea_data['ideas']) if isinstance(idea_data['ideas'], str) else idea_data['ideas'],
-                    web_search_used=idea_data['web_search_used'],
-                    created_at=idea_data['created_at']
-                )
+            if rows:
+                return BusinessIdea.from_row(rows[0])
             return None
         except Exception as e:
             print(f"Error creating business idea: {e}")
             return None
     
     @staticmethod
+    @timed_db_call
+    def create_many(rows: List[Dict[str, Any]]) -> List['BusinessIdea']:
+        """Insert several business idea records with a single multi-row insert
+        Each row needs user_id, niche and ideas; web_search_used defaults to False"""
+        if not rows:
+            return []
+        try:
+            now = datetime.now().isoformat()
+            inserted = get_storage().insert_ideas([{
+                'user_id': row['user_id'],
+                'niche': row['niche'],
+                'ideas': row['ideas'],
+                'web_search_used': row.get('web_search_used', False),
+                'created_at': row.get('created_at') or now
+            } for row in rows])
+            
+            return [BusinessIdea.from_row(idea_data) for idea_data in inserted]
+        except Exception as e:
+            print(f"Error creating business ideas in bulk: {e}")
+            return []
+    
+    @staticmethod
+    @timed_db_call
     def get_by_user_id(user_id: int, limit: int = 10) -> List['BusinessIdea']:
         """Get business ideas by user ID"""
         try:
-            result = db.get_service_role_client().table('business_ideas').select('*').eq('user_id', user_id).order('created_at', desc=True).limit(limit).execute()
-            
-            ideas = []
-            if result.data:
-                for idea_data in result.data:
-                    ideas.append(BusinessIdea(
-                        id=idea_data['id'],
-                        user_id=idea_data['user_id'],
-                        niche=idea_data['niche'],
-                        ideas=json.loads(idea_data['ideas']) if isinstance(idea_data['ideas'], str) else idea_data['ideas'],
-                        web_search_used=idea_data['web_search_used'],
-                        created_at=idea_data['created_at']
-                    ))
-            return ideas
+            return [BusinessIdea.from_row(idea_data) for idea_data in get_storage().get_ideas_by_user(user_id, limit)]
         except Exception as e:
             print(f"Error getting business ideas by user ID: {e}")
             return []
     
     @staticmethod
+    @timed_db_call
+    def get_summaries_by_user_id(user_id: int, limit: int = 10) -> List[BusinessIdeaSummary]:
+        """Get summaries of a user's most recent business ideas without loading the ideas payload"""
+        try:
+            return [BusinessIdeaSummary.from_row(row) for row in get_storage().get_idea_summaries_by_user(user_id, limit)]
+        except Exception as e:
+            print(f"Error getting business idea summaries by user ID: {e}")
+            return []
+    
+    @staticmethod
+    @timed_db_call
+    def search(user_id: int, query: str, page: int = 1, per_page: int = 10) -> Tuple[List[BusinessIdeaSummary], bool]:
+        """Full-text search of a user's ideas, best match first; returns (summaries, has_more)"""
+        try:
+            rows = get_storage().search_ideas(user_id, query, per_page + 1, (page - 1) * per_page)
+            return [BusinessIdeaSummary.from_row(row) for row in rows[:per_page]], len(rows) > per_page
+        except Exception as e:
+            print(f"Error searching business ideas: {e}")
+            return [], False
+    
+    @staticmethod
+    @timed_db_call
+    def get_page(user_id: int, per_page: int = 5, before: Optional[Tuple[str, int]] = None,
+                 after: Optional[Tuple[str, int]] = None) -> Tuple[List['BusinessIdea'], bool]:
+        """
+        Get one page of a user's ideas, newest first, using keyset pagination on (created_at, id)
+        
+        Args:
+            user_id: ID of the user
+            per_page: Page size; per_page + 1 rows are fetched to detect more pages
+            before: Cursor position; return rows older than it (next page)
+            after: Cursor position; return rows newer than it (previous page)
+            
+        Returns:
+            (ideas, has_more) where has_more means another page exists in the
+            direction being paged
+        """
+        try:
+            rows = get_storage().get_ideas_page(user_id, per_page + 1, before=before, after=after)
+            
+            has_more = len(rows) > per_page
+            ideas = [BusinessIdea.from_row(idea_data) for idea_data in rows[:per_page]]
+            # Paging backwards walks the index in ascending order, so flip the rows
+            if before is None and after is not None:
+                ideas.reverse()
+            return ideas, has_more
+        except Exception as e:
+            print(f"Error getting business idea page: {e}")
+            return [], False
+    
+    @staticmethod
+    @timed_db_call
+    def get_chunk(user_id: int, limit: int, before: Optional[Tuple[str, int]] = None) -> List['BusinessIdea']:
+        """One keyset chunk of a user's ideas, newest first
+        Unlike get_page, errors propagate so a failed export is never mistaken for a complete one"""
+        return [BusinessIdea.from_row(idea_data)
+                for idea_data in get_storage().get_ideas_page(user_id, limit, before=before)]
+    
+    @staticmethod
+    def iter_by_user_id(user_id: int, chunk_size: int = 500) -> Iterator['BusinessIdea']:
+        """All of a user's ideas, newest first, fetched `chunk_size` rows at a time
+        Only one chunk is held in memory, however long the history is."""
+        before = None
+        while True:
+            chunk = BusinessIdea.get_chunk(user_id, chunk_size, before=before)
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            before = (chunk[-1].created_at, chunk[-1].id)
+    
+    @staticmethod
+    @timed_db_call
     def get_by_id(idea_id: int) -> Optional['BusinessIdea']:
         """Get business idea by ID"""
         try:
-            result = db.get_service_role_client().table('business_ideas').select('*').eq('id', idea_id).execute()
-            
-            if result.data:
-                idea_data = result.data[0]
-                return BusinessIdea(
-                    id=idea_data['id'],
-                    user_id=idea_data['user_id'],
-                    niche=idea_data['niche'],
-                    ideas=json.loads(idea_data['ideas']) if isinstance(idea_data['ideas'], str) else idea_data['ideas'],
-                    web_search_used=idea_data['web_search_used'],
-                    created_at=idea_data['created_at']
-                )
-            return None
+            idea_data = get_storage().get_idea_by_id(idea_id)
+            return BusinessIdea.from_row(idea_data) if idea_data else None
         except Exception as e:
             print(f"Error getting business idea by ID: {e}")
             return None
+    
+    @staticmethod
+    @timed_db_call
+    def get_version(idea_id: int) -> Optional[Dict[str, Any]]:
+        """Get only the id, user_id and created_at of an idea, for cache validation"""
+        try:
+            return get_storage().get_idea_version(idea_id)
+        except Exception as e:
+            print(f"Error getting business idea version: {e}")
+            return None
+    
+    @staticmethod
+    @timed_db_call
+    def get_latest_version(user_id: int) -> Optional[Dict[str, Any]]:
+        """Get the id, user_id and created_at of a user's newest idea; {} if they have none, None on error"""
+        try:
+            return get_storage().get_latest_idea_version(user_id) or {}
+        except Exception as e:
+            print(f"Error getting latest business idea version: {e}")
+            return None
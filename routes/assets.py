@@ -0,0 +1,40 @@
+from flask import Blueprint, current_app, request, url_for, send_file, abort
+from services.assets import DIST_DIR, get_manifest, fingerprinted_path
+import mimetypes
+import os
+
+assets_bp = Blueprint('assets', __name__)
+
+# Fingerprinted files never change, so browsers may keep them for a year
+ASSET_MAX_AGE = 365 * 24 * 3600
+# Preferred first
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+@assets_bp.app_template_global()
+def asset_url(filename):
+    """URL of the built, fingerprinted asset for a static/ source file.
+    Falls back to the plain static URL in debug mode or before `python build_assets.py` has run."""
+    built = None if current_app.debug else fingerprinted_path(current_app.static_folder, filename)
+    if built is None:
+        return url_for('static', filename=filename)
+    return url_for('assets.asset', filename=built)
+
+@assets_bp.route('/<path:filename>')
+def asset(filename):
+    """Serve a fingerprinted asset, precompressed to match Accept-Encoding, with immutable caching"""
+    if filename not in get_manifest(current_app.static_folder).values():
+        abort(404)
+
+    path = os.path.join(current_app.static_folder, DIST_DIR, filename)
+    encoding = None
+    for name, suffix in PRECOMPRESSED:
+        if request.accept_encodings[name] and os.path.exists(path + suffix):
+            encoding, path = name, path + suffix
+            break
+
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
@@ -1,10 +1,15 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from werkzeug.security import generate_password_hash, check_password_hash
 from models import User
+from services.password_hashing import get_password_hasher, HashingBusyError
 import re
 
 auth_bp = Blueprint('auth', __name__)
 
+def busy_response(template):
+    """Fast 503 when the password hashing pool is saturated"""
+    flash('The server is busy right now. Please try again in a moment.', 'error')
+    return render_template(template), 503, {'Retry-After': '2'}
+
 def is_valid_email(email):
     """Validate email format"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -41,7 +46,10 @@ def register():
             return render_template('auth/register.html')
         
         # Create new user
-        password_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        try:
+            password_hash = get_password_hasher().hash(password)
+        except HashingBusyError:
+            return busy_response('auth/register.html')
         new_user = User.create(email, password_hash)
         
         if new_user:
@@ -66,8 +74,22 @@ def login():
         # Get user from database
         user = User.get_by_email(email)
 
-                # Check for a valid user and a correctly formatted password hash
-        if user and user.password_hash and user.password_hash.count('$') >= 2 and check_password_hash(user.password_hash, password):
+        hasher = get_password_hasher()
+        try:
+            # Check for a valid user and a correctly formatted password hash
+            valid = bool(user and user.password_hash and user.password_hash.count('$') >= 2
+                         and hasher.verify(user.password_hash, password))
+        except HashingBusyError:
+            return busy_response('auth/login.html')
+        
+        if valid:
+            # Upgrade hashes made with an older method or cost while we have the password
+            if hasher.needs_rehash(user.password_hash):
+                try:
+                    User.update_password_hash(user.id, hasher.hash(password))
+                except HashingBusyError:
+                    pass  # Try again on a later login
+            
             # Login successful
             session['user_id'] = user.id
             session['user_email'] = user.email
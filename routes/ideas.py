@@ -1,7 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, Response, stream_with_context, current_app
+from markupsafe import Markup
 from models import BusinessIdea, User
-from services.ai_workflow import BusinessIdeaWorkflow
-import asyncio
+from services.workflow_registry import get_workflow
+from services.job_queue import get_job_queue, QueueFullError
+from services.bulk_generation import generate_bulk, parse_niches, clean_niches
+from services.idea_storage import IdeaStorageService
+from services.admission import get_admission_controller, AdmissionRejected
+from services.request_coalescing import get_inflight_registry
+from services.http_caching import make_etag, not_modified, with_etag
+from services.fragment_cache import get_fragment_cache
+from services.write_behind import get_write_behind
+from services.idea_export import EXPORT_FORMATS, export_ideas
+from datetime import date
+import json
+import os
 
 ideas_bp = Blueprint('ideas', __name__)
 
@@ -15,6 +27,38 @@ def login_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+def validate_niche(niche):
+    """Return an error message for an invalid niche, or None if it is acceptable"""
+    if not niche:
+        return 'Please enter a niche or industry.'
+    if len(niche) < 3:
+        return 'Please enter a more specific niche (at least 3 characters).'
+    return None
+
+def latest_ideas_etag(user_id, *parts):
+    """ETag for a page listing the user's ideas, from their newest row (cheap version-only query).
+    None when the lookup fails, and while write-behind is on: rows buffered in any worker are not
+    in the database yet, so the newest row does not identify the list."""
+    if get_write_behind():
+        return None
+    latest = BusinessIdea.get_latest_version(user_id)
+    if latest is None:
+        return None
+    return make_etag(*parts, latest.get('id'), latest.get('created_at'))
+
+@ideas_bp.app_template_global()
+def idea_fragment(template_name, business_idea):
+    """Render a per-idea partial, reusing the cached HTML for saved rows (they never change).
+    Bypassed in debug mode so template edits show up immediately."""
+    cache = None if current_app.debug or business_idea.id is None else get_fragment_cache()
+    key = (business_idea.id, template_name, business_idea.created_at)
+    html = cache.get(key) if cache else None
+    if html is None:
+        html = current_app.jinja_env.get_template(template_name).render(business_idea=business_idea)
+        if cache:
+            cache.set(key, html)
+    return Markup(html)
+
 @ideas_bp.route('/dashboard')
 @login_required
 def dashboard():
@@ -24,13 +68,62 @@ def dashboard():
     local_part = user_email.split('@')[0] if user_email else ''
     display_name = ' '.join([part.capitalize() for part in local_part.replace('.', ' ').replace('_', ' ').split()]) or user_email
     
-    # Get user's previous business ideas
-    previous_ideas = BusinessIdea.get_by_user_id(user_id, limit=10)
+    # Rows are immutable, so the newest one identifies the whole list
+    etag = latest_ideas_etag(user_id, 'dashboard')
+    cached = not_modified(etag) if etag else None
+    if cached:
+        return cached
+    
+    # Get summaries of the user's previous business ideas (full ideas load only in view_idea)
+    previous_ideas = BusinessIdea.get_summaries_by_user_id(user_id, limit=10)
     
-    return render_template('dashboard.html', 
+    html = render_template('dashboard.html', 
                          user_email=user_email,
                          display_name=display_name,
                          previous_ideas=previous_ideas)
+    return with_etag(html, etag) if etag else html
+
+def admission_message(rejected):
+    return f"{rejected.reason} Please try again in {rejected.retry_after} seconds."
+
+def with_retry_after(response, rejected):
+    """Give a rejected request its status and Retry-After header"""
+    response.status_code = rejected.status
+    response.headers['Retry-After'] = str(rejected.retry_after)
+    return response
+
+def coalesce_key_for(registry, niche, web_search_enabled, fresh_ideas):
+    """In-flight key for this submission: user + niche + web search and fresh-ideas flags, plus the
+    form's idempotency token when it sent one"""
+    if registry is None:
+        return None
+    return registry.make_key(session['user_id'], niche, web_search_enabled, fresh_ideas,
+                             request.form.get('idempotency_key'))
+
+def generation_outcome(result, business_idea, web_search_enabled):
+    """What a finished generation shares with coalesced duplicates of the request"""
+    return {
+        'ideas': result['ideas'],
+        'sources': result.get('sources', []),
+        'web_search_used': web_search_enabled,
+        'saved': business_idea is not None,
+        'idea_id': business_idea.id if business_idea else None
+    }
+
+def render_generation(outcome, niche):
+    """Render the generate page for a generation run here or shared from an identical request"""
+    if not outcome:
+        flash('Failed to generate business ideas. Please try again.', 'error')
+        return render_template('ideas/generate.html')
+    if outcome['saved']:
+        flash('Business ideas generated successfully!', 'success')
+    else:
+        flash('Ideas generated but failed to save to database.', 'warning')
+    return render_template('ideas/generate.html',
+                           generated_ideas=outcome['ideas'],
+                           niche=niche,
+                           web_search_used=outcome['web_search_used'],
+                           sources=outcome['sources'])
 
 @ideas_bp.route('/generate', methods=['GET', 'POST'])
 @login_required
@@ -38,89 +131,366 @@ def generate():
     if request.method == 'POST':
         niche = request.form.get('niche', '').strip()
         web_search_enabled = request.form.get('web_search') == 'on'
+        fresh_ideas = request.form.get('fresh_ideas') == 'on'
         
-        if not niche:
-            flash('Please enter a niche or industry.', 'error')
+        error = validate_niche(niche)
+        if error:
+            flash(error, 'error')
             return render_template('ideas/generate.html')
         
-        if len(niche) < 3:
-            flash('Please enter a more specific niche (at least 3 characters).', 'error')
-            return render_template('ideas/generate.html')
+        # Identical submissions (double click, refresh) share one running generation
+        registry = get_inflight_registry()
+        coalesce_key = coalesce_key_for(registry, niche, web_search_enabled, fresh_ideas)
+        if coalesce_key and not registry.claim(coalesce_key):
+            return render_generation(registry.wait(coalesce_key), niche)
+        
+        # Rate limits, a cap on concurrent workflows and a short wait queue
+        admission = get_admission_controller()
+        try:
+            slot = admission.acquire(session['user_id']) if admission else None
+        except AdmissionRejected as rejected:
+            if coalesce_key:
+                registry.abandon(coalesce_key)
+            flash(admission_message(rejected), 'error')
+            return with_retry_after(Response(render_template('ideas/generate.html')), rejected)
         
         try:
-            # Initialize the AI workflow
-            workflow = BusinessIdeaWorkflow()
+            # Reuse the worker's shared AI workflow (built once, kept warm)
+            workflow = get_workflow()
             
             # Generate business ideas using the workflow
-            result = workflow.run_workflow(niche, web_search_enabled)
+            result = workflow.run_workflow(niche, web_search_enabled, bypass_cache=fresh_ideas)
             
             if result and 'ideas' in result:
                 # Store the generated ideas in the database
                 user_id = session['user_id']
-                business_idea = BusinessIdea.create(
+                business_idea = IdeaStorageService.save_ideas(
                     user_id=user_id,
                     niche=niche,
                     ideas=result['ideas'],
                     web_search_used=web_search_enabled
                 )
                 
-                if business_idea:
-                    flash('Business ideas generated successfully!', 'success')
-                    return render_template('ideas/generate.html', 
-                                         generated_ideas=result['ideas'],
-                                         niche=niche,
-                                         web_search_used=web_search_enabled,
-                                         sources=result.get('sources', []))
-                else:
-                    flash('Ideas generated but failed to save to database.', 'warning')
-                    return render_template('ideas/generate.html', 
-                                         generated_ideas=result['ideas'],
-                                         niche=niche,
-                                         web_search_used=web_search_enabled,
-                                         sources=result.get('sources', []))
+                outcome = generation_outcome(result, business_idea, web_search_enabled)
+                if coalesce_key:
+                    registry.complete(coalesce_key, outcome)
+                return render_generation(outcome, niche)
             else:
-                flash('Failed to generate business ideas. Please try again.', 'error')
-                return render_template('ideas/generate.html')
+                return render_generation(None, niche)
                 
         except Exception as e:
             print(f"Error generating ideas: {e}")
             flash('An error occurred while generating ideas. Please try again.', 'error')
             return render_template('ideas/generate.html')
+        finally:
+            if slot is not None:
+                admission.release(slot)
+            if coalesce_key:
+                # No-op once the result is published; otherwise waiting duplicates see the failure
+                registry.abandon(coalesce_key)
     
     return render_template('ideas/generate.html')
 
+def sse_event(event, data):
+    """Format a server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def done_event_data(outcome):
+    return {'saved': outcome['saved'], 'idea_id': outcome['idea_id'], 'count': len(outcome['ideas'])}
+
+def shared_generation_events(registry, coalesce_key):
+    """SSE events for a duplicate request: wait for the identical running generation and replay its result"""
+    outcome = registry.wait(coalesce_key)
+    if not outcome:
+        yield sse_event('error', {'error': 'An error occurred while generating ideas. Please try again.'})
+        return
+    if outcome['web_search_used']:
+        yield sse_event('sources', {'sources': outcome['sources']})
+    for index, idea in enumerate(outcome['ideas']):
+        yield sse_event('idea', {'index': index, 'idea': idea})
+    yield sse_event('done', done_event_data(outcome))
+
+@ideas_bp.route('/generate/stream', methods=['POST'])
+@login_required
+def generate_stream():
+    """Stream ideas over SSE as the LLM completes them, then save the set once"""
+    niche = request.form.get('niche', '').strip()
+    web_search_enabled = request.form.get('web_search') == 'on'
+    fresh_ideas = request.form.get('fresh_ideas') == 'on'
+
+    error = validate_niche(niche)
+    if error:
+        return jsonify({'error': error}), 400
+
+    user_id = session['user_id']
+    registry = get_inflight_registry()
+    coalesce_key = coalesce_key_for(registry, niche, web_search_enabled, fresh_ideas)
+    if coalesce_key and not registry.claim(coalesce_key):
+        return sse_response(shared_generation_events(registry, coalesce_key))
+
+    admission = get_admission_controller()
+    try:
+        slot = admission.acquire(user_id) if admission else None
+    except AdmissionRejected as rejected:
+        if coalesce_key:
+            registry.abandon(coalesce_key)
+        return with_retry_after(jsonify({'error': admission_message(rejected)}), rejected)
+
+    def events():
+        try:
+            for event in get_workflow().stream_ideas(niche, web_search_enabled, bypass_cache=fresh_ideas):
+                if event['type'] != 'done':
+                    yield sse_event(event['type'], {k: v for k, v in event.items() if k != 'type'})
+                    continue
+
+                result = event['result']
+                # False when web search was requested but failed
+                web_search_used = result.get('web_search_used', web_search_enabled)
+                business_idea = IdeaStorageService.save_ideas(
+                    user_id=user_id,
+                    niche=niche,
+                    ideas=result['ideas'],
+                    web_search_used=web_search_used
+                )
+                outcome = generation_outcome(result, business_idea, web_search_used)
+                if coalesce_key:
+                    registry.complete(coalesce_key, outcome)
+                yield sse_event('done', done_event_data(outcome))
+        except Exception as e:
+            print(f"Error streaming ideas: {e}")
+            yield sse_event('error', {'error': 'An error occurred while generating ideas. Please try again.'})
+
+    def finish():
+        # Runs even if the client disconnects before the stream starts
+        if slot is not None:
+            admission.release(slot)
+        if coalesce_key:
+            registry.abandon(coalesce_key)
+
+    response = sse_response(events())
+    response.call_on_close(finish)
+    return response
+
+@ideas_bp.route('/bulk', methods=['POST'])
+@login_required
+def bulk_generate():
+    """
+    Generate ideas for many niches at once, streaming NDJSON rows as each finishes
+    Accepts JSON {"niches": [...], "web_search": bool, "concurrency": int},
+    an uploaded CSV `file`, or a `niches` form field with one niche per line.
+    """
+    payload = request.get_json(silent=True)
+    if payload is not None and not isinstance(payload, dict):
+        return jsonify({'error': 'The request body must be a JSON object.'}), 400
+    if payload:
+        niches = clean_niches(payload['niches']) if isinstance(payload.get('niches'), list) else []
+        web_search_enabled = bool(payload.get('web_search', False))
+        concurrency = payload.get('concurrency')
+    else:
+        upload = request.files.get('file')
+        text = upload.read().decode('utf-8', errors='replace') if upload else request.form.get('niches', '')
+        niches = parse_niches(text)
+        web_search_enabled = request.form.get('web_search') == 'on'
+        concurrency = request.form.get('concurrency')
+
+    max_niches = int(os.getenv('BULK_MAX_NICHES', 500))
+    max_concurrency = int(os.getenv('BULK_MAX_CONCURRENCY', 8))
+    if not niches:
+        return jsonify({'error': 'Please provide at least one niche.'}), 400
+    if len(niches) > max_niches:
+        return jsonify({'error': f'Too many niches (maximum is {max_niches}).'}), 400
+
+    try:
+        concurrency = min(max(int(concurrency or max_concurrency), 1), max_concurrency)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Concurrency must be a number.'}), 400
+
+    rows = generate_bulk(
+        niches,
+        web_search_enabled=web_search_enabled,
+        concurrency=concurrency,
+        requests_per_minute=float(os.getenv('BULK_REQUESTS_PER_MINUTE', 60)),
+        user_id=session['user_id']
+    )
+    return Response(stream_with_context(json.dumps(row) + '\n' for row in rows),
+                    mimetype='application/x-ndjson')
+
+@ideas_bp.route('/jobs', methods=['POST'])
+@login_required
+def submit_job():
+    """Queue a background generation job and return its id immediately"""
+    niche = request.form.get('niche', '').strip()
+    web_search_enabled = request.form.get('web_search') == 'on'
+    fresh_ideas = request.form.get('fresh_ideas') == 'on'
+
+    error = validate_niche(niche)
+    if error:
+        return jsonify({'error': error}), 400
+
+    # The token is spent now so rate limits answer synchronously, but only once the queue has room;
+    # the job holds a slot while it runs
+    admission = get_admission_controller()
+    user_id = session['user_id']
+    try:
+        job = get_job_queue().submit(user_id, niche, web_search_enabled, bypass_cache=fresh_ideas,
+                                     admit=(lambda: admission.take_token(user_id)) if admission else None)
+    except AdmissionRejected as rejected:
+        return with_retry_after(jsonify({'error': admission_message(rejected)}), rejected)
+    except QueueFullError:
+        response = jsonify({'error': 'The server is busy. Please try again shortly.'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('ideas.job_status', job_id=job.id),
+        'events_url': url_for('ideas.job_events', job_id=job.id)
+    }), 202
+
+def _get_user_job(job_id):
+    """Look up a job owned by the current user"""
+    job = get_job_queue().get(job_id)
+    if not job or job.user_id != session['user_id']:
+        return None
+    return job
+
+@ideas_bp.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = _get_user_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found.'}), 404
+    return jsonify(job.to_dict())
+
+@ideas_bp.route('/jobs/<job_id>/events')
+@login_required
+def job_events(job_id):
+    """Server-sent events stream of a job's status until it finishes"""
+    job = _get_user_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found.'}), 404
+
+    def stream():
+        version = -1
+        while True:
+            current = get_job_queue().wait_for_change(job_id, version, timeout=15)
+            if current is None:
+                yield sse_event('status', {'job_id': job_id, 'status': 'failed', 'error': 'Job not found.'})
+                return
+            if current.version == version:
+                # Keep idle connections open through proxies
+                yield ": keep-alive\n\n"
+                continue
+            version = current.version
+            yield sse_event('status', current.to_dict())
+            if current.done:
+                return
+
+    return sse_response(stream())
+
 @ideas_bp.route('/history')
 @login_required
 def history():
     user_id = session['user_id']
     user_email = session['user_email']
     
-    # Get all user's business ideas with pagination
-    page = request.args.get('page', 1, type=int)
+    # Keyset pagination: `before` pages to older ideas, `after` back to newer ones
+    page = max(request.args.get('page', 1, type=int), 1)
     per_page = 5
+    before = BusinessIdea.decode_cursor(request.args['before']) if request.args.get('before') else None
+    after = BusinessIdea.decode_cursor(request.args['after']) if request.args.get('after') else None
     
-    all_ideas = BusinessIdea.get_by_user_id(user_id, limit=50)  # Get more for pagination
+    etag = latest_ideas_etag(user_id, 'history', request.query_string.decode())
+    cached = not_modified(etag) if etag else None
+    if cached:
+        return cached
     
-    # Simple pagination
-    start = (page - 1) * per_page
-    end = start + per_page
-    ideas_page = all_ideas[start:end]
+    ideas_page, has_more = BusinessIdea.get_page(user_id, per_page=per_page, before=before, after=after)
     
-    has_prev = page > 1
-    has_next = len(all_ideas) > end
+    if after:
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = before is not None, has_more
     
-    return render_template('ideas/history.html',
+    html = render_template('ideas/history.html',
                          user_email=user_email,
                          ideas=ideas_page,
                          page=page,
-                         has_prev=has_prev,
-                         has_next=has_next)
+                         has_prev=has_prev and bool(ideas_page),
+                         has_next=has_next and bool(ideas_page),
+                         prev_cursor=ideas_page[0].cursor if ideas_page else None,
+                         next_cursor=ideas_page[-1].cursor if ideas_page else None)
+    return with_etag(html, etag) if etag else html
+
+@ideas_bp.route('/export')
+@login_required
+def export():
+    """
+    Download the user's whole idea history as NDJSON, CSV (one row per idea) or a JSON array
+    Rows are streamed in keyset chunks of EXPORT_CHUNK_SIZE, never buffered in full.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}."}), 400
+    mimetype, extension = EXPORT_FORMATS[export_format]
+
+    chunk_size = max(int(os.getenv('EXPORT_CHUNK_SIZE', 500)), 1)
+    response = Response(export_ideas(session['user_id'], export_format, chunk_size), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="ideas-{date.today().isoformat()}.{extension}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@ideas_bp.route('/search')
+@login_required
+def search():
+    """Ranked full-text search over the current user's idea history (JSON)"""
+    query = request.args.get('q', '').strip()[:200]
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)
+
+    if len(query) < 2:
+        return jsonify({'query': query, 'page': page, 'has_more': False, 'results': []})
+
+    results, has_more = BusinessIdea.search(session['user_id'], query, page=page, per_page=per_page)
+
+    return jsonify({
+        'query': query,
+        'page': page,
+        'has_more': has_more,
+        'results': [{
+            'id': summary.id,
+            'niche': summary.niche,
+            'headline_name': summary.headline_name,
+            'headline_pitch': summary.headline_pitch,
+            'idea_count': summary.idea_count,
+            'web_search_used': summary.web_search_used,
+            'created_at': summary.created_at,
+            'rank': summary.rank,
+            'url': url_for('ideas.view_idea', idea_id=summary.id)
+        } for summary in results]
+    })
 
 @ideas_bp.route('/view/<int:idea_id>')
 @login_required
 def view_idea(idea_id):
     user_id = session['user_id']
     
+    # Saved ideas never change, so (id, created_at) validates the page without loading the row
+    version = BusinessIdea.get_version(idea_id)
+    etag = make_etag('view', idea_id, version['created_at']) if version and version['user_id'] == user_id else None
+    cached = not_modified(etag) if etag else None
+    if cached:
+        return cached
+    
     # Get the specific business idea
     business_idea = BusinessIdea.get_by_id(idea_id)
     
@@ -133,4 +503,5 @@ def view_idea(idea_id):
         flash('You do not have permission to view this idea.', 'error')
         return redirect(url_for('ideas.history'))
     
-    return render_template('ideas/view.html', business_idea=business_idea)
+    html = render_template('ideas/view.html', business_idea=business_idea)
+    return with_etag(html, etag) if etag else html
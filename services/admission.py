@@ -0,0 +1,235 @@
+import os
+import math
+import time
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+from services.metrics import ADMISSION_DECISIONS, ADMISSION_WAIT
+
+
+class AdmissionRejected(Exception):
+    """A request turned away by admission control; maps to an HTTP status with Retry-After"""
+
+    def __init__(self, status: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        self.reason = reason
+
+
+class AdmissionController:
+    """Per-user and global token buckets plus a global cap on concurrent workflows.
+
+    State lives in a SQLite file so every worker process on the host shares
+    the same buckets and slots. Requests over a user's rate get 429; requests
+    over the global rate, or arriving when all `max_concurrent` slots are busy
+    and `queue_size` requests are already waiting, get 503. Queued requests
+    are admitted first-come first-served, or rejected after `queue_timeout`.
+    Background work (jobs, bulk runs) waits up to `background_timeout` for a
+    slot instead. Bulk runs draw from their own per-user bucket (`bulk_rate`,
+    `bulk_burst`), so one user's bulk run cannot take the whole global budget
+    and still leaves that user's interactive bucket alone.
+    Slots held by a crashed process expire after `slot_ttl` seconds.
+    """
+
+    def __init__(self, path: str, user_rate: float = 6.0, user_burst: float = 3.0,
+                 bulk_rate: float = 30.0, bulk_burst: float = 5.0,
+                 global_rate: float = 120.0, global_burst: float = 20.0, max_concurrent: int = 8,
+                 queue_size: int = 8, queue_timeout: float = 5.0, slot_ttl: float = 120.0,
+                 background_timeout: float = 60.0, poll_interval: float = 0.05):
+        self.path = path
+        # Rates are configured per minute, refilled per second
+        self.user_rate = user_rate / 60
+        self.user_burst = user_burst
+        self.bulk_rate = bulk_rate / 60
+        self.bulk_burst = bulk_burst
+        self.global_rate = global_rate / 60
+        self.global_burst = global_burst
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.slot_ttl = slot_ttl
+        self.background_timeout = background_timeout
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(
+            'CREATE TABLE IF NOT EXISTS token_buckets ('
+            ' key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS workflow_slots ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT, acquired_at REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS admission_waiters ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT, queued_at REAL NOT NULL);'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; each decision runs in its own BEGIN IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _refill(conn: sqlite3.Connection, key: str, rate: float, burst: float, now: float) -> float:
+        row = conn.execute('SELECT tokens, updated_at FROM token_buckets WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return burst
+        return min(burst, row[0] + max(0.0, now - row[1]) * rate)
+
+    def take_token(self, user_id, bulk: bool = False) -> None:
+        """Spend one token from the user's and the global bucket, or raise AdmissionRejected.
+        With `bulk` the user's bulk bucket is charged instead of their interactive one.
+        With user_id None (command-line runs) only the global bucket is charged."""
+        now = time.time()
+        user_key = f'bulk:{user_id}' if bulk else f'user:{user_id}'
+        user_rate, user_burst = (self.bulk_rate, self.bulk_burst) if bulk else (self.user_rate, self.user_burst)
+        with self._transaction() as conn:
+            user_tokens = self._refill(conn, user_key, user_rate, user_burst, now) if user_id is not None else 1
+            global_tokens = self._refill(conn, 'global', self.global_rate, self.global_burst, now)
+            if user_tokens < 1:
+                ADMISSION_DECISIONS.labels(result='user_rate_limited').inc()
+                raise AdmissionRejected(429, (1 - user_tokens) / user_rate,
+                                        'You are generating ideas too quickly.')
+            if global_tokens < 1:
+                ADMISSION_DECISIONS.labels(result='global_rate_limited').inc()
+                raise AdmissionRejected(503, (1 - global_tokens) / self.global_rate,
+                                        'The server is busy.')
+            spent = [('global', global_tokens - 1, now)]
+            if user_id is not None:
+                spent.append((user_key, user_tokens - 1, now))
+            conn.executemany('INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at) VALUES (?, ?, ?)', spent)
+            # Idle users' buckets are full again after burst / rate seconds
+            conn.execute('DELETE FROM token_buckets WHERE key != ? AND updated_at < ?',
+                         ('global', now - max(self.user_burst / self.user_rate, self.bulk_burst / self.bulk_rate)))
+
+    def _try_slot(self, waiter_id: Optional[int] = None) -> Tuple[Optional[int], Optional[int]]:
+        """One admission attempt: (slot id, None) when admitted, else (None, waiter id).
+        Raises AdmissionRejected when the wait queue is full."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM workflow_slots WHERE acquired_at < ?', (now - self.slot_ttl,))
+            conn.execute('DELETE FROM admission_waiters WHERE queued_at < ?', (now - self.slot_ttl,))
+            busy = conn.execute('SELECT COUNT(*) FROM workflow_slots').fetchone()[0]
+            if waiter_id is None:
+                ahead = conn.execute('SELECT COUNT(*) FROM admission_waiters').fetchone()[0]
+            else:
+                ahead = conn.execute('SELECT COUNT(*) FROM admission_waiters WHERE id < ?',
+                                     (waiter_id,)).fetchone()[0]
+
+            # Free slots go to earlier waiters first
+            if busy + ahead < self.max_concurrent:
+                if waiter_id is not None:
+                    conn.execute('DELETE FROM admission_waiters WHERE id = ?', (waiter_id,))
+                slot_id = conn.execute('INSERT INTO workflow_slots (acquired_at) VALUES (?)', (now,)).lastrowid
+                return slot_id, None
+
+            if waiter_id is None:
+                if ahead >= self.queue_size:
+                    ADMISSION_DECISIONS.labels(result='queue_full').inc()
+                    raise AdmissionRejected(503, self.queue_timeout, 'The server is busy.')
+                waiter_id = conn.execute('INSERT INTO admission_waiters (queued_at) VALUES (?)', (now,)).lastrowid
+            return None, waiter_id
+
+    def _leave_queue(self, waiter_id: int) -> None:
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM admission_waiters WHERE id = ?', (waiter_id,))
+
+    def release(self, slot_id: int) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute('DELETE FROM workflow_slots WHERE id = ?', (slot_id,))
+        except Exception as e:
+            # The slot expires after slot_ttl anyway
+            print(f"Error releasing workflow slot: {e}")
+
+    def wait_for_bulk_token(self, user_id) -> None:
+        """Block until a token is spent from the user's bulk bucket and the global one"""
+        while True:
+            try:
+                return self.take_token(user_id, bulk=True)
+            except AdmissionRejected as rejected:
+                time.sleep(rejected.retry_after)
+
+    def acquire(self, user_id) -> int:
+        """Admit a request, waiting up to queue_timeout for a slot; returns the slot id"""
+        self.take_token(user_id)
+        return self.acquire_slot()
+
+    def acquire_slot(self, timeout: Optional[float] = None) -> int:
+        """Wait up to `timeout` (default queue_timeout) for a workflow slot without spending a token"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        started = time.monotonic()
+        slot_id, waiter_id = self._try_slot()
+        queued = waiter_id is not None
+        try:
+            while slot_id is None:
+                if time.monotonic() - started >= timeout:
+                    ADMISSION_DECISIONS.labels(result='queue_timeout').inc()
+                    raise AdmissionRejected(503, self.queue_timeout, 'The server is busy.')
+                time.sleep(self.poll_interval)
+                slot_id, waiter_id = self._try_slot(waiter_id)
+        except BaseException:
+            if waiter_id is not None:
+                self._leave_queue(waiter_id)
+            raise
+        self._admitted(started, queued)
+        return slot_id
+
+    @staticmethod
+    def _admitted(started: float, queued: bool) -> None:
+        ADMISSION_WAIT.observe(time.monotonic() - started)
+        ADMISSION_DECISIONS.labels(result='queued' if queued else 'admitted').inc()
+
+    @contextmanager
+    def hold_slot(self):
+        """Hold a workflow slot for the block, waiting up to background_timeout for it.
+        For background work whose token was already spent."""
+        slot_id = self.acquire_slot(self.background_timeout)
+        try:
+            yield
+        finally:
+            self.release(slot_id)
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Return the process-wide admission controller, or None when disabled via ADMISSION_ENABLED"""
+    global _admission
+    if os.getenv('ADMISSION_ENABLED', 'True').lower() != 'true':
+        return None
+    if _admission is None:
+        with _admission_lock:
+            if _admission is None:
+                _admission = AdmissionController(
+                    path=os.getenv('ADMISSION_PATH') or os.path.join(tempfile.gettempdir(), 'idea_admission.sqlite3'),
+                    user_rate=float(os.getenv('ADMISSION_USER_RATE_PER_MINUTE', 6)),
+                    user_burst=float(os.getenv('ADMISSION_USER_BURST', 3)),
+                    bulk_rate=float(os.getenv('ADMISSION_BULK_RATE_PER_MINUTE', 30)),
+                    bulk_burst=float(os.getenv('ADMISSION_BULK_BURST', 5)),
+                    global_rate=float(os.getenv('ADMISSION_GLOBAL_RATE_PER_MINUTE', 120)),
+                    global_burst=float(os.getenv('ADMISSION_GLOBAL_BURST', 20)),
+                    max_concurrent=int(os.getenv('ADMISSION_MAX_CONCURRENT', 8)),
+                    queue_size=int(os.getenv('ADMISSION_QUEUE_SIZE', 8)),
+                    queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 5)),
+                    slot_ttl=float(os.getenv('ADMISSION_SLOT_TTL', 120)),
+                    background_timeout=float(os.getenv('ADMISSION_BACKGROUND_TIMEOUT', 60))
+                )
+    return _admission
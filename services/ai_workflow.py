@@ -1,9 +1,20 @@
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
-from typing import TypedDict, List, Dict, Any, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.utils.json import parse_partial_json
+from typing import TypedDict, List, Dict, Any, Optional, Iterator
 import os
 import json
+import time
+import functools
+import httpx
 from services.web_search import WebSearchService
+from services.research import ResearchService
+from services.prompt_builder import PromptBuilder
+from services.llm_resilience import ResilientLLM, CircuitBreaker
+from services.result_cache import get_result_cache, IdeaResultCache
+from services.metrics import WORKFLOW_NODE_DURATION, GENERATIONS_IN_FLIGHT, LLM_TOKENS, CACHE_REQUESTS
 from pydantic import BaseModel, Field
 
 class BusinessIdeaModel(BaseModel):
@@ -19,29 +30,117 @@ class WorkflowState(TypedDict):
     niche: str
     web_search_enabled: bool
     web_search_results: Optional[str]
+    web_search_sources: Optional[List[Dict[str, str]]]
     generated_ideas: Optional[List[Dict[str, Any]]]
     error: Optional[str]
+    # time.monotonic() by which the generation must finish
+    deadline: float
+
+class TokenUsageMetrics(BaseCallbackHandler):
+    """Counts the prompt/completion tokens the OpenAI API reports for each call"""
+    
+    def __init__(self, model_name: str):
+        self.prompt_tokens = LLM_TOKENS.labels(model=model_name, kind='prompt')
+        self.completion_tokens = LLM_TOKENS.labels(model=model_name, kind='completion')
+        self.cached_prompt_tokens = LLM_TOKENS.labels(model=model_name, kind='prompt_cached')
+    
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+                if usage:
+                    self.prompt_tokens.inc(usage.get('input_tokens', 0))
+                    self.completion_tokens.inc(usage.get('output_tokens', 0))
+                    # Prompt tokens served from the provider's prompt cache
+                    self.cached_prompt_tokens.inc((usage.get('input_token_details') or {}).get('cache_read') or 0)
+
+def timed_node(name: str, func):
+    """Wrap a workflow node so each run is recorded in WORKFLOW_NODE_DURATION"""
+    histogram = WORKFLOW_NODE_DURATION.labels(node=name)
+    
+    @functools.wraps(func)
+    def timed(state):
+        with histogram.time():
+            return func(state)
+    
+    return timed
 
 class BusinessIdeaWorkflow:
-    def __init__(self):
+    def __init__(self, model_name: Optional[str] = None):
         # Configure OpenAI model; API key is read from OPENAI_API_KEY env var
-        model_name = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-        self.llm = ChatOpenAI(
-            model=model_name,
-            temperature=0.7
+        self.model_name = model_name or os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        # Long-lived HTTP clients so repeated calls reuse pooled keep-alive connections
+        limits = httpx.Limits(
+            max_connections=int(os.getenv('OPENAI_MAX_CONNECTIONS', 20)),
+            max_keepalive_connections=int(os.getenv('OPENAI_MAX_KEEPALIVE', 10)),
+            keepalive_expiry=float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', 120))
         )
+        self.http_client = http_client = httpx.Client(limits=limits)
+        self.llm = self._create_llm(self.model_name, http_client)
+        # Hedged, deadline-bound and circuit-broken; the fallback model serves while the breaker is open
+        fallback_model = os.getenv('OPENAI_FALLBACK_MODEL')
+        fallback_llm = self._create_llm(fallback_model, http_client) if fallback_model else None
+        # Streaming uses a forced tool call whose JSON arguments can be parsed while they stream in
+        self.structured_llm = ResilientLLM(
+            self.llm.with_structured_output(BusinessIdeasResponse),
+            fallback=fallback_llm.with_structured_output(BusinessIdeasResponse) if fallback_llm else None,
+            stream_primary=self._bind_streaming(self.llm),
+            stream_fallback=self._bind_streaming(fallback_llm) if fallback_llm else None,
+            breaker=CircuitBreaker(
+                failure_ratio=float(os.getenv('LLM_BREAKER_FAILURE_RATIO', 0.5)),
+                window=int(os.getenv('LLM_BREAKER_WINDOW', 20)),
+                min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', 10)),
+                reset_seconds=float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30))
+            ),
+            hedge_percentile=float(os.getenv('LLM_HEDGE_PERCENTILE', 95)),
+            hedge_min_delay=float(os.getenv('LLM_HEDGE_MIN_DELAY', 0.5)),
+            timeout=float(os.getenv('OPENAI_TIMEOUT', 30))
+        )
+        # Total time a generation may take, shared by web search and the LLM call
+        self.request_budget = float(os.getenv('GENERATION_BUDGET_SECONDS', 45))
+        self.prompt_builder = PromptBuilder(self.model_name, context_tokens=int(os.getenv('PROMPT_CONTEXT_TOKENS', 500)))
         self.web_search_service = WebSearchService()
+        # Several query angles per niche, searched concurrently under one deadline
+        angles = os.getenv('RESEARCH_ANGLES')
+        self.research_service = ResearchService(
+            self.web_search_service,
+            angles=[angle.strip() for angle in angles.split(',')] if angles else None,
+            results_per_query=int(os.getenv('RESEARCH_RESULTS_PER_QUERY', 5)),
+            deadline=float(os.getenv('RESEARCH_DEADLINE_SECONDS', 8))
+        )
         self.workflow = self._create_workflow()
     
+    def close(self) -> None:
+        """Close the pooled OpenAI connections; the workflow must not be used afterwards"""
+        self.http_client.close()
+
+    @staticmethod
+    def _bind_streaming(llm: ChatOpenAI):
+        return llm.bind_tools([BusinessIdeasResponse], tool_choice="BusinessIdeasResponse")
+
+    @staticmethod
+    def _create_llm(model_name: str, http_client: httpx.Client) -> ChatOpenAI:
+        return ChatOpenAI(
+            model=model_name,
+            temperature=0.7,
+            http_client=http_client,
+            # Per-attempt HTTP timeout; the hedging layer enforces the overall deadline
+            timeout=float(os.getenv('OPENAI_TIMEOUT', 30)),
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 1)),
+            # Ask for usage on streamed responses too, for token metrics
+            stream_usage=True,
+            callbacks=[TokenUsageMetrics(model_name)]
+        )
+    
     def _create_workflow(self) -> StateGraph:
         """Create the LangGraph workflow"""
         workflow = StateGraph(WorkflowState)
         
-        # Add nodes
-        workflow.add_node("start", self._start_node)
-        workflow.add_node("web_search", self._web_search_node)
-        workflow.add_node("generate_ideas", self._generate_ideas_node)
-        workflow.add_node("format_output", self._format_output_node)
+        # Add nodes; every node is timed
+        workflow.add_node("start", timed_node("start", self._start_node))
+        workflow.add_node("web_search", timed_node("web_search", self._web_search_node))
+        workflow.add_node("generate_ideas", timed_node("generate_ideas", self._generate_ideas_node))
+        workflow.add_node("format_output", timed_node("format_output", self._format_output_node))
         
         # Add edges
         workflow.set_entry_point("start")
@@ -67,22 +166,23 @@ class BusinessIdeaWorkflow:
         """Conditional edge to determine if web search should be performed"""
         return "search" if state["web_search_enabled"] else "generate"
     
+    @staticmethod
+    def _apply_search_results(state: WorkflowState, search_results) -> WorkflowState:
+        # Expecting dict with keys: text, sources
+        if isinstance(search_results, dict):
+            state["web_search_results"] = search_results.get("text", "")
+            state["web_search_sources"] = search_results.get("sources", [])
+        else:
+            # Backward compatibility if a plain string is returned
+            state["web_search_results"] = search_results or ""
+            state["web_search_sources"] = []
+        return state
+    
     def _web_search_node(self, state: WorkflowState) -> WorkflowState:
         """Web search node - perform web search if enabled"""
         try:
-            niche = state["niche"]
-            search_query = f"startup ideas trends opportunities {niche} market analysis 2024"
-            
-            search_results = self.web_search_service.search(search_query)
-            # Expecting dict with keys: text, sources
-            if isinstance(search_results, dict):
-                state["web_search_results"] = search_results.get("text", "")
-                state["web_search_sources"] = search_results.get("sources", [])
-            else:
-                # Backward compatibility if a plain string is returned
-                state["web_search_results"] = search_results or ""
-                state["web_search_sources"] = []
-            
+            search_results = self.research_service.research(state["niche"], timeout=self._remaining(state))
+            self._apply_search_results(state, search_results)
         except Exception as e:
             print(f"Web search error: {e}")
             state["web_search_results"] = None
@@ -93,29 +193,13 @@ class BusinessIdeaWorkflow:
     def _generate_ideas_node(self, state: WorkflowState) -> WorkflowState:
         """Generate business ideas using the LLM"""
         try:
-            niche = state["niche"]
-            web_data = state.get("web_search_results", "")
-            
-            # Create the prompt
-            prompt = self._create_prompt(niche, web_data)
+            prompt = self._create_prompt(state["niche"], state.get("web_search_results", ""))
             
-            # Use structured output with Pydantic
-            structured_llm = self.llm.with_structured_output(BusinessIdeasResponse)
-            
-            # Generate ideas
-            response = structured_llm.invoke(prompt)
+            # Generate ideas (structured output with Pydantic, bound once in __init__)
+            response = self.structured_llm.invoke(prompt, timeout=self._remaining(state))
             
             # Convert to dictionary format
-            ideas_list = []
-            for idea in response.ideas:
-                ideas_list.append({
-                    "name": idea.name,
-                    "pitch": idea.pitch,
-                    "audience": idea.audience,
-                    "revenue_model": idea.revenue_model
-                })
-            
-            state["generated_ideas"] = ideas_list
+            state["generated_ideas"] = [self._idea_to_dict(idea) for idea in response.ideas]
             
         except Exception as e:
             print(f"Idea generation error: {e}")
@@ -124,6 +208,15 @@ class BusinessIdeaWorkflow:
         
         return state
     
+    @staticmethod
+    def _idea_to_dict(idea: BusinessIdeaModel) -> Dict[str, str]:
+        return {
+            "name": idea.name,
+            "pitch": idea.pitch,
+            "audience": idea.audience,
+            "revenue_model": idea.revenue_model
+        }
+    
     def _format_output_node(self, state: WorkflowState) -> WorkflowState:
         """Format the final output"""
         if state.get("generated_ideas"):
@@ -137,65 +230,166 @@ class BusinessIdeaWorkflow:
         
         return state
     
-    def _create_prompt(self, niche: str, web_data: str = "") -> str:
-        """Create the prompt for the LLM"""
-        base_prompt = f"""You are a professional startup ideation assistant with expertise in market analysis and business development.
-
-Given the following niche: "{niche}"
-"""
-        
-        if web_data:
-            base_prompt += f"""
-Recent market research and trends:
-{web_data[:2000]}  # Limit web data to avoid token limits
-"""
+    def _create_prompt(self, niche: str, web_data: str = "") -> List[BaseMessage]:
+        """Create the prompt for the LLM: static instructions first, then the niche and compressed research"""
+        return self.prompt_builder.build(niche, web_data)
+    
+    def _cache_lookup(self, niche: str, web_search_enabled: bool, bypass_cache: bool):
+        """Return (cache, key, cached result) for a request; cached result is None on a miss"""
+        cache = get_result_cache()
+        if cache is None:
+            return None, None, None
+        key = IdeaResultCache.make_key(niche, web_search_enabled, self.model_name)
+        if bypass_cache:
+            CACHE_REQUESTS.labels(cache='ideas', result='bypass').inc()
+            return cache, key, None
+        cached = cache.get(key)
+        CACHE_REQUESTS.labels(cache='ideas', result='miss' if cached is None else 'hit').inc()
+        if cached is not None:
+            cached = dict(cached, niche=niche, cached=True)
+        return cache, key, cached
+    
+    @staticmethod
+    def _remaining(state: WorkflowState) -> float:
+        """Seconds left in the request budget"""
+        return state["deadline"] - time.monotonic()
+    
+    def _initial_state(self, niche: str, web_search_enabled: bool) -> WorkflowState:
+        return {
+            "niche": niche,
+            "web_search_enabled": web_search_enabled,
+            "web_search_results": None,
+            "web_search_sources": None,
+            "generated_ideas": None,
+            "error": None,
+            "deadline": time.monotonic() + self.request_budget
+        }
+    
+    @staticmethod
+    def _build_result(final_state: WorkflowState, niche: str, web_search_enabled: bool,
+                      cache: Optional[IdeaResultCache], cache_key: Optional[str]) -> Dict[str, Any]:
+        """Turn the final graph state into the run_workflow result, caching successes"""
+        if final_state.get("error"):
+            return {"error": final_state["error"]}
         
-        base_prompt += """
-Generate EXACTLY 3 innovative and viable startup ideas for this niche.
-
-For each idea, provide:
-- A compelling startup name
-- A one-paragraph pitch that clearly explains the value proposition
-- The specific target audience
-- A realistic revenue model
-
-Focus on:
-- Market gaps and opportunities
-- Scalable business models
-- Current technology trends
-- Practical implementation
-
-Ensure each idea is unique, feasible, and addresses real market needs."""
+        if final_state.get("generated_ideas"):
+            result = {
+                "ideas": final_state["generated_ideas"],
+                "web_search_used": web_search_enabled,
+                "niche": niche,
+                "sources": final_state.get("web_search_sources") or []
+            }
+            if cache is not None:
+                # Fresh results replace any cached entry, including on bypass
+                cache.set(cache_key, result)
+            return result
         
-        return base_prompt
+        return {"error": "No ideas were generated"}
     
-    def run_workflow(self, niche: str, web_search_enabled: bool = False) -> Dict[str, Any]:
-        """Run the complete workflow"""
+    def run_workflow(self, niche: str, web_search_enabled: bool = False,
+                     bypass_cache: bool = False) -> Dict[str, Any]:
+        """Run the complete workflow, serving repeat niches from the result cache
+        unless bypass_cache is set"""
+        cache, cache_key, cached = self._cache_lookup(niche, web_search_enabled, bypass_cache)
+        if cached is not None:
+            return cached
+        
         try:
-            initial_state = {
-                "niche": niche,
-                "web_search_enabled": web_search_enabled,
-                "web_search_results": None,
-                "generated_ideas": None,
-                "error": None
-            }
-            
             # Execute the workflow
-            final_state = self.workflow.invoke(initial_state)
-            
-            if final_state.get("error"):
-                return {"error": final_state["error"]}
-            
-            if final_state.get("generated_ideas"):
-                return {
-                    "ideas": final_state["generated_ideas"],
-                    "web_search_used": web_search_enabled,
-                    "niche": niche,
-                    "sources": final_state.get("web_search_sources", [])
-                }
-            else:
-                return {"error": "No ideas were generated"}
+            with GENERATIONS_IN_FLIGHT.track_inprogress():
+                final_state = self.workflow.invoke(self._initial_state(niche, web_search_enabled))
+            return self._build_result(final_state, niche, web_search_enabled, cache, cache_key)
                 
         except Exception as e:
             print(f"Workflow execution error: {e}")
             return {"error": f"Workflow failed: {str(e)}"}
+    
+    def stream_ideas(self, niche: str, web_search_enabled: bool = False,
+                     bypass_cache: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Run the workflow, yielding each idea as soon as the LLM has finished it
+        Yields event dicts with a "type" key:
+          - sources: {"sources": [...]} after web search
+          - status: {"status": "web_search_failed", "message": "..."} when web search failed;
+            generation goes on without it and the result has web_search_used False
+          - idea: {"index": i, "idea": {...}} once all fields of idea i are complete
+          - done: {"result": {...}} with the same shape as run_workflow
+          - error: {"error": "..."}
+        """
+        cache, cache_key, cached = self._cache_lookup(niche, web_search_enabled, bypass_cache)
+        if cached is not None:
+            if web_search_enabled:
+                yield {"type": "sources", "sources": cached.get("sources", [])}
+            for index, idea in enumerate(cached["ideas"]):
+                yield {"type": "idea", "index": index, "idea": idea}
+            yield {"type": "done", "result": cached}
+            return
+
+        with GENERATIONS_IN_FLIGHT.track_inprogress():
+            yield from self._stream_generation(niche, web_search_enabled, cache, cache_key)
+
+    def _stream_generation(self, niche: str, web_search_enabled: bool, cache: Optional[IdeaResultCache],
+                           cache_key: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """The uncached part of stream_ideas: search, then stream ideas from the LLM"""
+        state = self._initial_state(niche, web_search_enabled)
+
+        web_search_used = web_search_enabled
+        if web_search_enabled:
+            with WORKFLOW_NODE_DURATION.labels(node="web_search").time():
+                state = self._web_search_node(state)
+            if state.get("error") or not state.get("web_search_results"):
+                web_search_used = False
+                yield {"type": "status", "status": "web_search_failed",
+                       "message": "Web search is unavailable; generating ideas without it."}
+            else:
+                yield {"type": "sources", "sources": state.get("web_search_sources") or []}
+
+        prompt = self._create_prompt(niche, state.get("web_search_results") or "")
+        ideas: List[Dict[str, str]] = []
+        arguments = ""
+        started = time.perf_counter()
+        try:
+            for chunk in self.structured_llm.stream(prompt, timeout=self._remaining(state)):
+                for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                    arguments += tool_chunk.get("args") or ""
+                if not arguments:
+                    continue
+
+                partial = parse_partial_json(arguments)
+                partial_ideas = partial.get("ideas") if isinstance(partial, dict) else None
+                if not isinstance(partial_ideas, list):
+                    continue
+
+                # Once the next idea has started, every idea before it is complete
+                while len(ideas) < len(partial_ideas) - 1:
+                    idea = self._idea_to_dict(BusinessIdeaModel.model_validate(partial_ideas[len(ideas)]))
+                    ideas.append(idea)
+                    yield {"type": "idea", "index": len(ideas) - 1, "idea": idea}
+
+            # The final idea is only known to be complete when the stream ends
+            response = BusinessIdeasResponse.model_validate(json.loads(arguments))
+            for idea in response.ideas[len(ideas):]:
+                ideas.append(self._idea_to_dict(idea))
+                yield {"type": "idea", "index": len(ideas) - 1, "idea": ideas[-1]}
+            # Includes time the client spent reading earlier events
+            WORKFLOW_NODE_DURATION.labels(node="generate_ideas_stream").observe(time.perf_counter() - started)
+
+        except Exception as e:
+            print(f"Idea streaming error: {e}")
+            yield {"type": "error", "error": f"Failed to generate ideas: {str(e)}"}
+            return
+
+        if not ideas:
+            yield {"type": "error", "error": "No ideas were generated"}
+            return
+
+        result = {
+            "ideas": ideas,
+            "web_search_used": web_search_used,
+            "niche": niche,
+            "sources": (state.get("web_search_sources") or []) if web_search_used else []
+        }
+        # Ideas generated without the requested research are not cached for later requests
+        if cache is not None and web_search_used == web_search_enabled:
+            cache.set(cache_key, result)
+        yield {"type": "done", "result": result}
@@ -0,0 +1,189 @@
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import threading
+from typing import Dict, Optional, List
+
+# Source files under static/ that go through the build
+ASSET_SOURCES = ('css/style.css', 'js/main.js')
+# Build output, relative to the static folder; served by routes/assets.py
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# A '/' after one of these keywords starts a regex literal, not a division
+JS_REGEX_KEYWORDS = re.compile(r'(?<![\w$.])(?:return|typeof|case|in|of|delete|void|throw|new|instanceof|do|else|yield|await)$')
+
+CSS_STRINGS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+CSS_STRINGS_AND_COMMENTS = re.compile(CSS_STRINGS.pattern + r'|/\*.*?\*/', re.S)
+
+
+def minify_css(source: str) -> str:
+    """Strip comments and redundant whitespace; string contents are left untouched"""
+    source = CSS_STRINGS_AND_COMMENTS.sub(lambda match: match.group(1) or '', source)
+    # Strings are swapped for numbered placeholders while the rest is squeezed
+    strings: List[str] = []
+
+    def stash(match) -> str:
+        strings.append(match.group(0))
+        return f'"{len(strings) - 1}"'
+
+    squeezed = _squeeze_css(CSS_STRINGS.sub(stash, source))
+    return re.sub(r'"(\d+)"', lambda match: strings[int(match.group(1))], squeezed).strip()
+
+
+def _squeeze_css(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r' ?([{};,>]) ?', r'\1', text)
+    # A declaration's colon is followed by its value and then ';' or '}'; a selector's
+    # (a :hover) runs into '{', and the space before it there is a descendant combinator
+    text = re.sub(r' ?: ?(?=[^{};]*[;}])', ':', text)
+    text = re.sub(r': ', ':', text)
+    return text.replace(';}', '}')
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char in '_$' or ord(char) > 127
+
+
+def minify_js(source: str) -> str:
+    """Conservative JavaScript minifier: drops comments and indentation but keeps line breaks,
+    so automatic semicolon insertion behaves exactly as in the source. Strings, template
+    literals and regex literals are copied verbatim."""
+    out: List[str] = []
+    i, n = 0, len(source)
+    last = ''  # last significant character written
+    while i < n:
+        char = source[i]
+        following = source[i + 1] if i + 1 < n else ''
+
+        if char in '"\'`':
+            end = i + 1
+            while end < n and source[end] != char:
+                end += 2 if source[end] == '\\' else 1
+            out.append(source[i:end + 1])
+            last = char
+            i = end + 1
+        elif char == '/' and following == '/':
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif char == '/' and following == '*':
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif char == '/' and (not last or last in '(,=:[!&|?{};+-*%<>~^'
+                              or (_is_word(last) and JS_REGEX_KEYWORDS.search(''.join(out[-12:])))):
+            # Regex literal; a '/' inside a character class does not end it
+            end, in_class = i + 1, False
+            while end < n and source[end] != '\n':
+                if source[end] == '\\':
+                    end += 2
+                    continue
+                if source[end] == '[':
+                    in_class = True
+                elif source[end] == ']':
+                    in_class = False
+                elif source[end] == '/' and not in_class:
+                    break
+                end += 1
+            end += 1
+            while end < n and source[end].isalpha():
+                end += 1
+            out.append(source[i:end])
+            last = '/'
+            i = end
+        elif char.isspace():
+            end = i
+            while end < n and source[end].isspace():
+                end += 1
+            upcoming = source[end] if end < n else ''
+            at_line_start = not out or out[-1].endswith('\n')
+            if '\n' in source[i:end]:
+                if not at_line_start:
+                    out.append('\n')
+            elif not at_line_start and last and upcoming and (
+                    (_is_word(last) and _is_word(upcoming)) or (last in '+-' and upcoming in '+-')):
+                out.append(' ')
+            i = end
+        else:
+            out.append(char)
+            last = char
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _write_compressed(path: str, data: bytes) -> None:
+    """Write gzip and, when the brotli package is installed, brotli variants next to `path`"""
+    # mtime=0 keeps the .gz byte-identical across builds
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        print("brotli is not installed; skipping .br variants")
+        return
+    with open(path + '.br', 'wb') as f:
+        f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(static_folder: str, sources=ASSET_SOURCES) -> Dict[str, str]:
+    """Minify, fingerprint and precompress the assets; returns and writes the manifest.
+
+    Each source becomes dist/<dir>/<name>.<hash><ext> plus .gz/.br variants,
+    and dist/manifest.json maps the source path to the fingerprinted one.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+
+    manifest: Dict[str, str] = {}
+    for source in sources:
+        with open(os.path.join(static_folder, source), 'r', encoding='utf-8') as f:
+            text = f.read()
+        stem, ext = os.path.splitext(source)
+        minify = MINIFIERS.get(ext)
+        data = (minify(text) if minify else text).encode('utf-8')
+
+        fingerprinted = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        target = os.path.join(dist, fingerprinted)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        _write_compressed(target, data)
+        manifest[source] = fingerprinted
+        print(f"{source}: {len(text.encode('utf-8'))} -> {len(data)} bytes -> {fingerprinted}")
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest(static_folder: str) -> Dict[str, str]:
+    """The build manifest, read once per process; empty when the assets have not been built"""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        _manifest = json.load(f)
+                except FileNotFoundError:
+                    _manifest = {}
+                except Exception as e:
+                    print(f"Error reading asset manifest: {e}")
+                    _manifest = {}
+    return _manifest
+
+
+def fingerprinted_path(static_folder: str, filename: str) -> Optional[str]:
+    """dist-relative path of the built asset for a source filename, or None if it was not built"""
+    return get_manifest(static_folder).get(filename)
@@ -0,0 +1,162 @@
+import csv
+import io
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Iterator, Optional
+from models import BusinessIdea
+from services.workflow_registry import get_workflow
+from services.admission import get_admission_controller, AdmissionRejected
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting calls to `requests_per_minute`"""
+
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, requests_per_minute / 60.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiters: Dict[float, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(requests_per_minute: float) -> RateLimiter:
+    """Return the process-wide limiter for this rate, shared by every bulk run in the worker.
+    Admission control, when on, adds the host-wide limit across workers."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(requests_per_minute)
+        if limiter is None:
+            limiter = _rate_limiters[requests_per_minute] = RateLimiter(requests_per_minute)
+        return limiter
+
+
+def clean_niches(values: List[str]) -> List[str]:
+    """Strip niches and drop blanks and case-insensitive duplicates, keeping order"""
+    niches = []
+    seen = set()
+    for value in values:
+        niche = str(value).strip()
+        if niche and niche.lower() not in seen:
+            seen.add(niche.lower())
+            niches.append(niche)
+    return niches
+
+
+def parse_niches(text: str) -> List[str]:
+    """Read niches from CSV or plain text: the first column of each row, or a `niche` column if there is a header"""
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return []
+
+    column = 0
+    header = [cell.strip().lower() for cell in rows[0]]
+    if 'niche' in header:
+        column = header.index('niche')
+        rows = rows[1:]
+
+    return clean_niches(row[column] for row in rows if len(row) > column)
+
+
+def generate_bulk(niches: List[str], web_search_enabled: bool = False, concurrency: int = 4,
+                  requests_per_minute: float = 60, user_id: Optional[int] = None,
+                  batch_size: int = 25) -> Iterator[Dict[str, Any]]:
+    """
+    Generate ideas for many niches concurrently, yielding one result per niche as it finishes
+    Runs are paced by `requests_per_minute`, shared by all concurrent bulk runs in the process.
+    Results with ideas are saved for `user_id` in multi-row batches of `batch_size`.
+    Yields dicts with type "result" (niche, ideas or error) followed by one "summary".
+    With admission control on, each niche spends a token from the user's bulk bucket
+    and the global bucket before it starts, and holds a workflow slot while it runs.
+    """
+    limiter = get_rate_limiter(requests_per_minute)
+    admission = get_admission_controller()
+    workflow = get_workflow()
+    pending_rows: List[Dict[str, Any]] = []
+    counts = {'succeeded': 0, 'failed': 0, 'saved': 0}
+
+    def run(niche: str) -> Dict[str, Any]:
+        if len(niche) < 3:
+            return {'error': 'Niche must be at least 3 characters.'}
+        limiter.acquire()
+        try:
+            with admission.hold_slot() if admission else nullcontext():
+                return workflow.run_workflow(niche, web_search_enabled)
+        except AdmissionRejected as rejected:
+            return {'error': f"{rejected.reason} Please try again shortly."}
+
+    def flush() -> None:
+        if pending_rows:
+            counts['saved'] += len(BusinessIdea.create_many(pending_rows))
+            pending_rows.clear()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='bulk-ideas')
+    remaining = iter(niches)
+    futures = {}
+
+    def submit_next() -> None:
+        niche = next(remaining, None)
+        if niche is None:
+            return
+        # Tokens are taken here, on the consumer's thread, so a client that goes away stops the spending
+        if admission and len(niche) >= 3:
+            admission.wait_for_bulk_token(user_id)
+        futures[executor.submit(run, niche)] = niche
+
+    try:
+        for _ in range(max(1, concurrency)):
+            submit_next()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                niche = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Bulk generation error for {niche!r}: {e}")
+                    result = {'error': 'An error occurred while generating ideas.'}
+
+                if result and 'ideas' in result:
+                    counts['succeeded'] += 1
+                    if user_id is not None:
+                        pending_rows.append({
+                            'user_id': user_id,
+                            'niche': niche,
+                            'ideas': result['ideas'],
+                            'web_search_used': web_search_enabled
+                        })
+                        if len(pending_rows) >= batch_size:
+                            flush()
+                    yield {'type': 'result', 'niche': niche, 'ideas': result['ideas'],
+                           'sources': result.get('sources', [])}
+                else:
+                    counts['failed'] += 1
+                    yield {'type': 'result', 'niche': niche,
+                           'error': (result or {}).get('error', 'Failed to generate business ideas')}
+                submit_next()
+    finally:
+        # If the consumer stops early (e.g. client disconnect) no further niches start;
+        # still save what already finished
+        executor.shutdown(wait=False, cancel_futures=True)
+        flush()
+
+    yield {'type': 'summary', 'total': len(niches), **counts}
@@ -0,0 +1,86 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Hashable, Tuple
+from services.metrics import CACHE_REQUESTS
+
+FragmentKey = Tuple[Any, str, Hashable]
+
+
+class FragmentCache:
+    """Bounded in-process LRU of rendered HTML fragments, keyed by (row id, template, version).
+
+    Saved ideas never change, so a fragment stays valid for the life of the
+    process; `invalidate` drops every fragment of a row should one ever be
+    rewritten or deleted. Bounded by entry count and total characters.
+    """
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[FragmentKey, str]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: FragmentKey) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        CACHE_REQUESTS.labels(cache='fragments', result='miss' if html is None else 'hit').inc()
+        return html
+
+    def set(self, key: FragmentKey, html: str) -> None:
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = html
+            self._bytes += size
+            # Evict least recently used fragments until both bounds hold
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, row_id) -> None:
+        """Drop every cached fragment rendered from the row with this id"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == row_id]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def _remove(self, key: FragmentKey) -> None:
+        self._bytes -= len(self._entries.pop(key))
+
+
+_fragment_cache = None
+_fragment_cache_lock = threading.Lock()
+
+
+def get_fragment_cache() -> Optional[FragmentCache]:
+    """Return the process-wide fragment cache, or None when disabled via FRAGMENT_CACHE_ENABLED"""
+    global _fragment_cache
+    if os.getenv('FRAGMENT_CACHE_ENABLED', 'True').lower() != 'true':
+        return None
+    if _fragment_cache is None:
+        with _fragment_cache_lock:
+            if _fragment_cache is None:
+                _fragment_cache = FragmentCache(
+                    max_entries=int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', 2000)),
+                    max_bytes=int(os.getenv('FRAGMENT_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+                )
+    return _fragment_cache
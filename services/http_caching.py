@@ -0,0 +1,76 @@
+import os
+import hashlib
+import threading
+from typing import Optional
+from flask import current_app, request, session, make_response, get_flashed_messages, Response
+
+_release = None
+_release_lock = threading.Lock()
+
+
+def _release_fingerprint() -> str:
+    """Identifies the deployed templates and static files, so a deploy invalidates every ETag.
+
+    Set ETAG_RELEASE (e.g. to the git commit) to skip scanning the files.
+    """
+    global _release
+    if _release is None:
+        with _release_lock:
+            if _release is None:
+                release = os.getenv('ETAG_RELEASE')
+                if not release:
+                    digest = hashlib.sha1()
+                    for folder in (current_app.template_folder, current_app.static_folder):
+                        root = os.path.join(current_app.root_path, folder) if folder else None
+                        for dirpath, dirnames, filenames in os.walk(root or ''):
+                            dirnames.sort()
+                            for filename in sorted(filenames):
+                                stat = os.stat(os.path.join(dirpath, filename))
+                                digest.update(f"{dirpath}/{filename}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+                    release = digest.hexdigest()[:12]
+                _release = release
+    return _release
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given values, the signed-in user and the current release"""
+    key = '|'.join(str(part) for part in (_release_fingerprint(), session.get('user_id'),
+                                          session.get('user_email'), *parts))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _cache_headers(response: Response, etag: str) -> Response:
+    response.set_etag(etag)
+    # Browsers may keep the page but must revalidate; shared caches must not store it
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def not_modified(etag: str) -> Optional[Response]:
+    """A 304 response when the client already has this version of the page, else None.
+
+    Never 304s while flash messages are pending, since the cached copy would not show them.
+    """
+    if '_flashes' in session or not request.if_none_match.contains_weak(etag):
+        return None
+    return _cache_headers(Response(status=304), etag)
+
+
+def _showed_flashes() -> bool:
+    """Whether this request's render consumed flash messages"""
+    # Flashes still in the session were not consumed; calling get_flashed_messages would consume them
+    return '_flashes' not in session and bool(get_flashed_messages())
+
+
+def with_etag(rendered, etag: str) -> Response:
+    """Turn a view's return value into a response carrying the ETag and private cache headers.
+
+    A page that showed flash messages is not stored at all: a later 304 would
+    replay messages that were already shown.
+    """
+    response = make_response(rendered)
+    if _showed_flashes():
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    return _cache_headers(response, etag)
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from typing import Iterator, Iterable, Dict, Any
+from models import BusinessIdea
+
+# Export format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+}
+
+CSV_COLUMNS = ('session_id', 'created_at', 'niche', 'web_search_used', 'idea_number',
+               'name', 'pitch', 'audience', 'revenue_model')
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def idea_record(business_idea: BusinessIdea) -> Dict[str, Any]:
+    """One saved generation (a business_ideas row) as exported in NDJSON and JSON"""
+    return {
+        'id': business_idea.id,
+        'niche': business_idea.niche,
+        'web_search_used': business_idea.web_search_used,
+        'created_at': business_idea.created_at,
+        'ideas': business_idea.ideas,
+    }
+
+
+def _spreadsheet_safe(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _ndjson_lines(business_ideas: Iterable[BusinessIdea]) -> Iterator[str]:
+    for business_idea in business_ideas:
+        yield json.dumps(idea_record(business_idea)) + '\n'
+
+
+def _json_array(business_ideas: Iterable[BusinessIdea]) -> Iterator[str]:
+    separator = '[\n'
+    for business_idea in business_ideas:
+        yield separator + json.dumps(idea_record(business_idea))
+        separator = ',\n'
+    # Still '[\n' when there were no rows
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def _csv_rows(business_ideas: Iterable[BusinessIdea]) -> Iterator[str]:
+    """One row per idea; a saved generation without ideas still gets a row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def render(row) -> str:
+        writer.writerow([_spreadsheet_safe(value) for value in row])
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    # The byte order mark makes Excel read the file as UTF-8
+    yield '\ufeff' + render(CSV_COLUMNS)
+    for business_idea in business_ideas:
+        session_fields = [business_idea.id, business_idea.created_at, business_idea.niche,
+                          business_idea.web_search_used]
+        if not business_idea.ideas:
+            yield render(session_fields + [''] * 5)
+        for number, idea in enumerate(business_idea.ideas, start=1):
+            yield render(session_fields + [number, idea.get('name', ''), idea.get('pitch', ''),
+                                           idea.get('audience', ''), idea.get('revenue_model', '')])
+
+
+WRITERS = {'ndjson': _ndjson_lines, 'csv': _csv_rows, 'json': _json_array}
+
+
+def _batched(parts: Iterator[str], size: int) -> Iterator[str]:
+    """Join `size` parts per write, so the server sends chunks rather than one write per row"""
+    batch = []
+    for part in parts:
+        batch.append(part)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def export_ideas(user_id: int, export_format: str, chunk_size: int = 500) -> Iterator[str]:
+    """Stream a user's whole idea history, newest first, in one of EXPORT_FORMATS.
+
+    Rows are read `chunk_size` at a time by keyset pagination and written as they
+    arrive, so memory stays constant however many rows the user has. A database
+    error ends the stream early instead of producing a silently truncated file.
+    """
+    rows = BusinessIdea.iter_by_user_id(user_id, chunk_size=chunk_size)
+    return _batched(WRITERS[export_format](rows), chunk_size)
@@ -1,4 +1,6 @@
 from models import BusinessIdea
+from services.write_behind import get_write_behind
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 class IdeaStorageService:
@@ -17,9 +19,20 @@ class IdeaStorageService:
             web_search_used: Whether web search was used in generation
             
         Returns:
-            BusinessIdea object if successful, None otherwise
+            BusinessIdea object if successful, None otherwise. With write-behind
+            enabled the row is buffered and the returned object has no id yet.
         """
         try:
+            buffer = get_write_behind()
+            if buffer is not None and buffer.submit(user_id, niche, ideas, web_search_used):
+                return BusinessIdea(
+                    user_id=user_id,
+                    niche=niche,
+                    ideas=ideas,
+                    web_search_used=web_search_used,
+                    created_at=datetime.now().isoformat()
+                )
+            
             return BusinessIdea.create(
                 user_id=user_id,
                 niche=niche,
@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import tempfile
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable
+from services.idea_storage import IdeaStorageService
+from services.workflow_registry import get_workflow
+from services.admission import get_admission_controller, AdmissionRejected
+from services.metrics import JOB_QUEUE_PENDING, on_scrape
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has reached its depth limit"""
+
+
+class Job:
+    """A snapshot of one background idea-generation job, as stored in the queue"""
+
+    TERMINAL_STATUSES = ('completed', 'failed')
+    COLUMNS = ('id', 'user_id', 'niche', 'web_search_enabled', 'bypass_cache', 'status', 'result',
+               'error', 'idea_id', 'created_at', 'started_at', 'finished_at', 'version')
+
+    def __init__(self, id: str, user_id: int, niche: str, web_search_enabled: bool = False,
+                 bypass_cache: bool = False, status: str = 'queued', result: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None, idea_id: Optional[int] = None, created_at: float = None,
+                 started_at: Optional[float] = None, finished_at: Optional[float] = None, version: int = 0):
+        self.id = id
+        self.user_id = user_id
+        self.niche = niche
+        self.web_search_enabled = bool(web_search_enabled)
+        self.bypass_cache = bool(bypass_cache)
+        self.status = status
+        self.result = result
+        self.error = error
+        self.idea_id = idea_id
+        self.created_at = created_at
+        self.started_at = started_at
+        self.finished_at = finished_at
+        # Bumped on every status change so listeners can tell when to send an update
+        self.version = version
+
+    @staticmethod
+    def from_row(row) -> 'Job':
+        fields = dict(zip(Job.COLUMNS, row))
+        fields['result'] = json.loads(fields['result']) if fields['result'] else None
+        return Job(**fields)
+
+    @property
+    def done(self) -> bool:
+        return self.status in self.TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'niche': self.niche,
+            'web_search_used': self.web_search_enabled,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == 'completed' and self.result:
+            data['ideas'] = self.result.get('ideas', [])
+            data['sources'] = self.result.get('sources', [])
+            data['idea_id'] = self.idea_id
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+def run_generation_job(job: Job) -> Dict[str, Any]:
+    """Run the AI workflow for a job and save the result; returns the job fields to store.
+    The admission token was spent at submit time; the run holds a workflow slot."""
+    admission = get_admission_controller()
+    try:
+        with admission.hold_slot() if admission else nullcontext():
+            result = get_workflow().run_workflow(job.niche, job.web_search_enabled, bypass_cache=job.bypass_cache)
+    except AdmissionRejected as rejected:
+        return {'status': 'failed', 'error': f"{rejected.reason} Please try again shortly."}
+    if not result or 'ideas' not in result:
+        return {'status': 'failed', 'error': (result or {}).get('error', 'Failed to generate business ideas')}
+
+    business_idea = IdeaStorageService.save_ideas(
+        user_id=job.user_id,
+        niche=job.niche,
+        ideas=result['ideas'],
+        web_search_used=job.web_search_enabled
+    )
+    return {'status': 'completed', 'result': result, 'idea_id': business_idea.id if business_idea else None}
+
+
+class LocalJobQueue:
+    """Job queue without an external broker.
+
+    Jobs run on a bounded thread pool in the worker that accepted them, while
+    their state lives in a SQLite file shared by every worker on the host, so
+    status and event requests can land on any worker. The depth limit counts
+    the host's unfinished jobs. Finished jobs are dropped `ttl_seconds` after
+    they finish; jobs whose worker died are failed after `stale_seconds`.
+    """
+
+    def __init__(self, path: str, runner: Callable[[Job], Dict[str, Any]] = run_generation_job,
+                 max_workers: int = 4, max_depth: int = 50, ttl_seconds: float = 900,
+                 stale_seconds: float = 600, poll_interval: float = 0.25):
+        self.path = path
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='idea-job')
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS generation_jobs ('
+            ' id TEXT PRIMARY KEY, user_id INTEGER NOT NULL, niche TEXT NOT NULL,'
+            ' web_search_enabled INTEGER NOT NULL, bypass_cache INTEGER NOT NULL, status TEXT NOT NULL,'
+            ' result TEXT, error TEXT, idea_id INTEGER, created_at REAL NOT NULL,'
+            ' started_at REAL, finished_at REAL, version INTEGER NOT NULL DEFAULT 0)'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def pending(self) -> int:
+        """Number of jobs queued or running on this host"""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM generation_jobs WHERE status NOT IN ('completed', 'failed')"
+        ).fetchone()[0]
+
+    def submit(self, user_id: int, niche: str, web_search_enabled: bool = False,
+               bypass_cache: bool = False, admit: Optional[Callable[[], None]] = None) -> Job:
+        """Queue a generation job, raising QueueFullError when over the depth limit.
+        `admit` runs once the depth check has passed, before the job is stored;
+        anything it raises cancels the submission."""
+        self.cleanup()
+        job = Job(uuid.uuid4().hex, user_id, niche, web_search_enabled, bypass_cache, created_at=time.time())
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM generation_jobs WHERE status NOT IN ('completed', 'failed')"
+            ).fetchone()[0]
+            if pending >= self.max_depth:
+                raise QueueFullError(f"Job queue is full ({pending} pending)")
+            if admit:
+                admit()
+            conn.execute(
+                'INSERT INTO generation_jobs (id, user_id, niche, web_search_enabled, bypass_cache, status, created_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job.id, user_id, niche, int(job.web_search_enabled), int(job.bypass_cache), job.status, job.created_at)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._executor.submit(self._execute, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute(
+            f'SELECT {", ".join(Job.COLUMNS)} FROM generation_jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        return Job.from_row(row) if row else None
+
+    def wait_for_change(self, job_id: str, version: int, timeout: float) -> Optional[Job]:
+        """Poll until the job changes past `version` or the timeout expires; None if it is gone"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.version != version or time.monotonic() >= deadline:
+                return job
+            time.sleep(self.poll_interval)
+
+    def cleanup(self) -> int:
+        """Fail jobs whose worker went away and drop finished jobs older than the TTL;
+        returns how many were removed"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "UPDATE generation_jobs SET status = 'failed', error = 'The job was interrupted.',"
+            " finished_at = ?, version = version + 1"
+            " WHERE status NOT IN ('completed', 'failed') AND created_at < ?",
+            (now, now - self.stale_seconds)
+        )
+        return conn.execute('DELETE FROM generation_jobs WHERE finished_at < ?', (now - self.ttl_seconds,)).rowcount
+
+    def _update(self, job_id: str, **fields) -> None:
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result']) if fields['result'] is not None else None
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        self._connection().execute(
+            f'UPDATE generation_jobs SET {assignments}, version = version + 1 WHERE id = ?',
+            (*fields.values(), job_id)
+        )
+
+    def _execute(self, job: Job) -> None:
+        self._update(job.id, status='running', started_at=time.time())
+        try:
+            fields = self.runner(job)
+        except Exception as e:
+            print(f"Error running job {job.id}: {e}")
+            fields = {'status': 'failed', 'error': 'An error occurred while generating ideas.'}
+        if fields.get('status') not in Job.TERMINAL_STATUSES:
+            fields = {'status': 'failed', 'error': 'Job finished without a result'}
+        try:
+            self._update(job.id, finished_at=time.time(), **fields)
+        except Exception as e:
+            print(f"Error recording job {job.id}: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the worker's job queue, creating it from env config on first use"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                backend = os.getenv('JOB_QUEUE_BACKEND', 'local').lower()
+                if backend != 'local':
+                    raise ValueError(f"Unsupported JOB_QUEUE_BACKEND: {backend}")
+                _job_queue = LocalJobQueue(
+                    path=os.getenv('JOB_QUEUE_PATH') or os.path.join(tempfile.gettempdir(), 'idea_jobs.sqlite3'),
+                    max_workers=int(os.getenv('JOB_QUEUE_WORKERS', 4)),
+                    max_depth=int(os.getenv('JOB_QUEUE_MAX_DEPTH', 50)),
+                    ttl_seconds=float(os.getenv('JOB_TTL_SECONDS', 900)),
+                    stale_seconds=float(os.getenv('JOB_STALE_SECONDS', 600))
+                )
+                on_scrape(lambda: JOB_QUEUE_PENDING.set(_job_queue.pending()))
+    return _job_queue
@@ -0,0 +1,287 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Any, Iterator
+from services.metrics import LLM_HEDGES, LLM_CIRCUIT_EVENTS, LLM_CIRCUIT_OPEN
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and no fallback model is configured"""
+
+
+class LatencyWindow:
+    """The most recent `size` call latencies, for percentile-based hedge delays"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(percent / 100 * len(samples))) - 1))
+        return samples[index]
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over the last `window` calls.
+
+    Opens when at least `min_calls` outcomes are recorded and the failure
+    ratio reaches `failure_ratio`. After `reset_seconds` one trial call is
+    let through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_ratio: float = 0.5, window: int = 20, min_calls: int = 10,
+                 reset_seconds: float = 30.0):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the protected model right now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._close()
+            else:
+                self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (self.state == self.CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_ratio):
+                self._open()
+
+    def release(self) -> None:
+        """Call after every permitted call, in a finally block. A half-open trial that ended
+        without an outcome (cancelled, abandoned) lets the next call through as the trial."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_running = False
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_running = False
+        LLM_CIRCUIT_EVENTS.labels(event='opened').inc()
+        LLM_CIRCUIT_OPEN.set(1)
+
+    def _close(self) -> None:
+        self.state = self.CLOSED
+        self._outcomes.clear()
+        self._trial_running = False
+        LLM_CIRCUIT_EVENTS.labels(event='closed').inc()
+        LLM_CIRCUIT_OPEN.set(0)
+
+
+class ResilientLLM:
+    """Hedging, deadlines and circuit breaking around a structured-output LLM.
+
+    A call that has not answered by the `hedge_percentile` of recent
+    latencies gets a duplicate request; whichever answers first wins and
+    the other is abandoned. Abandoned calls keep their pool thread until they
+    return, so no hedge is sent while every thread is busy. Every call is bounded
+    by a deadline, normally what is left of the request budget. While the
+    breaker is open, calls go to `fallback` or fail fast with CircuitOpenError.
+    `stream` does the same for the streaming variants of the models, without hedging.
+    """
+
+    def __init__(self, primary, fallback=None, breaker: Optional[CircuitBreaker] = None,
+                 hedge_percentile: float = 95.0, hedge_min_samples: int = 20,
+                 hedge_min_delay: float = 0.5, timeout: float = 30.0,
+                 stream_primary=None, stream_fallback=None):
+        self.primary = primary
+        self.fallback = fallback
+        self.stream_primary = stream_primary
+        self.stream_fallback = stream_fallback
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = LatencyWindow()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.timeout = timeout
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples (or hedging is off)"""
+        if self.hedge_percentile <= 0 or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latencies.percentile(self.hedge_percentile))
+
+    def _choose(self, streaming: bool = False):
+        """(llm, protected) for the next call; protected calls report to the breaker"""
+        primary, fallback = (self.stream_primary, self.stream_fallback) if streaming else (self.primary, self.fallback)
+        if self.breaker.allow():
+            return primary, True
+        if fallback is not None:
+            LLM_CIRCUIT_EVENTS.labels(event='fallback').inc()
+            return fallback, False
+        LLM_CIRCUIT_EVENTS.labels(event='rejected').inc()
+        raise CircuitOpenError("LLM circuit breaker is open")
+
+    def _record(self, protected: bool, ok: bool, seconds: Optional[float] = None) -> None:
+        if seconds is not None and protected:
+            self.latencies.add(seconds)
+        if protected:
+            if ok:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _budget(self, timeout: Optional[float]) -> float:
+        return self.timeout if timeout is None else min(self.timeout, timeout)
+
+    def invoke(self, prompt, timeout: Optional[float] = None) -> Any:
+        """Blocking call; `timeout` is the caller's remaining budget in seconds"""
+        budget = self._budget(timeout)
+        if budget <= 0:
+            raise TimeoutError("No time left in the request budget for the LLM call")
+        llm, protected = self._choose()
+        try:
+            return self._invoke(llm, protected, prompt, budget)
+        finally:
+            if protected:
+                self.breaker.release()
+
+    def _invoke(self, llm, protected: bool, prompt, budget: float) -> Any:
+
+        started = time.monotonic()
+        hedge_after = self.hedge_delay()
+        futures = {_submit(llm.invoke, prompt): 'primary'}
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                elapsed = time.monotonic() - started
+                if elapsed >= budget:
+                    break
+                hedging = hedge_after is not None and len(futures) == 1
+                wait_for = min(budget, hedge_after) - elapsed if hedging else budget - elapsed
+                done, pending = wait(pending, timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if futures[future] == 'hedge':
+                            LLM_HEDGES.labels(outcome='won').inc()
+                        self._record(protected, True, time.monotonic() - started)
+                        return future.result()
+                    error = future.exception()
+                if not done and hedging and time.monotonic() - started >= hedge_after:
+                    if _pool_saturated():
+                        # A hedge would only queue behind the calls already running
+                        LLM_HEDGES.labels(outcome='skipped').inc()
+                        hedge_after = None
+                        continue
+                    LLM_HEDGES.labels(outcome='fired').inc()
+                    hedge = _submit(llm.invoke, prompt)
+                    futures[hedge] = 'hedge'
+                    pending.add(hedge)
+        finally:
+            for future in pending:
+                # Running calls cannot be interrupted; their results are discarded
+                future.cancel()
+
+        self._record(protected, False)
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"LLM call exceeded its {budget:.2f}s deadline")
+
+    def stream(self, prompt, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Stream chunks from the streaming model; circuit-broken and bounded by the deadline
+        (checked as chunks arrive, with the HTTP timeout bounding each wait), but not hedged"""
+        budget = self._budget(timeout)
+        if budget <= 0:
+            raise TimeoutError("No time left in the request budget for the LLM call")
+        llm, protected = self._choose(streaming=True)
+
+        started = time.monotonic()
+        try:
+            for chunk in llm.stream(prompt):
+                if time.monotonic() - started >= budget:
+                    raise TimeoutError(f"LLM stream exceeded its {budget:.2f}s deadline")
+                yield chunk
+        except Exception:
+            self._record(protected, False)
+            raise
+        else:
+            self._record(protected, True)
+        finally:
+            # A consumer that stops reading closes the generator without an outcome
+            if protected:
+                self.breaker.release()
+
+
+_executor = None
+_executor_size = 0
+_in_flight = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared pool for sync LLM calls and their hedges.
+
+    Sized at twice WSGI_THREADS by default, so calls abandoned at their
+    deadline (still running until the API answers) leave room for new ones.
+    """
+    global _executor, _executor_size
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor_size = int(os.getenv('LLM_THREADS') or 2 * int(os.getenv('WSGI_THREADS', 32)))
+                _executor = ThreadPoolExecutor(max_workers=_executor_size, thread_name_prefix='llm')
+    return _executor
+
+
+def _submit(func, *args) -> Future:
+    """Run func on the shared pool; it counts as in flight until it returns, even if abandoned"""
+    global _in_flight
+    executor = _get_executor()
+    with _executor_lock:
+        _in_flight += 1
+    future = executor.submit(func, *args)
+    future.add_done_callback(_call_finished)
+    return future
+
+
+def _call_finished(future: Future) -> None:
+    global _in_flight
+    with _executor_lock:
+        _in_flight -= 1
+
+
+def _pool_saturated() -> bool:
+    """Whether every pool thread is busy (or spoken for)"""
+    with _executor_lock:
+        return _in_flight >= _executor_size
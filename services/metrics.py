@@ -0,0 +1,107 @@
+import os
+import atexit
+import functools
+from prometheus_client import (Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST,
+                               generate_latest, multiprocess)
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported), every worker
+# writes its samples to files in that directory and /metrics aggregates them all.
+# Gauges say how to combine per-worker values; dead workers' live gauges are dropped.
+
+# Workflow
+WORKFLOW_NODE_DURATION = Histogram(
+    'idea_workflow_node_duration_seconds', 'Time spent in each idea workflow node', ['node'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+GENERATIONS_IN_FLIGHT = Gauge('idea_generations_in_flight', 'Idea generations currently running (cache misses)',
+                              multiprocess_mode='livesum')
+LLM_TOKENS = Counter('idea_llm_tokens_total', 'Tokens reported by the LLM API', ['model', 'kind'])
+PROMPT_TOKENS = Histogram(
+    'idea_prompt_tokens', 'Prompt size per request in tokens, by part', ['part'],
+    buckets=(50, 100, 200, 300, 400, 500, 750, 1000, 1500, 2000, 4000)
+)
+LLM_HEDGES = Counter('idea_llm_hedges_total', 'Hedged duplicate LLM requests, fired, won or skipped (pool busy)', ['outcome'])
+LLM_CIRCUIT_EVENTS = Counter(
+    'idea_llm_circuit_events_total', 'LLM circuit breaker transitions and the calls it diverted', ['event']
+)
+LLM_CIRCUIT_OPEN = Gauge('idea_llm_circuit_open', 'Whether the primary LLM circuit breaker is open (1) or not (0)',
+                         multiprocess_mode='livemax')
+CACHE_REQUESTS = Counter('idea_cache_requests_total', 'Cache lookups by cache and outcome', ['cache', 'result'])
+
+# Admission control
+ADMISSION_DECISIONS = Counter(
+    'idea_admission_decisions_total', 'Generation requests admitted, queued or rejected, by reason', ['result']
+)
+ADMISSION_WAIT = Histogram(
+    'idea_admission_wait_seconds', 'Time admitted generation requests waited for a workflow slot',
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+COALESCED_REQUESTS = Counter(
+    'idea_coalesced_requests_total', 'Generation requests that ran the workflow (leader) or shared a running one (follower)',
+    ['role']
+)
+
+# Web search
+TAVILY_DURATION = Histogram(
+    'idea_tavily_request_duration_seconds', 'Latency of Tavily search requests',
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30)
+)
+TAVILY_RESULTS = Histogram(
+    'idea_tavily_results', 'Results returned per Tavily search request',
+    buckets=(0, 1, 2, 3, 5, 8, 10, 20)
+)
+TAVILY_ERRORS = Counter('idea_tavily_errors_total', 'Failed Tavily search requests')
+
+# Database
+DB_CALL_DURATION = Histogram(
+    'idea_db_call_duration_seconds', 'Latency of model database calls', ['method'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+# Background queues. The job queue is shared by the host, so its depth is read by
+# whichever worker is scraped; each worker sets its own write-behind depth as it changes.
+JOB_QUEUE_PENDING = Gauge('idea_job_queue_pending', 'Generation jobs queued or running',
+                          multiprocess_mode='livemostrecent')
+WRITE_BEHIND_DEPTH = Gauge('idea_write_behind_depth', 'Idea rows waiting in the write-behind buffer',
+                           multiprocess_mode='livesum')
+
+_scrape_hooks = []
+
+
+def timed_db_call(func):
+    """Record a model method's latency in DB_CALL_DURATION, labelled with its qualified name"""
+    histogram = DB_CALL_DURATION.labels(method=func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with histogram.time():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def on_scrape(hook) -> None:
+    """Run `hook` before each /metrics render, to set gauges that are read on demand"""
+    _scrape_hooks.append(hook)
+
+
+def render_metrics():
+    """Return (body, content type) for the Prometheus text exposition format"""
+    for hook in _scrape_hooks:
+        try:
+            hook()
+        except Exception as e:
+            print(f"Error refreshing metrics: {e}")
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def _mark_process_dead() -> None:
+    # Drops this worker's live gauge files so they stop counting
+    multiprocess.mark_process_dead(os.getpid())
+
+
+if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    atexit.register(_mark_process_dead)
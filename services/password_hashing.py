@@ -0,0 +1,103 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Optional
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+
+class HashingBusyError(Exception):
+    """Raised when too many hashing requests are already waiting for the pool"""
+
+
+def normalize_method(method: str) -> str:
+    """Expand a werkzeug hash method to the full prefix it writes, e.g. pbkdf2:sha256 -> pbkdf2:sha256:600000"""
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    if parts[0] == 'scrypt':
+        n, r, p = (parts[1:] + ['32768', '8', '1'][len(parts) - 1:])[:3]
+        return f"scrypt:{n}:{r}:{p}"
+    return method
+
+
+class PasswordHasher:
+    """Runs password hashing in a dedicated, size-limited process pool.
+
+    Keeps CPU-bound PBKDF2/scrypt rounds off the request threads. At most
+    `max_pending` operations may be queued or running; beyond that calls
+    fail fast with HashingBusyError so the caller can answer 503.
+    """
+
+    def __init__(self, method: str = 'pbkdf2:sha256', max_workers: int = 2,
+                 max_pending: int = 32, timeout: float = 10):
+        self.method = method
+        self.target_prefix = normalize_method(method)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn avoids forking a multi-threaded server process
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusyError("Password hashing pool is saturated")
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the work finishes, even after the caller stops waiting on a timeout
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            raise HashingBusyError("Password hashing timed out")
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        """Check a password against a stored hash"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True when a stored hash was made with a different method or cost than configured"""
+        return pwhash.split('$', 1)[0] != self.target_prefix
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher configured from env"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    method=os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256'),
+                    max_workers=int(os.getenv('PASSWORD_HASH_WORKERS', 2)),
+                    max_pending=int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32)),
+                    timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+                )
+    return _hasher
@@ -0,0 +1,140 @@
+import re
+import threading
+from typing import List, Dict, Optional
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from services.metrics import PROMPT_TOKENS
+
+# Identical for every request, so it goes first where provider-side prompt
+# caching can reuse it; anything request-specific belongs in the user message.
+STATIC_INSTRUCTIONS = """You are a professional startup ideation assistant with expertise in market analysis and business development.
+
+The user gives you a niche and, sometimes, recent market research for it.
+
+Generate EXACTLY 3 innovative and viable startup ideas for this niche.
+
+For each idea, provide:
+- A compelling startup name
+- A one-paragraph pitch that clearly explains the value proposition
+- The specific target audience
+- A realistic revenue model
+
+Focus on:
+- Market gaps and opportunities
+- Scalable business models
+- Current technology trends
+- Practical implementation
+
+When market research is provided, ground the ideas in it.
+
+Ensure each idea is unique, feasible, and addresses real market needs."""
+
+# Research scaffolding lines, which carry no market information
+SCAFFOLDING = re.compile(r'^(source:\s|recent market insights:)', re.IGNORECASE)
+
+# Navigation and footer fragments; a line is only dropped for these when it is
+# short enough to be nothing else and does not mention the niche
+BOILERPLATE = re.compile(
+    r'\b(cookies?|subscribe|sign up|log in|all rights reserved|privacy policy|terms of (use|service)'
+    r'|click here|read more|advertisement|newsletter|javascript)\b',
+    re.IGNORECASE
+)
+BOILERPLATE_MAX_WORDS = 8
+STOPWORDS = {'and', 'for', 'the', 'with', 'from', 'into', 'over'}
+
+_encodings: Dict[str, object] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model_name: str):
+    """tiktoken encoding for a model, or None when tiktoken or its BPE files are unavailable"""
+    with _encodings_lock:
+        if model_name not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model_name] = tiktoken.encoding_for_model(model_name)
+                except KeyError:
+                    _encodings[model_name] = tiktoken.get_encoding('o200k_base')
+            except Exception as e:
+                print(f"Token counting falls back to estimates: {e}")
+                _encodings[model_name] = None
+        return _encodings[model_name]
+
+
+class PromptBuilder:
+    """Builds the idea-generation prompt as a static system prefix plus a small user message.
+
+    Web research is compressed to `context_tokens` real tokens: scaffolding,
+    short navigation/footer lines and repeated sentences are dropped, and
+    sentences are kept in their ranked order until the budget is spent.
+    """
+
+    def __init__(self, model_name: str, context_tokens: int = 500):
+        self.model_name = model_name
+        self.context_tokens = context_tokens
+        self.static_tokens = self.count_tokens(STATIC_INSTRUCTIONS)
+
+    def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = _encoding(self.model_name)
+        if encoding is None:
+            # Roughly four characters per token for English text
+            return len(text) // 4 + 1
+        return len(encoding.encode(text, disallowed_special=()))
+
+    @staticmethod
+    def _is_boilerplate(line: str, niche_terms: set) -> bool:
+        """True for a short line of navigation or footer text that never mentions the niche"""
+        words = re.findall(r'[a-z0-9]+', line.lower())
+        if len(words) > BOILERPLATE_MAX_WORDS or niche_terms.intersection(words):
+            return False
+        return bool(BOILERPLATE.search(line))
+
+    def compress_context(self, web_data: str, niche: str = "") -> str:
+        """Shrink research text to the token budget without cutting sentences in half"""
+        if not web_data or self.context_tokens <= 0:
+            return ""
+
+        niche_terms = {term for term in re.findall(r'[a-z0-9]+', niche.lower())
+                       if len(term) > 2 and term not in STOPWORDS}
+        kept: List[str] = []
+        seen = set()
+        used = 0
+        for line in web_data.splitlines():
+            line = line.strip()
+            if SCAFFOLDING.match(line) or self._is_boilerplate(line, niche_terms):
+                continue
+            sentences = re.split(r'(?<=[.!?])\s+', line)
+            kept_sentences = []
+            for sentence in sentences:
+                key = re.sub(r'[^a-z0-9]+', ' ', sentence.lower()).strip()
+                if not key or key in seen:
+                    continue
+                tokens = self.count_tokens(sentence) + 1
+                if used + tokens > self.context_tokens:
+                    break
+                seen.add(key)
+                kept_sentences.append(sentence)
+                used += tokens
+            if kept_sentences:
+                kept.append(' '.join(kept_sentences))
+            if used >= self.context_tokens:
+                break
+
+        return '\n'.join(kept)
+
+    def build(self, niche: str, web_data: Optional[str] = None) -> List[BaseMessage]:
+        """Messages for one request; records the prompt size per part in PROMPT_TOKENS"""
+        user_message = f'Niche: "{niche}"'
+        context = self.compress_context(web_data or "", niche)
+        if context:
+            user_message += f"\n\nRecent market research and trends:\n{context}"
+
+        context_tokens = self.count_tokens(context)
+        user_tokens = self.count_tokens(user_message)
+        PROMPT_TOKENS.labels(part='static').observe(self.static_tokens)
+        PROMPT_TOKENS.labels(part='context').observe(context_tokens)
+        PROMPT_TOKENS.labels(part='total').observe(self.static_tokens + user_tokens)
+
+        return [SystemMessage(content=STATIC_INSTRUCTIONS), HumanMessage(content=user_message)]
@@ -0,0 +1,151 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Optional, Dict, Any
+from services.result_cache import normalize_niche
+from services.metrics import COALESCED_REQUESTS
+
+# Idempotency tokens come from the form; anything else is ignored
+TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+class InFlightRegistry:
+    """Coalesces identical generation requests across all workers on the host.
+
+    The first request for a key becomes the leader and runs the workflow.
+    Identical requests that arrive while it runs, or within `result_seconds`
+    after it finishes, wait for and share its result instead of generating
+    and saving again. Requests that carry an idempotency token are also keyed
+    on the token and keep their result for `token_seconds`, so re-posting the
+    same form (refresh, back button) returns the saved result. A leader that
+    disappears without finishing is taken over after `stale_seconds`.
+    """
+
+    def __init__(self, path: str, result_seconds: float = 10.0, token_seconds: float = 600.0,
+                 stale_seconds: float = 90.0, poll_interval: float = 0.1):
+        self.path = path
+        self.result_seconds = result_seconds
+        self.token_seconds = token_seconds
+        self.stale_seconds = stale_seconds
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS inflight_generations ('
+            ' key TEXT PRIMARY KEY, started_at REAL NOT NULL,'
+            ' finished_at REAL, keep_seconds REAL NOT NULL, result TEXT)'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(user_id, niche: str, web_search_enabled: bool, bypass_cache: bool = False,
+                 token: Optional[str] = None) -> str:
+        """Fresh (cache-bypassing) requests never share a generation with cached ones.
+        A token only narrows the key: reused with another niche or web search flag, it never
+        replays the earlier result."""
+        key = f"{user_id}|{int(bool(web_search_enabled))}|{int(bool(bypass_cache))}|{normalize_niche(niche)}"
+        if token and TOKEN_PATTERN.match(token):
+            return f"{key}|token|{token}"
+        return key
+
+    def claim(self, key: str) -> bool:
+        """True when the caller becomes the leader for `key` and must complete() or abandon() it"""
+        now = time.time()
+        keep_seconds = self.token_seconds if '|token|' in key else self.result_seconds
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT started_at, finished_at, keep_seconds FROM inflight_generations WHERE key = ?',
+                               (key,)).fetchone()
+            if row is not None:
+                started_at, finished_at, kept = row
+                live = now - started_at < self.stale_seconds if finished_at is None else now - finished_at < kept
+                if live:
+                    conn.execute('COMMIT')
+                    COALESCED_REQUESTS.labels(role='follower').inc()
+                    return False
+            conn.execute(
+                'INSERT OR REPLACE INTO inflight_generations (key, started_at, finished_at, keep_seconds, result)'
+                ' VALUES (?, ?, NULL, ?, NULL)',
+                (key, now, keep_seconds)
+            )
+            conn.execute(
+                'DELETE FROM inflight_generations WHERE finished_at < ? - keep_seconds OR started_at < ?',
+                (now, now - max(self.token_seconds, self.stale_seconds) - self.stale_seconds)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        COALESCED_REQUESTS.labels(role='leader').inc()
+        return True
+
+    def complete(self, key: str, result: Dict[str, Any]) -> None:
+        """Publish the leader's result to current and later followers"""
+        try:
+            self._connection().execute(
+                'UPDATE inflight_generations SET finished_at = ?, result = ? WHERE key = ?',
+                (time.time(), json.dumps(result), key)
+            )
+        except Exception as e:
+            print(f"Error publishing coalesced result: {e}")
+
+    def abandon(self, key: str) -> None:
+        """Give up leadership without a result; waiting followers see a failure. No-op after complete()."""
+        try:
+            self._connection().execute('DELETE FROM inflight_generations WHERE key = ? AND finished_at IS NULL', (key,))
+        except Exception as e:
+            print(f"Error abandoning coalesced request: {e}")
+
+    def _poll(self, key: str):
+        """(done, result): done once the leader has finished or gone away"""
+        row = self._connection().execute(
+            'SELECT started_at, finished_at, result FROM inflight_generations WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return True, None
+        started_at, finished_at, result = row
+        if finished_at is not None:
+            return True, json.loads(result) if result else None
+        if time.time() - started_at >= self.stale_seconds:
+            return True, None
+        return False, None
+
+    def wait(self, key: str) -> Optional[Dict[str, Any]]:
+        """Block until the leader finishes; returns its result, or None if it failed"""
+        while True:
+            done, result = self._poll(key)
+            if done:
+                return result
+            time.sleep(self.poll_interval)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_inflight_registry() -> Optional[InFlightRegistry]:
+    """Return the process-wide in-flight registry, or None when disabled via COALESCE_ENABLED"""
+    global _registry
+    if os.getenv('COALESCE_ENABLED', 'True').lower() != 'true':
+        return None
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = InFlightRegistry(
+                    path=os.getenv('COALESCE_PATH') or os.path.join(tempfile.gettempdir(), 'idea_inflight.sqlite3'),
+                    result_seconds=float(os.getenv('COALESCE_RESULT_SECONDS', 10)),
+                    token_seconds=float(os.getenv('IDEMPOTENCY_TTL_SECONDS', 600)),
+                    stale_seconds=float(os.getenv('COALESCE_STALE_SECONDS', 90))
+                )
+    return _registry
@@ -0,0 +1,189 @@
+import os
+import re
+import threading
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional, List, Dict, Any, Set
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from services.web_search import WebSearchService
+
+# Query variants fanned out for every niche; {niche} and {year} are filled in
+RESEARCH_ANGLES = {
+    'trends': '{niche} market trends growth opportunities {year}',
+    'competitors': 'top startups and competitors in {niche}',
+    'pain_points': '{niche} customer pain points unmet needs',
+    'pricing': '{niche} pricing business models revenue',
+}
+
+# Query-string parameters that never change what a page shows
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|ref|fbclid|gclid|mc_cid|mc_eid)$')
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for de-duplication: no scheme, www, fragment, tracking params or trailing slash"""
+    parts = urlsplit((url or '').strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip('/')
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    words = _words(text)
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _trim(text: str, limit: int) -> str:
+    """Cut text to at most `limit` characters, preferring a sentence boundary"""
+    text = ' '.join((text or '').split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    sentence_end = max(cut.rfind('. '), cut.rfind('! '), cut.rfind('? '))
+    if sentence_end > limit // 2:
+        return cut[:sentence_end + 1]
+    return cut.rsplit(' ', 1)[0] + '...'
+
+
+class ResearchService:
+    """Fans several Tavily queries out concurrently and packs the best snippets for the prompt.
+
+    Each niche is searched from every angle in RESEARCH_ANGLES at once, so
+    wall-clock time is roughly one query's. Queries still running at the
+    deadline are abandoned. Results are de-duplicated by canonical URL and
+    by near-identical content, ranked by relevance to the niche, and packed
+    into at most `max_chars` of prompt text.
+    """
+
+    def __init__(self, search_service: WebSearchService, angles: Optional[List[str]] = None,
+                 results_per_query: int = 5, deadline: float = 8.0, max_chars: int = 2000,
+                 snippet_chars: int = 400, duplicate_threshold: float = 0.8):
+        self.search_service = search_service
+        self.angles = [angle for angle in (angles or list(RESEARCH_ANGLES)) if angle in RESEARCH_ANGLES]
+        self.results_per_query = results_per_query
+        self.deadline = deadline
+        self.max_chars = max_chars
+        self.snippet_chars = snippet_chars
+        self.duplicate_threshold = duplicate_threshold
+
+    def queries(self, niche: str) -> Dict[str, str]:
+        year = date.today().year
+        return {angle: RESEARCH_ANGLES[angle].format(niche=niche, year=year) for angle in self.angles}
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        return self.deadline if timeout is None else max(0.0, min(self.deadline, timeout))
+
+    def research(self, niche: str, timeout: Optional[float] = None) -> Optional[Dict[str, object]]:
+        """Run all queries in parallel threads; returns {text, sources} like WebSearchService.search.
+        `timeout` caps the deadline at what is left of the caller's budget."""
+        if not self.search_service.available():
+            print("Warning: TAVILY_API_KEY not found or Tavily wrapper not initialized. Web search disabled.")
+            return None
+        queries = self.queries(niche)
+        executor = _get_executor()
+        futures = {executor.submit(self.search_service.results, query, self.results_per_query): angle
+                   for angle, query in queries.items()}
+        done, not_done = wait(futures, timeout=self._deadline(timeout))
+        for future in not_done:
+            # Queued calls are dropped; running ones finish in the background and still fill the cache
+            future.cancel()
+
+        results = {futures[future]: future.result() for future in done if future.exception() is None}
+        return self._compile(niche, results, len(queries))
+
+    def _compile(self, niche: str, results: Dict[str, Optional[List[Dict[str, Any]]]],
+                 expected: int) -> Optional[Dict[str, object]]:
+        answered = {angle: rows for angle, rows in results.items() if rows is not None}
+        if not answered:
+            # Search disabled or every query failed or timed out
+            return None
+        if len(answered) < expected:
+            print(f"Research: {expected - len(answered)} of {expected} queries failed or missed the deadline")
+
+        snippets = self._rank(niche, self._dedupe(answered))
+        return self._pack(snippets)
+
+    def _dedupe(self, results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Merge results across queries by canonical URL, then drop near-identical content"""
+        by_url: Dict[str, Dict[str, Any]] = {}
+        for angle, rows in results.items():
+            for row in rows:
+                content = (row.get('content') or '').strip()
+                url = (row.get('url') or '').strip()
+                if not content and not row.get('title'):
+                    continue
+                key = normalize_url(url) if url else content[:200]
+                existing = by_url.get(key)
+                if existing is None:
+                    by_url[key] = dict(row, angles=[angle], score=float(row.get('score') or 0))
+                else:
+                    # The same page found by several angles counts as extra evidence
+                    existing['angles'].append(angle)
+                    existing['score'] = max(existing['score'], float(row.get('score') or 0))
+                    if len(content) > len(existing.get('content') or ''):
+                        existing['content'] = content
+
+        unique: List[Dict[str, Any]] = []
+        kept_shingles: List[Set[str]] = []
+        for row in sorted(by_url.values(), key=lambda r: r['score'], reverse=True):
+            shingles = _shingles(row.get('content') or row.get('title') or '')
+            if any(shingles and other and len(shingles & other) / len(shingles | other) >= self.duplicate_threshold
+                   for other in kept_shingles):
+                continue
+            unique.append(row)
+            kept_shingles.append(shingles)
+        return unique
+
+    @staticmethod
+    def _rank(niche: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Order snippets by search score, niche term coverage and how many angles found them"""
+        niche_terms = set(_words(niche))
+        for row in rows:
+            text_terms = set(_words(f"{row.get('title', '')} {row.get('content', '')}"))
+            coverage = len(niche_terms & text_terms) / len(niche_terms) if niche_terms else 0.0
+            row['relevance'] = 0.5 * row['score'] + 0.4 * coverage + 0.1 * (len(row['angles']) - 1)
+        return sorted(rows, key=lambda r: r['relevance'], reverse=True)
+
+    def _pack(self, rows: List[Dict[str, Any]]) -> Dict[str, object]:
+        """Fill the prompt budget with the best snippets, one angle label each"""
+        sections: List[str] = []
+        sources: List[Dict[str, str]] = []
+        used = 0
+        for row in rows:
+            title = (row.get('title') or '').strip()
+            url = (row.get('url') or '').strip()
+            section = f"{len(sections) + 1}. [{row['angles'][0].replace('_', ' ')}] {title}\n{_trim(row.get('content'), self.snippet_chars)}\n"
+            if url:
+                section += f"Source: {url}\n"
+            if used + len(section) > self.max_chars:
+                continue
+            sections.append(section)
+            used += len(section)
+            if url:
+                sources.append({"title": title or url, "url": url})
+
+        text = "Recent Market Insights:\n" + ("\n".join(sections) if sections else "No relevant market data found.")
+        return {"text": text.strip(), "sources": sources}
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared pool for the sync research path (one thread per in-flight query)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=int(os.getenv('RESEARCH_THREADS', 16)),
+                                               thread_name_prefix='research')
+    return _executor
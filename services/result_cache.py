@@ -0,0 +1,197 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+# Filler words that do not change what a niche is about
+STOPWORDS = {
+    'a', 'an', 'and', 'the', 'for', 'of', 'in', 'on', 'to', 'with', 'by', 'at',
+    'from', 'into', 'about', 'as', 'or', 'based', 'powered', 'using', 'my', 'our', 'your'
+}
+
+
+def normalize_niche(niche: str) -> str:
+    """Canonical form of a niche: lowercase, no punctuation or stopwords, tokens sorted.
+
+    "AI for healthcare", "ai  healthcare" and "Healthcare AI" all map to "ai healthcare".
+    """
+    tokens = re.findall(r'[a-z0-9]+', (niche or '').lower())
+    meaningful = {token for token in tokens if token not in STOPWORDS}
+    return ' '.join(sorted(meaningful or set(tokens)))
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'size', 'expires_at', 'hits')
+
+    def __init__(self, value: Dict[str, Any], size: int, expires_at: float, hits: int = 0):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.hits = hits
+
+
+class IdeaResultCache:
+    """LRU + TTL cache of workflow results with an optional shared SQLite tier.
+
+    The in-memory tier is bounded by entry count and by approximate size in
+    bytes. When `sqlite_path` is set, entries are also written to a SQLite
+    file so every worker process on the host can reuse them; each write
+    prunes expired rows and caps the table at `sqlite_max_entries`, evicting
+    the rows closest to expiry first. `stats()` reports hit and miss totals
+    and how often each in-memory entry has been served.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: float = 86400, sqlite_path: Optional[str] = None,
+                 sqlite_max_entries: int = 5000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self.sqlite_max_entries = sqlite_max_entries
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        if sqlite_path:
+            self._init_sqlite()
+
+    @staticmethod
+    def make_key(niche: str, web_search_enabled: bool, model_name: str) -> str:
+        return f"{model_name}|{int(bool(web_search_enabled))}|{normalize_niche(niche)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result or None; expired entries count as misses"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.expires_at > now:
+                entry.hits += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            if entry:
+                self._remove(key)
+
+        value = self._sqlite_get(key, now) if self.sqlite_path else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._store(key, value, now, hits=1)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        self._store(key, value, now)
+        if self.sqlite_path:
+            self._sqlite_set(key, value, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'entry_hits': {key: entry.hits for key, entry in self._entries.items()},
+            }
+
+    def _store(self, key: str, value: Dict[str, Any], now: float, hits: int = 0) -> None:
+        size = len(json.dumps(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, size, now + self.ttl_seconds, hits)
+            self._bytes += size
+            # Evict least recently used entries until both bounds hold
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    # SQLite tier shared by all workers on the host
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.sqlite_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_sqlite(self) -> None:
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS idea_results ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_idea_results_expires_at ON idea_results(expires_at)')
+        conn.commit()
+
+    def _sqlite_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM idea_results WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            print(f"Error reading idea result cache: {e}")
+            return None
+
+    def _sqlite_set(self, key: str, value: Dict[str, Any], now: float) -> None:
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO idea_results (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), now + self.ttl_seconds)
+            )
+            conn.execute('DELETE FROM idea_results WHERE expires_at <= ?', (now,))
+            conn.execute(
+                'DELETE FROM idea_results WHERE rowid IN ('
+                ' SELECT rowid FROM idea_results ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.sqlite_max_entries,)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"Error writing idea result cache: {e}")
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[IdeaResultCache]:
+    """Return the process-wide result cache, or None when disabled via IDEA_CACHE_ENABLED"""
+    global _result_cache
+    if os.getenv('IDEA_CACHE_ENABLED', 'True').lower() != 'true':
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = IdeaResultCache(
+                    max_entries=int(os.getenv('IDEA_CACHE_MAX_ENTRIES', 512)),
+                    max_bytes=int(os.getenv('IDEA_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+                    ttl_seconds=float(os.getenv('IDEA_CACHE_TTL_SECONDS', 86400)),
+                    sqlite_path=os.getenv('IDEA_CACHE_SQLITE_PATH') or None,
+                    sqlite_max_entries=int(os.getenv('IDEA_CACHE_SQLITE_MAX_ENTRIES', 5000))
+                )
+    return _result_cache
@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Optional, Any, Tuple
+
+
+# Bumped whenever the cached value's shape changes, so old rows are never read.
+# 2: raw Tavily result lists (1 held formatted text and sources)
+TABLE = 'search_results_v2'
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return ' '.join((query or '').lower().split())
+
+
+class SearchCache:
+    """SQLite-backed TTL cache for web search results.
+
+    Entries younger than `fresh_seconds` are served as-is. Entries up to
+    `fresh_seconds + stale_seconds` old are still served but reported as
+    stale so the caller can refresh them in the background. The table is
+    capped at `max_entries` rows, evicting the oldest first.
+    """
+
+    def __init__(self, path: str, fresh_seconds: float = 6 * 3600,
+                 stale_seconds: float = 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute('DROP TABLE IF EXISTS search_results')
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {TABLE} ('
+            ' query TEXT NOT NULL, max_results INTEGER NOT NULL,'
+            ' value TEXT NOT NULL, fetched_at REAL NOT NULL,'
+            ' PRIMARY KEY (query, max_results))'
+        )
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{TABLE}_fetched_at ON {TABLE}(fetched_at)')
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, query: str, max_results: int) -> Optional[Tuple[Any, bool]]:
+        """Return (value, is_stale) for a cached query, or None when missing or expired"""
+        try:
+            row = self._connection().execute(
+                f'SELECT value, fetched_at FROM {TABLE} WHERE query = ? AND max_results = ?',
+                (normalize_query(query), max_results)
+            ).fetchone()
+        except Exception as e:
+            print(f"Error reading search cache: {e}")
+            return None
+
+        if not row:
+            return None
+        age = time.time() - row[1]
+        if age > self.fresh_seconds + self.stale_seconds:
+            return None
+        return json.loads(row[0]), age > self.fresh_seconds
+
+    def set(self, query: str, max_results: int, value: Any) -> None:
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute(
+                f'INSERT OR REPLACE INTO {TABLE} (query, max_results, value, fetched_at) VALUES (?, ?, ?, ?)',
+                (normalize_query(query), max_results, json.dumps(value), now)
+            )
+            conn.execute(
+                f'DELETE FROM {TABLE} WHERE fetched_at < ?',
+                (now - self.fresh_seconds - self.stale_seconds,)
+            )
+            conn.execute(
+                f'DELETE FROM {TABLE} WHERE rowid IN ('
+                f' SELECT rowid FROM {TABLE} ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"Error writing search cache: {e}")
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the process-wide search cache, or None when disabled via SEARCH_CACHE_ENABLED"""
+    global _search_cache
+    if os.getenv('SEARCH_CACHE_ENABLED', 'True').lower() != 'true':
+        return None
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchCache(
+                    path=os.getenv('SEARCH_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'idea_search_cache.sqlite3'),
+                    fresh_seconds=float(os.getenv('SEARCH_CACHE_FRESH_SECONDS', 6 * 3600)),
+                    stale_seconds=float(os.getenv('SEARCH_CACHE_STALE_SECONDS', 24 * 3600)),
+                    max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 5000))
+                )
+    return _search_cache
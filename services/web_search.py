@@ -1,6 +1,10 @@
 import os
+import time
+import threading
 from typing import Optional, List, Dict
 from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
+from services.search_cache import get_search_cache, normalize_query
+from services.metrics import CACHE_REQUESTS, TAVILY_DURATION, TAVILY_RESULTS, TAVILY_ERRORS
 
 class WebSearchService:
     def __init__(self):
@@ -11,46 +15,79 @@ class WebSearchService:
         except Exception as e:
             print(f"Failed to initialize Tavily wrapper: {e}")
             self.wrapper = None
+        self.cache = get_search_cache()
+        # Cache keys with a background refresh already running
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
 
-    def search(self, query: str, max_results: int = 5) -> Optional[Dict[str, object]]:
-        """
-        Perform web search using Tavily (LangChain Community wrapper)
-        Returns dict with keys:
-          - text: formatted string for prompting
-          - sources: list[{title, url}]
-        """
+    def available(self) -> bool:
+        """True when Tavily is configured"""
+        return bool(self.api_key and self.wrapper)
+
+    def results(self, query: str, max_results: int = 5) -> Optional[List[Dict[str, object]]]:
+        """Raw Tavily results (title, url, content, score) for a query, through the search cache
+        Returns None when search is disabled or the request failed."""
         if not self.api_key or not self.wrapper:
             print("Warning: TAVILY_API_KEY not found or Tavily wrapper not initialized. Web search disabled.")
             return None
 
-        try:
-            # Get structured results (list of dicts with title, content, url)
-            results: List[Dict[str, str]] = self.wrapper.results(query=query, max_results=max_results)
-
-            sources: List[Dict[str, str]] = []
-            # Build a pseudo 'data' compatible with previous formatter
-            formatted_sections = []
-            for i, res in enumerate(results[:3], 1):
-                title = res.get('title', '').strip()
-                content = (res.get('content', '') or '').strip()
-                url = res.get('url', '').strip()
-                if not title and not content:
-                    continue
-                if len(content) > 300:
-                    content = content[:300] + '...'
-                section = f"{i}. {title}\n{content}\n"
-                if url:
-                    section += f"Source: {url}\n"
-                    sources.append({"title": title or url, "url": url})
-                formatted_sections.append(section)
-
-            formatted_text = "Recent Market Insights:\n" + ("\n".join(formatted_sections) if formatted_sections else "No relevant market data found.")
-            return {"text": formatted_text.strip(), "sources": sources}
+        if self.cache is None:
+            return self._fetch(query, max_results)
+
+        cached = self._cache_get(query, max_results)
+        if cached is not None:
+            return cached
+
+        results = self._fetch(query, max_results)
+        if results is not None:
+            self.cache.set(query, max_results, results)
+        return results
+
+    def _refresh_in_background(self, query: str, max_results: int) -> None:
+        """Re-fetch a stale cache entry without blocking the caller"""
+        key = (normalize_query(query), max_results)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                results = self._fetch(query, max_results)
+                if results is not None:
+                    self.cache.set(query, max_results, results)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
 
+        threading.Thread(target=refresh, name='search-cache-refresh', daemon=True).start()
+
+    def _cache_get(self, query: str, max_results: int) -> Optional[List[Dict[str, object]]]:
+        """Serve from the search cache, refreshing stale entries in the background"""
+        cached = self.cache.get(query, max_results)
+        if cached is None:
+            CACHE_REQUESTS.labels(cache='search', result='miss').inc()
+            return None
+        value, is_stale = cached
+        CACHE_REQUESTS.labels(cache='search', result='stale' if is_stale else 'hit').inc()
+        if is_stale:
+            self._refresh_in_background(query, max_results)
+        return value
+
+    @staticmethod
+    def _observe(start: float, results: List[Dict[str, object]]) -> None:
+        TAVILY_DURATION.observe(time.perf_counter() - start)
+        TAVILY_RESULTS.observe(len(results or []))
+
+    def _fetch(self, query: str, max_results: int) -> Optional[List[Dict[str, object]]]:
+        """Query Tavily, bypassing the cache"""
+        start = time.perf_counter()
+        try:
+            # Structured results: list of dicts with title, url, content and score
+            results = self.wrapper.results(query=query, max_results=max_results)
         except Exception as e:
+            TAVILY_ERRORS.inc()
             print(f"Web search error: {e}")
             return None
-    
-    # Deprecated: kept for reference only; formatting now handled inline
-    def _format_results(self, data: dict) -> str:
-        return ""
+        self._observe(start, results)
+        return results
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from typing import Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.ai_workflow import BusinessIdeaWorkflow
+
+
+class WorkflowRegistry:
+    """Process-wide holder for a single, reusable BusinessIdeaWorkflow.
+
+    The compiled LangGraph, the ChatOpenAI client (and its keep-alive
+    connection pool) and the web search service are built once per worker
+    and shared by every request. The workflow is rebuilt only when the
+    configuration it was built from changes; the replaced workflow's HTTP
+    clients are closed once requests still using it have run out of time
+    budget. services.ai_workflow (and with it langgraph, langchain and
+    pydantic) is imported on the first build, so workers start without
+    paying for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workflow: Optional['BusinessIdeaWorkflow'] = None
+        self._config: Optional[Tuple] = None
+
+    @staticmethod
+    def _current_config() -> Tuple:
+        """Environment settings that require a rebuild when they change"""
+        return (
+            os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+            os.getenv('OPENAI_API_KEY'),
+            os.getenv('TAVILY_API_KEY'),
+        )
+
+    def get(self) -> 'BusinessIdeaWorkflow':
+        """Return the shared workflow, building it on first use or after a config change"""
+        config = self._current_config()
+        workflow = self._workflow
+        if workflow is not None and self._config == config:
+            return workflow
+
+        with self._lock:
+            # Another thread may have rebuilt it while we waited for the lock
+            if self._workflow is None or self._config != config:
+                started = time.perf_counter()
+                from services.ai_workflow import BusinessIdeaWorkflow
+                previous = self._workflow
+                self._workflow = BusinessIdeaWorkflow(model_name=config[0])
+                self._config = config
+                print(f"Built BusinessIdeaWorkflow (model={config[0]}) in {time.perf_counter() - started:.3f}s")
+                if previous is not None:
+                    self._close_later(previous)
+            return self._workflow
+
+    @staticmethod
+    def _close_later(workflow: 'BusinessIdeaWorkflow') -> None:
+        """Close a replaced workflow once requests that still hold it are past their budget"""
+        timer = threading.Timer(workflow.request_budget + 5, workflow.close)
+        timer.daemon = True
+        timer.start()
+
+
+# Shared registry for this worker process
+workflow_registry = WorkflowRegistry()
+
+
+def get_workflow() -> 'BusinessIdeaWorkflow':
+    """Return the worker's shared BusinessIdeaWorkflow"""
+    return workflow_registry.get()
+
+
+def prewarm_workflow() -> threading.Thread:
+    """Build the workflow on a background thread, so the worker serves requests
+    right away and the first generation does not pay for the imports"""
+    def build():
+        try:
+            workflow_registry.get()
+        except Exception as e:
+            print(f"Error prewarming workflow: {e}")
+
+    thread = threading.Thread(target=build, name='workflow-prewarm', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,139 @@
+import os
+import atexit
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from models import BusinessIdea
+from services.metrics import WRITE_BEHIND_DEPTH
+
+
+class WriteBehindBuffer:
+    """Buffers new business_ideas rows and writes them as multi-row inserts.
+
+    A background thread flushes whenever `flush_size` rows are waiting or
+    `flush_interval` seconds have passed since the oldest buffered row.
+    Failed batches are retried with exponential backoff; the buffer is
+    drained on interpreter shutdown.
+    """
+
+    def __init__(self, flush_size: int = 50, flush_interval: float = 1.0, max_buffer: int = 10000,
+                 max_retries: int = 5, base_backoff: float = 0.5):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._rows: List[Dict[str, Any]] = []
+        # time.monotonic() at which each buffered row was submitted, in the same order
+        self._enqueued_at: List[float] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def depth(self) -> int:
+        """Rows waiting to be written"""
+        with self._condition:
+            return len(self._rows)
+
+    def submit(self, user_id: int, niche: str, ideas: List[Dict[str, Any]],
+               web_search_used: bool = False) -> bool:
+        """Buffer a row; returns False when the buffer is full or closed so the caller can write directly"""
+        row = {
+            'user_id': user_id,
+            'niche': niche,
+            'ideas': ideas,
+            'web_search_used': web_search_used,
+            'created_at': datetime.now().isoformat()
+        }
+        with self._condition:
+            if self._closed or len(self._rows) >= self.max_buffer:
+                return False
+            self._rows.append(row)
+            self._enqueued_at.append(time.monotonic())
+            WRITE_BEHIND_DEPTH.set(len(self._rows))
+            if len(self._rows) >= self.flush_size:
+                self._condition.notify()
+        return True
+
+    def flush(self) -> int:
+        """Write everything buffered right now; returns the number of rows written"""
+        written = 0
+        # One flusher at a time, from taking a batch to writing it, keeps batches in submission order
+        with self._flush_lock:
+            while True:
+                with self._condition:
+                    batch = self._rows[:self.flush_size]
+                    del self._rows[:self.flush_size]
+                    del self._enqueued_at[:self.flush_size]
+                    WRITE_BEHIND_DEPTH.set(len(self._rows))
+                if not batch:
+                    return written
+                written += self._write(batch)
+
+    def close(self) -> None:
+        """Stop accepting rows and drain the buffer"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if len(self._rows) >= self.flush_size:
+                        break
+                    if self._enqueued_at:
+                        remaining = self.flush_interval - (time.monotonic() - self._enqueued_at[0])
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+            self.flush()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert one batch, retrying with exponential backoff. Called with _flush_lock held."""
+        for attempt in range(self.max_retries + 1):
+            # create_many inserts in a single request, so a batch lands fully or not at all
+            if len(BusinessIdea.create_many(batch)) == len(batch):
+                self.written += len(batch)
+                return len(batch)
+            if attempt < self.max_retries:
+                time.sleep(self.base_backoff * (2 ** attempt))
+
+        print(f"Write-behind: dropping {len(batch)} business idea rows after {self.max_retries} retries")
+        self.dropped += len(batch)
+        return 0
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_behind() -> Optional[WriteBehindBuffer]:
+    """Return the process-wide write-behind buffer, or None unless WRITE_BEHIND_ENABLED is set"""
+    global _buffer
+    if os.getenv('WRITE_BEHIND_ENABLED', 'False').lower() != 'true':
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = WriteBehindBuffer(
+                    flush_size=int(os.getenv('WRITE_BEHIND_FLUSH_SIZE', 50)),
+                    flush_interval=float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', 1.0)),
+                    max_buffer=int(os.getenv('WRITE_BEHIND_MAX_BUFFER', 10000)),
+                    max_retries=int(os.getenv('WRITE_BEHIND_MAX_RETRIES', 5))
+                )
+    return _buffer
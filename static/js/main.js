@@ -12,6 +12,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize copy functionality
     initializeCopyFunctionality();
+    
+    // Initialize history search
+    initializeSearch();
 });
 
 /**
@@ -269,6 +272,110 @@ function handleFormSubmission(formElement, buttonElement, loadingText = 'Process
     });
 }
 
+/**
+ * POST a form and read the server-sent events response as it streams in.
+ * Calls onEvent(eventName, data) for every event frame.
+ * Resolves to false when the server did not answer with an event stream.
+ * A 429/503 (rate limited or busy) is reported as an error event instead,
+ * since retrying the form right away would be rejected too.
+ */
+async function streamServerSentEvents(url, formData, onEvent) {
+    const response = await fetch(url, {
+        method: 'POST',
+        body: formData,
+        headers: { 'Accept': 'text/event-stream' },
+        credentials: 'same-origin'
+    });
+
+    if (response.status === 429 || response.status === 503) {
+        const data = await response.json().catch(() => ({}));
+        onEvent('error', { error: data.error || 'The server is busy. Please try again shortly.' });
+        return true;
+    }
+
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!response.ok || !contentType.includes('text/event-stream') || !response.body) {
+        return false;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            const dataLines = [];
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    eventName = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    dataLines.push(line.slice(5).trim());
+                }
+            });
+            if (dataLines.length) {
+                onEvent(eventName, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+    return true;
+}
+
+/**
+ * Build an idea card matching the server-rendered markup in ideas/generate.html
+ */
+function createIdeaCard(idea) {
+    const column = document.createElement('div');
+    column.className = 'col-lg-4 mb-4';
+    column.innerHTML = `
+        <div class="card h-100 border-0 shadow-sm idea-card">
+            <div class="card-header bg-gradient-primary text-white">
+                <h5 class="card-title mb-0"><i class="fas fa-rocket me-2"></i><span data-field="name"></span></h5>
+            </div>
+            <div class="card-body">
+                <div class="mb-3">
+                    <h6 class="text-primary"><i class="fas fa-bullhorn me-1"></i>Pitch</h6>
+                    <p class="card-text" data-field="pitch"></p>
+                </div>
+                <div class="mb-3">
+                    <h6 class="text-success"><i class="fas fa-users me-1"></i>Target Audience</h6>
+                    <p class="card-text text-muted" data-field="audience"></p>
+                </div>
+                <div class="mb-0">
+                    <h6 class="text-warning"><i class="fas fa-dollar-sign me-1"></i>Revenue Model</h6>
+                    <p class="card-text text-muted" data-field="revenue_model"></p>
+                </div>
+            </div>
+            <div class="card-footer bg-transparent border-0 pt-0 pb-3 text-end">
+                <button type="button" class="btn btn-sm btn-outline-secondary copy-idea-btn">
+                    <i class="fas fa-copy me-1"></i>Copy Idea
+                </button>
+            </div>
+        </div>
+    `;
+
+    // Fill fields with textContent so model output is never interpreted as HTML
+    column.querySelectorAll('[data-field]').forEach(el => {
+        el.textContent = idea[el.getAttribute('data-field')] || '';
+    });
+
+    const copyBtn = column.querySelector('.copy-idea-btn');
+    const content = `Name: ${idea.name}\nPitch: ${idea.pitch}\nAudience: ${idea.audience}\nRevenue Model: ${idea.revenue_model}`;
+    copyBtn.setAttribute('data-idea-content', content);
+    copyBtn.addEventListener('click', () => copyToClipboard(content));
+
+    return column;
+}
+
 /**
  * Initialize form submission handlers
  */
@@ -318,7 +425,7 @@ function truncateText(text, maxLength = 100) {
 }
 
 /**
- * Initialize search functionality (if needed in future)
+ * Initialize search-as-you-type on the history page
  */
 function initializeSearch() {
     const searchInput = document.getElementById('search');
@@ -340,18 +447,93 @@ function initializeSearch() {
     }
 }
 
+let searchController = null;
+
+/**
+ * Fetch one page of ranked results from the search endpoint and render them.
+ * A newer search aborts any request still in flight.
+ */
+async function performSearch(query, page = 1) {
+    const searchInput = document.getElementById('search');
+    const resultsContainer = document.getElementById('search-results');
+    if (!searchInput || !resultsContainer) return;
+    
+    if (searchController) searchController.abort();
+    searchController = new AbortController();
+    
+    const url = new URL(searchInput.getAttribute('data-search-url'), window.location.origin);
+    url.searchParams.set('q', query);
+    url.searchParams.set('page', page);
+    
+    let data;
+    try {
+        const response = await fetch(url, {
+            headers: { 'Accept': 'application/json' },
+            signal: searchController.signal
+        });
+        if (!response.ok) throw new Error(`Search failed with status ${response.status}`);
+        data = await response.json();
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Search error:', error);
+        resultsContainer.innerHTML = '<div class="alert alert-warning mb-0">Search is unavailable right now.</div>';
+        return;
+    }
+    
+    renderSearchResults(resultsContainer, data, query);
+}
+
 /**
- * Perform search (placeholder for future implementation)
+ * Render search results; later pages are appended after the earlier ones
  */
-function performSearch(query) {
-    console.log('Searching for:', query);
-    // Implementation for search functionality
+function renderSearchResults(container, data, query) {
+    if (data.page === 1) {
+        container.innerHTML = '';
+        if (!data.results.length) {
+            container.innerHTML = '<p class="text-muted mb-0">No ideas match your search.</p>';
+            return;
+        }
+        const list = document.createElement('div');
+        list.className = 'list-group shadow-sm';
+        container.appendChild(list);
+    }
+    
+    const list = container.querySelector('.list-group');
+    data.results.forEach(result => {
+        const item = document.createElement('a');
+        item.className = 'list-group-item list-group-item-action';
+        item.href = result.url;
+        item.innerHTML = `
+            <div class="d-flex justify-content-between align-items-center">
+                <h6 class="mb-1 text-primary fw-bold"><i class="fas fa-bullseye me-2"></i><span data-field="niche"></span></h6>
+                <small class="text-muted" data-field="created_at"></small>
+            </div>
+            <div class="fw-semibold text-success small" data-field="headline_name"></div>
+            <p class="mb-0 text-muted small" data-field="headline_pitch"></p>
+        `;
+        item.querySelector('[data-field="niche"]').textContent = result.niche;
+        item.querySelector('[data-field="created_at"]').textContent = result.created_at ? result.created_at.slice(0, 10) : '';
+        item.querySelector('[data-field="headline_name"]').textContent = result.headline_name || '';
+        item.querySelector('[data-field="headline_pitch"]').textContent = result.headline_pitch ? truncateText(result.headline_pitch, 140) : '';
+        list.appendChild(item);
+    });
+    
+    container.querySelector('.search-more')?.remove();
+    if (data.has_more) {
+        const more = document.createElement('button');
+        more.type = 'button';
+        more.className = 'btn btn-outline-primary btn-sm mt-3 search-more';
+        more.textContent = 'More results';
+        more.addEventListener('click', () => performSearch(query, data.page + 1));
+        container.appendChild(more);
+    }
 }
 
 /**
  * Clear search results
  */
 function clearSearchResults() {
+    if (searchController) searchController.abort();
     const resultsContainer = document.getElementById('search-results');
     if (resultsContainer) {
         resultsContainer.innerHTML = '';
@@ -0,0 +1,42 @@
+import os
+import threading
+from typing import Optional
+from storage.base import StorageBackend
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: Optional[str] = None) -> StorageBackend:
+    """Create a storage backend by name: supabase (default), postgres or sqlite"""
+    name = (name or os.getenv('STORAGE_BACKEND', 'supabase')).lower()
+    if name == 'supabase':
+        from storage.supabase_backend import SupabaseBackend
+        return SupabaseBackend()
+    if name == 'postgres':
+        from storage.postgres_backend import PostgresBackend
+        return PostgresBackend(
+            min_connections=int(os.getenv('DB_POOL_MIN', 1)),
+            max_connections=int(os.getenv('DB_POOL_MAX', 10))
+        )
+    if name == 'sqlite':
+        from storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(os.getenv('SQLITE_DATABASE_PATH', ':memory:'))
+    raise ValueError(f"Unsupported STORAGE_BACKEND: {name}")
+
+
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend selected by STORAGE_BACKEND, creating it on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_storage(backend: Optional[StorageBackend]) -> None:
+    """Replace the process-wide backend (used by tests and benchmarks)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, Any, Tuple
+
+# Columns of the business_ideas summary projection (see BusinessIdeaSummary)
+SUMMARY_COLUMNS = ('id', 'user_id', 'niche', 'web_search_used', 'created_at',
+                   'headline_name', 'headline_pitch', 'idea_count')
+
+# Columns that identify a business_ideas row's version; rows never change after insert
+VERSION_COLUMNS = ('id', 'user_id', 'created_at')
+
+
+class StorageBackend(ABC):
+    """Storage operations behind the User and BusinessIdea models.
+
+    Backends return plain row dicts keyed by column name, with timestamps as
+    ISO-8601 strings, and raise on failure; the models own error handling.
+    """
+
+    name = 'base'
+
+    # users
+
+    @abstractmethod
+    def create_user(self, email: str, password_hash: str, created_at: str) -> Optional[Dict[str, Any]]:
+        """Insert a user and return the stored row"""
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def update_user_password_hash(self, user_id: int, password_hash: str, updated_at: str) -> bool:
+        pass
+
+    # business_ideas
+
+    @abstractmethod
+    def insert_ideas(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert one or more business_ideas rows in a single statement and return them"""
+
+    @abstractmethod
+    def get_ideas_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """A user's most recent rows, newest first"""
+
+    @abstractmethod
+    def get_idea_summaries_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Like get_ideas_by_user but only the SUMMARY_COLUMNS"""
+
+    @abstractmethod
+    def get_ideas_page(self, user_id: int, limit: int, before: Optional[Tuple[str, int]] = None,
+                       after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Keyset page of a user's rows on (created_at, id)
+        Without a cursor or with `before`, rows older than the cursor newest first;
+        with `after`, rows newer than the cursor oldest first.
+        """
+
+    @abstractmethod
+    def get_idea_by_id(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def get_idea_version(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        """Only the VERSION_COLUMNS of a row, for conditional requests"""
+
+    @abstractmethod
+    def get_latest_idea_version(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """VERSION_COLUMNS of a user's newest row, or None when they have none"""
+
+    # search
+
+    @abstractmethod
+    def search_ideas(self, user_id: int, query: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Full-text search over a user's ideas, best match first
+        Returns SUMMARY_COLUMNS rows with a 'rank' key (higher is better).
+        """
+
+    def close(self) -> None:
+        """Release connections held by the backend"""
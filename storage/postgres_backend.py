@@ -0,0 +1,183 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime, date
+from typing import Optional, List, Dict, Any, Tuple
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
+from storage.base import StorageBackend, SUMMARY_COLUMNS, VERSION_COLUMNS
+from storage.search_index import build_tsquery
+
+
+class _PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers which statements it has already PREPAREd"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+# Named server-side prepared statements; parameters are $1..$n
+STATEMENTS = {
+    'create_user': (
+        'INSERT INTO public.users (email, password_hash, created_at, updated_at)'
+        ' VALUES ($1, $2, $3, $3) RETURNING *'
+    ),
+    'get_user_by_email': 'SELECT * FROM public.users WHERE email = $1',
+    'get_user_by_id': 'SELECT * FROM public.users WHERE id = $1',
+    'update_user_password_hash': (
+        'UPDATE public.users SET password_hash = $2, updated_at = $3 WHERE id = $1 RETURNING id'
+    ),
+    'get_ideas_by_user': (
+        'SELECT * FROM public.business_ideas WHERE user_id = $1'
+        ' ORDER BY created_at DESC, id DESC LIMIT $2'
+    ),
+    'get_idea_summaries_by_user': (
+        f'SELECT {", ".join(SUMMARY_COLUMNS)} FROM public.business_ideas WHERE user_id = $1'
+        ' ORDER BY created_at DESC, id DESC LIMIT $2'
+    ),
+    'get_ideas_first_page': (
+        'SELECT * FROM public.business_ideas WHERE user_id = $1'
+        ' ORDER BY created_at DESC, id DESC LIMIT $2'
+    ),
+    'get_ideas_page_before': (
+        'SELECT * FROM public.business_ideas WHERE user_id = $1 AND (created_at, id) < ($3::timestamp, $4::integer)'
+        ' ORDER BY created_at DESC, id DESC LIMIT $2'
+    ),
+    'get_ideas_page_after': (
+        'SELECT * FROM public.business_ideas WHERE user_id = $1 AND (created_at, id) > ($3::timestamp, $4::integer)'
+        ' ORDER BY created_at ASC, id ASC LIMIT $2'
+    ),
+    'get_idea_by_id': 'SELECT * FROM public.business_ideas WHERE id = $1',
+    'get_idea_version': f'SELECT {", ".join(VERSION_COLUMNS)} FROM public.business_ideas WHERE id = $1',
+    'get_latest_idea_version': (
+        f'SELECT {", ".join(VERSION_COLUMNS)} FROM public.business_ideas WHERE user_id = $1'
+        ' ORDER BY created_at DESC, id DESC LIMIT 1'
+    ),
+    'search_ideas': 'SELECT * FROM public.search_business_ideas($1, $2, $3, $4)',
+}
+
+
+def _serialize(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Match the PostgREST row shape: timestamps as ISO-8601 strings"""
+    return {key: value.isoformat() if isinstance(value, (datetime, date)) else value
+            for key, value in row.items()}
+
+
+class PostgresBackend(StorageBackend):
+    """Direct PostgreSQL storage over a thread-safe psycopg2 connection pool.
+
+    Single-row queries run as server-side prepared statements, prepared once
+    per pooled connection; idea inserts are real multi-row INSERTs.
+    """
+
+    name = 'postgres'
+
+    def __init__(self, dsn: Optional[str] = None, min_connections: int = 1, max_connections: int = 10):
+        dsn = dsn or os.getenv('DATABASE_URL')
+        if not dsn:
+            raise ValueError("DATABASE_URL must be set in environment variables to use the postgres storage backend")
+        self.pool = ThreadedConnectionPool(
+            min_connections, max_connections, dsn=dsn, connection_factory=_PreparingConnection
+        )
+
+    @contextmanager
+    def _cursor(self):
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            # Broken connections are dropped instead of returned to the pool
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    @staticmethod
+    def _execute(cur, name: str, params: Tuple) -> None:
+        conn = cur.connection
+        if name not in conn.prepared:
+            cur.execute(f'PREPARE {name} AS {STATEMENTS[name]}')
+            conn.prepared.add(name)
+        placeholders = ', '.join(['%s'] * len(params))
+        cur.execute(f'EXECUTE {name} ({placeholders})', params)
+
+    def _fetch_one(self, name: str, *params) -> Optional[Dict[str, Any]]:
+        with self._cursor() as cur:
+            self._execute(cur, name, params)
+            row = cur.fetchone()
+        return _serialize(row) if row else None
+
+    def _fetch_all(self, name: str, *params) -> List[Dict[str, Any]]:
+        with self._cursor() as cur:
+            self._execute(cur, name, params)
+            rows = cur.fetchall()
+        return [_serialize(row) for row in rows]
+
+    # users
+
+    def create_user(self, email: str, password_hash: str, created_at: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one('create_user', email, password_hash, created_at)
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._fetch_one('get_user_by_email', email)
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one('get_user_by_id', user_id)
+
+    def update_user_password_hash(self, user_id: int, password_hash: str, updated_at: str) -> bool:
+        return self._fetch_one('update_user_password_hash', user_id, password_hash, updated_at) is not None
+
+    # business_ideas
+
+    def insert_ideas(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        values = [(row['user_id'], row['niche'], psycopg2.extras.Json(row['ideas']),
+                   row.get('web_search_used', False), row['created_at']) for row in rows]
+        with self._cursor() as cur:
+            inserted = psycopg2.extras.execute_values(
+                cur,
+                'INSERT INTO public.business_ideas (user_id, niche, ideas, web_search_used, created_at)'
+                ' VALUES %s RETURNING *',
+                values,
+                page_size=max(len(values), 1),
+                fetch=True
+            )
+        return [_serialize(row) for row in inserted]
+
+    def get_ideas_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        return self._fetch_all('get_ideas_by_user', user_id, limit)
+
+    def get_idea_summaries_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        return self._fetch_all('get_idea_summaries_by_user', user_id, limit)
+
+    def get_ideas_page(self, user_id: int, limit: int, before: Optional[Tuple[str, int]] = None,
+                       after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        if before:
+            return self._fetch_all('get_ideas_page_before', user_id, limit, *before)
+        if after:
+            return self._fetch_all('get_ideas_page_after', user_id, limit, *after)
+        return self._fetch_all('get_ideas_first_page', user_id, limit)
+
+    def get_idea_by_id(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one('get_idea_by_id', idea_id)
+
+    def get_idea_version(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one('get_idea_version', idea_id)
+
+    def get_latest_idea_version(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one('get_latest_idea_version', user_id)
+
+    def search_ideas(self, user_id: int, query: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        tsquery = build_tsquery(query)
+        if not tsquery:
+            return []
+        return self._fetch_all('search_ideas', user_id, tsquery, limit, offset)
+
+    def close(self) -> None:
+        self.pool.closeall()
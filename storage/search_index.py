@@ -0,0 +1,46 @@
+import re
+from typing import Optional, List
+
+# Fields of each idea that are searchable, with their rank weights. Mirrors
+# the A/B/C weights of business_ideas.search_vector in database_setup.sql.
+NICHE_WEIGHT = 1.0
+IDEA_FIELD_WEIGHTS = {
+    'name': 1.0,
+    'pitch': 0.4,
+    'audience': 0.2,
+    'revenue_model': 0.2,
+}
+
+# Common English words Postgres' 'english' config also ignores
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into',
+    'is', 'it', 'of', 'on', 'or', 'that', 'the', 'their', 'this', 'to', 'with'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of text, without stopwords or single characters"""
+    return [token for token in re.findall(r'[a-z0-9]+', (text or '').lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """Turn free text into a Postgres tsquery matching every word as a prefix, e.g. 'pet food' -> 'pet:* & food:*'
+
+    Tokens are reduced to [a-z0-9], so user input can never inject tsquery operators.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return ' & '.join(f'{token}:*' for token in dict.fromkeys(tokens))
+
+
+def build_fts5_query(query: str) -> Optional[str]:
+    """Turn free text into an SQLite FTS5 query matching every word as a prefix, e.g. 'pet food' -> '"pet"* AND "food"*'
+
+    Like build_tsquery, tokens are reduced to [a-z0-9] and quoted, so input can never inject FTS5 syntax.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in dict.fromkeys(tokens))
@@ -0,0 +1,191 @@
+import json
+import sqlite3
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+from storage.base import StorageBackend, SUMMARY_COLUMNS, VERSION_COLUMNS
+from storage.search_index import build_fts5_query, NICHE_WEIGHT, IDEA_FIELD_WEIGHTS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS business_ideas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    niche TEXT NOT NULL,
+    ideas TEXT NOT NULL,
+    web_search_used INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    headline_name TEXT,
+    headline_pitch TEXT,
+    idea_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_business_ideas_user_created_id ON business_ideas(user_id, created_at DESC, id DESC);
+-- Full-text index kept in the database by triggers, so every connection and process sees new rows
+CREATE VIRTUAL TABLE IF NOT EXISTS business_ideas_fts USING fts5(niche, name, pitch, audience, revenue_model);
+CREATE TRIGGER IF NOT EXISTS business_ideas_fts_insert AFTER INSERT ON business_ideas BEGIN
+    INSERT INTO business_ideas_fts (rowid, niche, name, pitch, audience, revenue_model)
+    SELECT NEW.id, NEW.niche, group_concat(json_extract(value, '$.name'), ' '),
+           group_concat(json_extract(value, '$.pitch'), ' '), group_concat(json_extract(value, '$.audience'), ' '),
+           group_concat(json_extract(value, '$.revenue_model'), ' ')
+    FROM json_each(NEW.ideas);
+END;
+CREATE TRIGGER IF NOT EXISTS business_ideas_fts_delete AFTER DELETE ON business_ideas BEGIN
+    DELETE FROM business_ideas_fts WHERE rowid = OLD.id;
+END;
+-- Rows written before the index existed
+INSERT INTO business_ideas_fts (rowid, niche, name, pitch, audience, revenue_model)
+SELECT id, niche,
+       (SELECT group_concat(json_extract(value, '$.name'), ' ') FROM json_each(ideas)),
+       (SELECT group_concat(json_extract(value, '$.pitch'), ' ') FROM json_each(ideas)),
+       (SELECT group_concat(json_extract(value, '$.audience'), ' ') FROM json_each(ideas)),
+       (SELECT group_concat(json_extract(value, '$.revenue_model'), ' ') FROM json_each(ideas))
+FROM business_ideas WHERE id NOT IN (SELECT rowid FROM business_ideas_fts);
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite storage for tests, development and benchmarks.
+
+    Uses a single connection guarded by a lock, so ':memory:' databases are
+    shared by every thread. Summary columns that Postgres generates are
+    filled in on insert; full-text search uses an FTS5 table kept current by
+    triggers.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        if 'web_search_used' in data:
+            data['web_search_used'] = bool(data['web_search_used'])
+        if isinstance(data.get('ideas'), str):
+            data['ideas'] = json.loads(data['ideas'])
+        return data
+
+    def _first(self, sql: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
+        rows = self._query(sql, params)
+        return rows[0] if rows else None
+
+    # users
+
+    def create_user(self, email: str, password_hash: str, created_at: str) -> Optional[Dict[str, Any]]:
+        return self._first(
+            'INSERT INTO users (email, password_hash, created_at, updated_at) VALUES (?, ?, ?, ?) RETURNING *',
+            (email, password_hash, created_at, created_at)
+        )
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._first('SELECT * FROM users WHERE email = ?', (email,))
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._first('SELECT * FROM users WHERE id = ?', (user_id,))
+
+    def update_user_password_hash(self, user_id: int, password_hash: str, updated_at: str) -> bool:
+        return self._first(
+            'UPDATE users SET password_hash = ?, updated_at = ? WHERE id = ? RETURNING id',
+            (password_hash, updated_at, user_id)
+        ) is not None
+
+    # business_ideas
+
+    def insert_ideas(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        values = []
+        for row in rows:
+            ideas = row['ideas'] or []
+            headline = ideas[0] if ideas else {}
+            values.extend([
+                row['user_id'], row['niche'], json.dumps(ideas), int(bool(row.get('web_search_used'))),
+                row['created_at'], headline.get('name'), (headline.get('pitch') or '')[:200] or None, len(ideas)
+            ])
+        placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?, ?)'] * len(rows))
+        return self._query(
+            'INSERT INTO business_ideas (user_id, niche, ideas, web_search_used, created_at,'
+            ' headline_name, headline_pitch, idea_count)'
+            f' VALUES {placeholders} RETURNING *',
+            tuple(values)
+        )
+
+    def get_ideas_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        return self._query(
+            'SELECT * FROM business_ideas WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?',
+            (user_id, limit)
+        )
+
+    def get_idea_summaries_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        return self._query(
+            f'SELECT {", ".join(SUMMARY_COLUMNS)} FROM business_ideas WHERE user_id = ?'
+            ' ORDER BY created_at DESC, id DESC LIMIT ?',
+            (user_id, limit)
+        )
+
+    def get_ideas_page(self, user_id: int, limit: int, before: Optional[Tuple[str, int]] = None,
+                       after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        if before:
+            return self._query(
+                'SELECT * FROM business_ideas WHERE user_id = ? AND (created_at, id) < (?, ?)'
+                ' ORDER BY created_at DESC, id DESC LIMIT ?',
+                (user_id, before[0], before[1], limit)
+            )
+        if after:
+            return self._query(
+                'SELECT * FROM business_ideas WHERE user_id = ? AND (created_at, id) > (?, ?)'
+                ' ORDER BY created_at ASC, id ASC LIMIT ?',
+                (user_id, after[0], after[1], limit)
+            )
+        return self.get_ideas_by_user(user_id, limit)
+
+    def get_idea_by_id(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        return self._first('SELECT * FROM business_ideas WHERE id = ?', (idea_id,))
+
+    def get_idea_version(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        return self._first(f'SELECT {", ".join(VERSION_COLUMNS)} FROM business_ideas WHERE id = ?', (idea_id,))
+
+    def get_latest_idea_version(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._first(
+            f'SELECT {", ".join(VERSION_COLUMNS)} FROM business_ideas WHERE user_id = ?'
+            ' ORDER BY created_at DESC, id DESC LIMIT 1',
+            (user_id,)
+        )
+
+    # search
+
+    def search_ideas(self, user_id: int, query: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        fts_query = build_fts5_query(query)
+        if not fts_query:
+            return []
+        # bm25 is lower-is-better; columns weighted like search_vector in database_setup.sql
+        weights = ', '.join(str(weight) for weight in (NICHE_WEIGHT, *IDEA_FIELD_WEIGHTS.values()))
+        return self._query(
+            f'SELECT {", ".join("b." + column for column in SUMMARY_COLUMNS)},'
+            f' -bm25(business_ideas_fts, {weights}) AS rank'
+            ' FROM business_ideas_fts JOIN business_ideas b ON b.id = business_ideas_fts.rowid'
+            ' WHERE business_ideas_fts MATCH ? AND b.user_id = ?'
+            ' ORDER BY rank DESC, b.created_at DESC, b.id DESC LIMIT ? OFFSET ?',
+            (fts_query, user_id, limit, offset)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
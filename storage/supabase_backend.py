@@ -0,0 +1,111 @@
+import os
+from typing import Optional, List, Dict, Any, Tuple
+from supabase import create_client, Client
+from storage.base import StorageBackend, SUMMARY_COLUMNS, VERSION_COLUMNS
+from storage.search_index import build_tsquery
+
+
+class SupabaseBackend(StorageBackend):
+    """Storage through the Supabase PostgREST HTTP API"""
+
+    name = 'supabase'
+
+    def __init__(self):
+        self.url = os.getenv('SUPABASE_URL')
+        self.key = os.getenv('SUPABASE_KEY')
+        self.service_role_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+
+        if not self.url or not self.key or not self.service_role_key:
+            raise ValueError("SUPABASE_URL, SUPABASE_KEY, and SUPABASE_SERVICE_ROLE_KEY must be set in environment variables")
+
+        self.client: Client = create_client(self.url, self.key)
+        self.service_client: Client = create_client(self.url, self.service_role_key)
+
+    def get_client(self) -> Client:
+        return self.client
+
+    def get_service_role_client(self) -> Client:
+        # Service role bypasses RLS; the app enforces ownership itself
+        return self.service_client
+
+    def _users(self):
+        return self.service_client.table('users')
+
+    def _ideas(self):
+        return self.service_client.table('business_ideas')
+
+    # users
+
+    def create_user(self, email: str, password_hash: str, created_at: str) -> Optional[Dict[str, Any]]:
+        result = self._users().insert({
+            'email': email,
+            'password_hash': password_hash,
+            'created_at': created_at,
+            'updated_at': created_at
+        }).execute()
+        return result.data[0] if result.data else None
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        result = self._users().select('*').eq('email', email).execute()
+        return result.data[0] if result.data else None
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        result = self._users().select('*').eq('id', user_id).execute()
+        return result.data[0] if result.data else None
+
+    def update_user_password_hash(self, user_id: int, password_hash: str, updated_at: str) -> bool:
+        result = self._users().update({
+            'password_hash': password_hash,
+            'updated_at': updated_at
+        }).eq('id', user_id).execute()
+        return bool(result.data)
+
+    # business_ideas
+
+    def insert_ideas(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._ideas().insert(rows).execute().data or []
+
+    def get_ideas_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        result = self._ideas().select('*').eq('user_id', user_id).order('created_at', desc=True).order('id', desc=True).limit(limit).execute()
+        return result.data or []
+
+    def get_idea_summaries_by_user(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        result = self._ideas().select(','.join(SUMMARY_COLUMNS)).eq('user_id', user_id).order('created_at', desc=True).order('id', desc=True).limit(limit).execute()
+        return result.data or []
+
+    def get_ideas_page(self, user_id: int, limit: int, before: Optional[Tuple[str, int]] = None,
+                       after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        query = self._ideas().select('*').eq('user_id', user_id)
+        cursor = before or after
+        if cursor:
+            created_at, idea_id = cursor
+            op = 'lt' if before else 'gt'
+            query = query.or_(f'created_at.{op}."{created_at}",and(created_at.eq."{created_at}",id.{op}.{idea_id})')
+
+        descending = after is None
+        result = query.order('created_at', desc=descending).order('id', desc=descending).limit(limit).execute()
+        return result.data or []
+
+    def get_idea_by_id(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        result = self._ideas().select('*').eq('id', idea_id).execute()
+        return result.data[0] if result.data else None
+
+    def get_idea_version(self, idea_id: int) -> Optional[Dict[str, Any]]:
+        result = self._ideas().select(','.join(VERSION_COLUMNS)).eq('id', idea_id).execute()
+        return result.data[0] if result.data else None
+
+    def get_latest_idea_version(self, user_id: int) -> Optional[Dict[str, Any]]:
+        result = self._ideas().select(','.join(VERSION_COLUMNS)).eq('user_id', user_id).order('created_at', desc=True).order('id', desc=True).limit(1).execute()
+        return result.data[0] if result.data else None
+
+    def search_ideas(self, user_id: int, query: str, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        tsquery = build_tsquery(query)
+        if not tsquery:
+            return []
+        result = self.service_client.rpc('search_business_ideas', {
+            'p_user_id': user_id,
+            'p_query': tsquery,
+            'p_limit': limit,
+            'p_offset': offset
+        }).execute()
+        return result.data or []
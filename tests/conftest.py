@@ -0,0 +1,13 @@
+import pytest
+from storage import set_storage
+from storage.sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def storage():
+    """An in-memory SQLite backend installed as the process-wide storage"""
+    backend = SQLiteBackend(':memory:')
+    set_storage(backend)
+    yield backend
+    set_storage(None)
+    backend.close()
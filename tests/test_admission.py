@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+import pytest
+from services import admission as admission_module
+from services import bulk_generation
+from services.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(admission_module.time, 'time', lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def make_controller(tmp_path):
+    def make(**kwargs):
+        options = {'user_rate': 6, 'user_burst': 2, 'global_rate': 60, 'global_burst': 5,
+                   'max_concurrent': 1, 'queue_size': 0, 'queue_timeout': 0}
+        options.update(kwargs)
+        return AdmissionController(str(tmp_path / 'admission.sqlite3'), **options)
+    return make
+
+
+def test_user_bucket_allows_burst_then_rejects_with_429(clock, make_controller):
+    controller = make_controller()
+    controller.take_token(1)
+    controller.take_token(1)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.take_token(1)
+    assert rejected.value.status == 429
+    # 6 per minute refills one token every 10 seconds
+    assert rejected.value.retry_after == 10
+
+
+def test_user_bucket_refills_over_time(clock, make_controller):
+    controller = make_controller()
+    controller.take_token(1)
+    controller.take_token(1)
+
+    clock.now += 10
+    controller.take_token(1)
+    with pytest.raises(AdmissionRejected):
+        controller.take_token(1)
+
+
+def test_users_have_separate_buckets(clock, make_controller):
+    controller = make_controller()
+    controller.take_token(1)
+    controller.take_token(1)
+    controller.take_token(2)
+
+
+def test_global_bucket_rejects_with_503(clock, make_controller):
+    controller = make_controller(global_burst=2)
+    controller.take_token(1)
+    controller.take_token(2)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.take_token(3)
+    assert rejected.value.status == 503
+
+
+def test_without_a_user_only_the_global_bucket_is_charged(clock, make_controller):
+    controller = make_controller()
+    for _ in range(5):
+        controller.take_token(None)
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.take_token(None)
+    assert rejected.value.status == 503
+
+
+def test_buckets_are_shared_through_the_file(clock, make_controller):
+    first, second = make_controller(), make_controller()
+    first.take_token(1)
+    second.take_token(1)
+    with pytest.raises(AdmissionRejected):
+        first.take_token(1)
+
+
+def test_slots_cap_concurrent_workflows(clock, make_controller):
+    controller = make_controller()
+    slot = controller.acquire_slot()
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire_slot()
+    assert rejected.value.status == 503
+
+    controller.release(slot)
+    controller.release(controller.acquire_slot())
+
+
+def test_bulk_tokens_come_from_a_per_user_bulk_bucket(clock, make_controller):
+    controller = make_controller(bulk_rate=6, bulk_burst=3, global_burst=10)
+    for _ in range(3):
+        controller.take_token(1, bulk=True)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.take_token(1, bulk=True)
+    assert rejected.value.status == 429
+    assert rejected.value.retry_after == 10
+
+    # The global budget is not drained: another user, and the same user's interactive bucket, still get in
+    controller.take_token(2)
+    controller.take_token(1)
+
+
+def test_bulk_run_is_capped_per_user_and_leaves_other_users_admitted(clock, make_controller, monkeypatch, storage):
+    controller = make_controller(max_concurrent=4, bulk_burst=4, global_burst=10)
+    workflow = SimpleNamespace(run_workflow=lambda niche, web_search_enabled: {'ideas': [{'name': niche}]})
+    monkeypatch.setattr(bulk_generation, 'get_admission_controller', lambda: controller)
+    monkeypatch.setattr(bulk_generation, 'get_workflow', lambda: workflow)
+
+    rows = list(bulk_generation.generate_bulk(['pet food', 'drone delivery', 'meal kits', 'solar'],
+                                              concurrency=2, requests_per_minute=0, user_id=1))
+    assert rows[-1] == {'type': 'summary', 'total': 4, 'succeeded': 4, 'failed': 0, 'saved': 4}
+
+    # User 1's bulk bucket is spent...
+    with pytest.raises(AdmissionRejected):
+        controller.take_token(1, bulk=True)
+    # ...but a second user is still admitted, and user 1's interactive burst of 2 is untouched
+    controller.take_token(2)
+    controller.take_token(1)
+    controller.take_token(1)
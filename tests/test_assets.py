@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import json
+import pytest
+from flask import Flask
+from routes.assets import assets_bp
+from services import assets
+from services.assets import build_assets, minify_css, minify_js
+
+
+def test_minify_css_strips_comments_and_whitespace():
+    source = '/* header */\nbody {\n  margin : 0 ;\n  color :red;\n}\n\nh1 > a,\nh2 { padding: 1px 2px; }\n'
+    assert minify_css(source) == 'body{margin:0;color:red}h1>a,h2{padding:1px 2px}'
+
+
+def test_minify_css_keeps_strings_and_selector_combinators():
+    source = 'a :hover { content : "a : b; } /* not a comment */" }\n.x::after{font-family : \'Foo  Bar\'}'
+    assert minify_css(source) == 'a :hover{content:"a : b; } /* not a comment */"}.x::after{font-family:\'Foo  Bar\'}'
+
+
+def test_minify_js_drops_comments_and_indentation_but_keeps_line_breaks():
+    source = ('// setup\n'
+              'function add(a, b) {\n'
+              '    /* sum */\n'
+              '    return a + +b\n'
+              '}\n'
+              'const url = "http://example.com" // trailing\n')
+    assert minify_js(source) == 'function add(a,b){\nreturn a+ +b\n}\nconst url="http://example.com"\n'
+
+
+def test_minify_js_copies_regex_and_template_literals_verbatim():
+    source = ('const slash = /[/]+ \\/ x/g;\n'
+              'const half = total / 2 / count;\n'
+              'if (!/^\\s*$/.test(value)) return `a // ${b} /* c */`\n')
+    assert minify_js(source) == ('const slash=/[/]+ \\/ x/g;\n'
+                                 'const half=total/2/count;\n'
+                                 'if(!/^\\s*$/.test(value))return`a // ${b} /* c */`\n')
+
+
+@pytest.fixture
+def static_folder(tmp_path, monkeypatch):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'css' / 'style.css').write_text('body {\n  color : red;\n}\n', encoding='utf-8')
+    (tmp_path / 'js' / 'main.js').write_text('// app\nconsole.log("hi")\n', encoding='utf-8')
+    monkeypatch.setattr(assets, '_manifest', None)
+    return tmp_path
+
+
+def test_build_writes_fingerprinted_precompressed_assets_and_manifest(static_folder):
+    manifest = build_assets(str(static_folder))
+
+    digest = hashlib.sha256(b'body{color:red}').hexdigest()[:12]
+    assert manifest == {'css/style.css': f'css/style.{digest}.css', 'js/main.js': manifest['js/main.js']}
+    dist = static_folder / 'dist'
+    assert json.loads((dist / 'manifest.json').read_text()) == manifest
+    built = dist / manifest['css/style.css']
+    assert built.read_bytes() == b'body{color:red}'
+    assert gzip.decompress((dist / (manifest['css/style.css'] + '.gz')).read_bytes()) == b'body{color:red}'
+    assert assets.fingerprinted_path(str(static_folder), 'css/style.css') == manifest['css/style.css']
+    assert assets.fingerprinted_path(str(static_folder), 'css/missing.css') is None
+
+
+@pytest.fixture
+def client(static_folder):
+    build_assets(str(static_folder))
+    # Only a gzip variant for the script, to check the fallback order
+    manifest = json.loads((static_folder / 'dist' / 'manifest.json').read_text())
+    br = static_folder / 'dist' / (manifest['js/main.js'] + '.br')
+    if br.exists():
+        br.unlink()
+    app = Flask(__name__, static_folder=str(static_folder))
+    app.register_blueprint(assets_bp, url_prefix='/assets')
+    client = app.test_client()
+    client.manifest = manifest
+    return client
+
+
+def test_asset_encoding_follows_accept_encoding(client):
+    css = '/assets/' + client.manifest['css/style.css']
+    js = '/assets/' + client.manifest['js/main.js']
+
+    plain = client.get(css)
+    assert plain.headers.get('Content-Encoding') is None
+    assert plain.data == b'body{color:red}'
+    assert plain.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+    assert plain.mimetype == 'text/css'
+
+    gzipped = client.get(css, headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gzipped.data) == b'body{color:red}'
+
+    # Without a .br file the script falls back to gzip
+    assert client.get(js, headers={'Accept-Encoding': 'br, gzip'}).headers['Content-Encoding'] == 'gzip'
+    assert client.get(css, headers={'Accept-Encoding': 'gzip;q=0, identity'}).headers.get('Content-Encoding') is None
+
+
+def test_brotli_is_preferred_when_built(client):
+    pytest.importorskip('brotli')
+    response = client.get('/assets/' + client.manifest['css/style.css'], headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+
+
+def test_only_manifest_files_are_served(client):
+    assert client.get('/assets/css/style.css').status_code == 404
+    assert client.get('/assets/manifest.json').status_code == 404
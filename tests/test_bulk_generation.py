@@ -0,0 +1,30 @@
+import json
+import pytest
+from flask import Flask
+from routes import ideas as ideas_routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.register_blueprint(ideas_routes.ideas_bp, url_prefix='/ideas')
+    monkeypatch.setattr(ideas_routes, 'generate_bulk',
+                        lambda niches, **kwargs: iter([{'type': 'summary', 'total': len(niches)}]))
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    return client
+
+
+@pytest.mark.parametrize('body', [['pet food'], 'pet food', 7])
+def test_bulk_rejects_json_that_is_not_an_object(client, body):
+    response = client.post('/ideas/bulk', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'The request body must be a JSON object.'}
+
+
+def test_bulk_accepts_a_json_object(client):
+    response = client.post('/ideas/bulk', json={'niches': ['pet food', 'meal kits']})
+    assert response.status_code == 200
+    assert json.loads(response.get_data(as_text=True)) == {'type': 'summary', 'total': 2}
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+import pytest
+from flask import Flask
+from jinja2 import DictLoader
+from routes import ideas as ideas_routes
+from services.fragment_cache import FragmentCache
+
+
+def test_key_separates_rows_templates_and_versions():
+    cache = FragmentCache()
+    cache.set((1, 'card.html', 'v1'), 'one')
+    cache.set((1, 'row.html', 'v1'), 'one as row')
+    cache.set((2, 'card.html', 'v1'), 'two')
+
+    assert cache.get((1, 'card.html', 'v1')) == 'one'
+    assert cache.get((1, 'row.html', 'v1')) == 'one as row'
+    assert cache.get((2, 'card.html', 'v1')) == 'two'
+    assert cache.get((1, 'card.html', 'v2')) is None
+    assert cache.stats() == {'entries': 3, 'bytes': 16, 'hits': 3, 'misses': 1}
+
+
+def test_invalidate_drops_every_fragment_of_one_row():
+    cache = FragmentCache()
+    cache.set((1, 'card.html', 'v1'), 'one')
+    cache.set((1, 'row.html', 'v1'), 'one as row')
+    cache.set((2, 'card.html', 'v1'), 'two')
+
+    cache.invalidate(1)
+    assert cache.get((1, 'card.html', 'v1')) is None
+    assert cache.get((1, 'row.html', 'v1')) is None
+    assert cache.get((2, 'card.html', 'v1')) == 'two'
+    assert cache.stats()['bytes'] == 3
+
+
+def test_evicts_least_recently_used_within_both_bounds():
+    cache = FragmentCache(max_entries=2, max_bytes=10)
+    cache.set((1, 't', None), 'aaaa')
+    cache.set((2, 't', None), 'bbbb')
+    cache.get((1, 't', None))
+    cache.set((3, 't', None), 'cccc')
+    assert cache.get((2, 't', None)) is None
+    assert cache.get((1, 't', None)) == 'aaaa'
+
+    cache.set((4, 't', None), 'd' * 8)
+    assert cache.stats()['entries'] == 1
+    cache.set((5, 't', None), 'e' * 11)
+    assert cache.get((5, 't', None)) is None
+
+
+@pytest.fixture
+def render(monkeypatch):
+    app = Flask(__name__)
+    app.jinja_env.loader = DictLoader({'card.html': '<p>{{ business_idea.niche }}</p>'})
+    cache = FragmentCache()
+    monkeypatch.setattr(ideas_routes, 'get_fragment_cache', lambda: cache)
+
+    def render(idea, debug=False):
+        app.debug = debug
+        with app.app_context():
+            return str(ideas_routes.idea_fragment('card.html', idea))
+    render.cache = cache
+    return render
+
+
+def test_saved_rows_are_rendered_once(render):
+    idea = SimpleNamespace(id=1, niche='pet food', created_at='2026-01-01')
+    assert render(idea) == '<p>pet food</p>'
+    # A cached fragment is served even if the object changed, since saved rows never do
+    idea.niche = 'changed'
+    assert render(idea) == '<p>pet food</p>'
+    assert render.cache.stats()['hits'] == 1
+
+
+def test_unsaved_rows_and_debug_mode_bypass_the_cache(render):
+    assert render(SimpleNamespace(id=None, niche='pet food', created_at=None)) == '<p>pet food</p>'
+    assert render(SimpleNamespace(id=2, niche='meal kits', created_at='2026-01-01'), debug=True) == '<p>meal kits</p>'
+    assert render.cache.stats() == {'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0}
@@ -0,0 +1,110 @@
+import pytest
+from flask import Flask, session, flash, get_flashed_messages
+from routes import ideas as ideas_routes
+from services.http_caching import make_etag, not_modified, with_etag
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv('ETAG_RELEASE', 'test-release')
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    return app
+
+
+@pytest.fixture
+def request_context(app):
+    """Push a request context for a signed-in user, optionally sending If-None-Match"""
+    contexts = []
+
+    def push(if_none_match=None, user_id=1):
+        headers = {'If-None-Match': f'"{if_none_match}"'} if if_none_match else {}
+        context = app.test_request_context('/', headers=headers)
+        context.push()
+        contexts.append(context)
+        session['user_id'] = user_id
+        session['user_email'] = f'user{user_id}@example.com'
+
+    yield push
+    for context in reversed(contexts):
+        context.pop()
+
+
+def test_etag_depends_on_parts_and_user(request_context):
+    request_context(user_id=1)
+    etag = make_etag('view', 7, '2026-01-01')
+    assert etag == make_etag('view', 7, '2026-01-01')
+    assert etag != make_etag('view', 8, '2026-01-01')
+
+    request_context(user_id=2)
+    assert etag != make_etag('view', 7, '2026-01-01')
+
+
+def test_matching_if_none_match_returns_304(request_context):
+    request_context()
+    etag = make_etag('page')
+    request_context(if_none_match=etag)
+
+    response = not_modified(etag)
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'"{etag}"'
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+
+def test_other_etag_is_not_a_match(request_context):
+    request_context(if_none_match='stale')
+    assert not_modified(make_etag('page')) is None
+
+
+def test_pending_flashes_prevent_304(request_context):
+    request_context()
+    etag = make_etag('page')
+    request_context(if_none_match=etag)
+    flash('Saved!')
+    assert not_modified(etag) is None
+
+
+def test_with_etag_sets_private_cache_headers(request_context):
+    request_context()
+    response = with_etag('<p>page</p>', 'abc')
+    assert response.headers['ETag'] == '"abc"'
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Cookie' in response.headers['Vary']
+
+
+def test_page_that_showed_flashes_is_not_stored(request_context):
+    request_context()
+    flash('Saved!')
+    # Rendering the page consumes the flashes
+    get_flashed_messages()
+    response = with_etag('<p>page</p>', 'abc')
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert 'ETag' not in response.headers
+
+
+def test_list_etag_follows_the_newest_row(request_context, monkeypatch):
+    request_context()
+    monkeypatch.setattr(ideas_routes, 'get_write_behind', lambda: None)
+    latest = {'id': 3, 'user_id': 1, 'created_at': '2026-01-03'}
+    monkeypatch.setattr(ideas_routes.BusinessIdea, 'get_latest_version', staticmethod(lambda user_id: latest))
+    etag = ideas_routes.latest_ideas_etag(1, 'dashboard')
+
+    latest = {'id': 4, 'user_id': 1, 'created_at': '2026-01-04'}
+    assert ideas_routes.latest_ideas_etag(1, 'dashboard') != etag
+
+
+def test_no_list_etag_when_the_version_lookup_fails(request_context, monkeypatch):
+    request_context()
+    monkeypatch.setattr(ideas_routes, 'get_write_behind', lambda: None)
+    monkeypatch.setattr(ideas_routes.BusinessIdea, 'get_latest_version', staticmethod(lambda user_id: None))
+    assert ideas_routes.latest_ideas_etag(1, 'dashboard') is None
+
+    monkeypatch.setattr(ideas_routes.BusinessIdea, 'get_latest_version', staticmethod(lambda user_id: {}))
+    assert ideas_routes.latest_ideas_etag(1, 'dashboard') is not None
+
+
+def test_no_list_etag_while_write_behind_is_enabled(request_context, monkeypatch):
+    request_context()
+    monkeypatch.setattr(ideas_routes, 'get_write_behind', lambda: object())
+    monkeypatch.setattr(ideas_routes.BusinessIdea, 'get_latest_version', staticmethod(lambda user_id: {}))
+    assert ideas_routes.latest_ideas_etag(1, 'dashboard') is None
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import pytest
+from services.idea_export import export_ideas
+
+
+@pytest.fixture
+def user_id(storage):
+    user_id = storage.create_user('export@example.com', 'hash', '2026-01-01T00:00:00')['id']
+    storage.insert_ideas([
+        {'user_id': user_id, 'niche': 'Pet food', 'created_at': '2026-01-01T00:00:00', 'web_search_used': True,
+         'ideas': [{'name': '=HYPERLINK("http://evil")', 'pitch': '+1 pitch', 'audience': '-owners',
+                    'revenue_model': '@sub'},
+                   {'name': 'Kibble Box', 'pitch': 'Fresh food', 'audience': 'Dog owners',
+                    'revenue_model': 'Subscription'}]},
+        {'user_id': user_id, 'niche': 'Empty', 'created_at': '2026-01-02T00:00:00', 'ideas': []},
+        {'user_id': user_id, 'niche': 'Drones', 'created_at': '2026-01-03T00:00:00',
+         'ideas': [{'name': 'Sky Drop', 'pitch': 'Line one,\nline "two"'}]},
+    ])
+    return user_id
+
+
+def export(user_id, export_format, chunk_size=2):
+    return ''.join(export_ideas(user_id, export_format, chunk_size=chunk_size))
+
+
+def csv_rows(user_id):
+    text = export(user_id, 'csv')
+    assert text.startswith('\ufeff')
+    return list(csv.DictReader(io.StringIO(text[1:])))
+
+
+def test_csv_escapes_spreadsheet_formulas(user_id):
+    row = next(row for row in csv_rows(user_id) if row['niche'] == 'Pet food' and row['idea_number'] == '1')
+    assert row['name'] == '\'=HYPERLINK("http://evil")'
+    assert row['pitch'] == "'+1 pitch"
+    assert row['audience'] == "'-owners"
+    assert row['revenue_model'] == "'@sub"
+
+
+def test_csv_has_one_row_per_idea_newest_first(user_id):
+    rows = csv_rows(user_id)
+    assert [(row['niche'], row['idea_number'], row['name']) for row in rows] == [
+        ('Drones', '1', 'Sky Drop'),
+        ('Empty', '', ''),
+        ('Pet food', '1', '\'=HYPERLINK("http://evil")'),
+        ('Pet food', '2', 'Kibble Box'),
+    ]
+    assert rows[0]['pitch'] == 'Line one,\nline "two"'
+
+
+def test_ndjson_has_one_record_per_generation(user_id):
+    records = [json.loads(line) for line in export(user_id, 'ndjson').splitlines()]
+    assert [record['niche'] for record in records] == ['Drones', 'Empty', 'Pet food']
+    assert records[2]['web_search_used'] is True
+    # Only CSV is escaped; JSON keeps values as saved
+    assert records[2]['ideas'][0]['name'] == '=HYPERLINK("http://evil")'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 500])
+def test_json_array_is_valid_for_any_chunk_size(user_id, chunk_size):
+    records = json.loads(export(user_id, 'json', chunk_size=chunk_size))
+    assert [record['niche'] for record in records] == ['Drones', 'Empty', 'Pet food']
+
+
+def test_empty_history_exports_valid_documents(storage):
+    assert json.loads(export(99, 'json')) == []
+    assert export(99, 'ndjson') == ''
+    assert len(csv_rows(99)) == 0
@@ -0,0 +1,153 @@
+import json
+from types import SimpleNamespace
+import pytest
+from flask import Flask
+from langchain_core.messages import AIMessageChunk
+from routes import ideas as ideas_routes
+from services import ai_workflow
+from services.ai_workflow import BusinessIdeaWorkflow
+
+IDEAS = [{'name': f'Idea {i}', 'pitch': f'Pitch {i}', 'audience': f'Audience {i}', 'revenue_model': f'Model {i}'}
+         for i in range(3)]
+
+
+def tool_chunks(arguments, size):
+    """A forced tool call's JSON arguments, streamed `size` characters at a time"""
+    for start in range(0, len(arguments), size):
+        yield AIMessageChunk(content='', tool_call_chunks=[{
+            'name': None, 'args': arguments[start:start + size], 'id': None, 'index': 0
+        }])
+
+
+@pytest.fixture
+def make_workflow(monkeypatch):
+    """A workflow with a scripted streaming LLM, no result cache and no web search"""
+    monkeypatch.setattr(ai_workflow, 'get_result_cache', lambda: None)
+    workflow = object.__new__(BusinessIdeaWorkflow)
+    workflow.model_name = 'test-model'
+    workflow.request_budget = 30
+    workflow.prompt_builder = SimpleNamespace(build=lambda niche, web_data: [niche])
+    workflow.seen = []
+
+    def make(arguments, size=7):
+        def scripted(prompt, timeout):
+            for chunk in tool_chunks(arguments, size):
+                workflow.seen.append(chunk.tool_call_chunks[0]['args'])
+                yield chunk
+        workflow.structured_llm = SimpleNamespace(stream=scripted)
+        return workflow
+    return make
+
+
+def test_each_idea_is_emitted_once_the_next_one_starts(make_workflow):
+    arguments = json.dumps({'ideas': IDEAS})
+    flow = make_workflow(arguments)
+
+    events = []
+    for event in flow.stream_ideas('pet food'):
+        events.append((event, ''.join(flow.seen)))
+
+    ideas = [(event, streamed) for event, streamed in events if event['type'] == 'idea']
+    assert [event['idea'] for event, _ in ideas] == IDEAS
+    assert [event['index'] for event, _ in ideas] == [0, 1, 2]
+    # The first two ideas go out before the stream ends; the last one only when it does
+    assert len(ideas[0][1]) < len(ideas[1][1]) < len(arguments)
+    assert ideas[2][1] == arguments
+
+    done = events[-1][0]
+    assert done['type'] == 'done'
+    assert done['result'] == {'ideas': IDEAS, 'web_search_used': False, 'niche': 'pet food', 'sources': []}
+
+
+def test_single_character_chunks_parse_the_same(make_workflow):
+    events = list(make_workflow(json.dumps({'ideas': IDEAS}), size=1).stream_ideas('pet food'))
+    assert [event['idea'] for event in events if event['type'] == 'idea'] == IDEAS
+
+
+def test_truncated_arguments_end_in_an_error_event(make_workflow):
+    arguments = json.dumps({'ideas': IDEAS})
+    events = list(make_workflow(arguments[:len(arguments) // 2]).stream_ideas('pet food'))
+    # Ideas completed before the cut still went out
+    assert [event['type'] for event in events] == ['idea', 'error']
+    assert events[-1]['error'].startswith('Failed to generate ideas:')
+
+
+def test_no_ideas_is_an_error(make_workflow):
+    events = list(make_workflow(json.dumps({'ideas': []})).stream_ideas('pet food'))
+    assert events == [{'type': 'error', 'error': 'No ideas were generated'}]
+
+
+def test_failed_web_search_is_reported_and_generation_goes_on(make_workflow):
+    flow = make_workflow(json.dumps({'ideas': IDEAS}))
+    flow._web_search_node = lambda state: dict(state, error='Tavily is down')
+    events = list(flow.stream_ideas('pet food', web_search_enabled=True))
+
+    assert events[0] == {'type': 'status', 'status': 'web_search_failed',
+                         'message': 'Web search is unavailable; generating ideas without it.'}
+    assert events[-1]['result']['web_search_used'] is False
+
+
+def parse_sse(body):
+    """[(event, data)] from a text/event-stream body"""
+    frames = []
+    for frame in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in frame.splitlines())
+        frames.append((lines['event'], json.loads(lines['data'])))
+    return frames
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.register_blueprint(ideas_routes.ideas_bp, url_prefix='/ideas')
+    monkeypatch.setattr(ideas_routes, 'get_inflight_registry', lambda: None)
+    monkeypatch.setattr(ideas_routes, 'get_admission_controller', lambda: None)
+    saved = []
+    monkeypatch.setattr(ideas_routes.IdeaStorageService, 'save_ideas',
+                        lambda **row: saved.append(row) or SimpleNamespace(id=42))
+    client = app.test_client()
+    client.saved = saved
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    return client
+
+
+def test_sse_stream_relays_events_and_saves_once(client, monkeypatch):
+    def stream_ideas(niche, web_search_enabled, bypass_cache):
+        yield {'type': 'sources', 'sources': [{'url': 'https://example.com'}]}
+        for index, idea in enumerate(IDEAS):
+            yield {'type': 'idea', 'index': index, 'idea': idea}
+        yield {'type': 'done', 'result': {'ideas': IDEAS, 'web_search_used': True, 'sources': []}}
+    monkeypatch.setattr(ideas_routes, 'get_workflow', lambda: SimpleNamespace(stream_ideas=stream_ideas))
+
+    response = client.post('/ideas/generate/stream', data={'niche': 'pet food', 'web_search': 'on'})
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert parse_sse(response.get_data(as_text=True)) == [
+        ('sources', {'sources': [{'url': 'https://example.com'}]}),
+        ('idea', {'index': 0, 'idea': IDEAS[0]}),
+        ('idea', {'index': 1, 'idea': IDEAS[1]}),
+        ('idea', {'index': 2, 'idea': IDEAS[2]}),
+        ('done', {'saved': True, 'idea_id': 42, 'count': 3}),
+    ]
+    assert client.saved == [{'user_id': 1, 'niche': 'pet food', 'ideas': IDEAS, 'web_search_used': True}]
+
+
+def test_sse_stream_turns_a_crash_into_an_error_event(client, monkeypatch):
+    def stream_ideas(niche, web_search_enabled, bypass_cache):
+        yield {'type': 'idea', 'index': 0, 'idea': IDEAS[0]}
+        raise RuntimeError('boom')
+    monkeypatch.setattr(ideas_routes, 'get_workflow', lambda: SimpleNamespace(stream_ideas=stream_ideas))
+
+    response = client.post('/ideas/generate/stream', data={'niche': 'pet food'})
+    assert parse_sse(response.get_data(as_text=True)) == [
+        ('idea', {'index': 0, 'idea': IDEAS[0]}),
+        ('error', {'error': 'An error occurred while generating ideas. Please try again.'}),
+    ]
+    assert client.saved == []
+
+
+def test_sse_stream_validates_the_niche(client):
+    response = client.post('/ideas/generate/stream', data={'niche': ''})
+    assert response.status_code == 400
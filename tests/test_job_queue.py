@@ -0,0 +1,105 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from services import job_queue as job_queue_module
+from services.job_queue import LocalJobQueue, QueueFullError
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(runner, **kwargs):
+        queue = LocalJobQueue(str(tmp_path / 'jobs.sqlite3'), runner=runner, poll_interval=0.01, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def finish(queue, job):
+    """Wait until the job reaches a terminal status"""
+    seen = queue.get(job.id)
+    while not seen.done:
+        seen = queue.wait_for_change(job.id, seen.version, timeout=2)
+    return seen
+
+
+def test_submitted_job_runs_and_completes(make_queue):
+    queue = make_queue(lambda job: {'status': 'completed', 'result': {'ideas': [job.niche]}, 'idea_id': 7})
+    job = queue.submit(1, 'pet food', web_search_enabled=True)
+    assert job.status == 'queued'
+
+    done = finish(queue, job)
+    assert done.status == 'completed'
+    assert done.started_at is not None and done.finished_at is not None
+    assert done.to_dict()['ideas'] == ['pet food']
+    assert done.to_dict()['idea_id'] == 7
+    assert queue.pending() == 0
+
+
+@pytest.mark.parametrize('runner, error', [
+    (lambda job: {'status': 'failed', 'error': 'No ideas'}, 'No ideas'),
+    (lambda job: 1 / 0, 'An error occurred while generating ideas.'),
+    (lambda job: {'status': 'running'}, 'Job finished without a result'),
+])
+def test_failed_jobs_record_their_error(make_queue, runner, error):
+    queue = make_queue(runner)
+    done = finish(queue, queue.submit(1, 'pet food'))
+    assert done.status == 'failed'
+    assert done.error == error
+
+
+def test_full_queue_rejects_before_admitting(make_queue):
+    release = threading.Event()
+    queue = make_queue(lambda job: release.wait(2) and {'status': 'completed', 'result': {}}, max_depth=1)
+    admitted = []
+    queue.submit(1, 'pet food', admit=lambda: admitted.append(1))
+
+    with pytest.raises(QueueFullError):
+        queue.submit(2, 'meal kits', admit=lambda: admitted.append(2))
+    # The second user's admission token was never spent
+    assert admitted == [1]
+    release.set()
+
+
+def test_rejected_admission_stores_nothing(make_queue):
+    ran = []
+    queue = make_queue(lambda job: ran.append(job) or {'status': 'completed', 'result': {}})
+
+    def reject():
+        raise RuntimeError('rate limited')
+
+    with pytest.raises(RuntimeError):
+        queue.submit(1, 'pet food', admit=reject)
+    assert queue.pending() == 0
+    assert queue._connection().execute('SELECT COUNT(*) FROM generation_jobs').fetchone()[0] == 0
+    assert ran == []
+
+
+def test_finished_jobs_expire_after_ttl_and_stale_jobs_fail(make_queue, monkeypatch):
+    release = threading.Event()
+    queue = make_queue(lambda job: release.wait(2) and {'status': 'completed', 'result': {}},
+                       max_workers=1, ttl_seconds=60, stale_seconds=600)
+    finished = queue.submit(1, 'pet food')
+    release.set()
+    finish(queue, finished)
+    release.clear()
+    stuck = queue.submit(1, 'meal kits')
+
+    clock = SimpleNamespace(now=time.time() + 61)
+    monkeypatch.setattr(job_queue_module, 'time', SimpleNamespace(time=lambda: clock.now,
+                                                                  monotonic=time.monotonic, sleep=time.sleep))
+    assert queue.cleanup() == 1
+    assert queue.get(finished.id) is None
+    assert queue.get(stuck.id).status in ('queued', 'running')
+
+    clock.now += 600
+    queue.cleanup()
+    interrupted = queue.get(stuck.id)
+    assert interrupted.status == 'failed'
+    assert interrupted.error == 'The job was interrupted.'
+    release.set()
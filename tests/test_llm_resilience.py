@@ -0,0 +1,150 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from prometheus_client import REGISTRY
+from services import llm_resilience
+from services.llm_resilience import CircuitBreaker, LatencyWindow, ResilientLLM
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(llm_resilience, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def open_breaker(breaker, calls=4):
+    for _ in range(calls):
+        assert breaker.allow()
+        breaker.record_failure()
+        breaker.release()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_latency_percentile():
+    window = LatencyWindow(size=100)
+    assert window.percentile(95) is None
+    for ms in range(1, 101):
+        window.add(ms / 1000)
+    assert window.percentile(50) == 0.05
+    assert window.percentile(95) == 0.095
+    assert window.percentile(100) == 0.1
+
+
+def test_stays_closed_below_min_calls_or_failure_ratio(clock):
+    breaker = CircuitBreaker(failure_ratio=0.5, window=10, min_calls=4)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker = CircuitBreaker(failure_ratio=0.5, window=10, min_calls=4)
+    for succeeded in (True, True, True, False, True, False):
+        if succeeded:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_opens_at_failure_ratio_and_rejects_until_reset(clock):
+    breaker = CircuitBreaker(failure_ratio=0.5, window=10, min_calls=4, reset_seconds=30)
+    open_breaker(breaker)
+
+    assert not breaker.allow()
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_half_open_admits_one_trial_and_closes_on_success(clock):
+    breaker = CircuitBreaker(min_calls=4, reset_seconds=30)
+    open_breaker(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(min_calls=4, reset_seconds=30)
+    open_breaker(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    breaker.record_failure()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_abandoned_trial_lets_the_next_call_through(clock):
+    breaker = CircuitBreaker(min_calls=4, reset_seconds=30)
+    open_breaker(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+class BlockingLLM:
+    """Answers only once released, like an API call that outlives its deadline"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        self.release.wait(5)
+        return 'late'
+
+
+def hedges(outcome):
+    return REGISTRY.get_sample_value('idea_llm_hedges_total', {'outcome': outcome}) or 0
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    # One request thread, so the LLM pool gets two
+    monkeypatch.delenv('LLM_THREADS', raising=False)
+    monkeypatch.setenv('WSGI_THREADS', '1')
+    monkeypatch.setattr(llm_resilience, '_executor', None)
+    monkeypatch.setattr(llm_resilience, '_in_flight', 0)
+    yield
+    # Abandoned calls must finish before the in-flight count is restored
+    llm_resilience._executor.shutdown(wait=True)
+
+
+def test_timed_out_call_does_not_block_the_next_one(small_pool):
+    slow = BlockingLLM()
+    with pytest.raises(TimeoutError):
+        ResilientLLM(slow, hedge_percentile=0).invoke('prompt', timeout=0.05)
+
+    fast = ResilientLLM(SimpleNamespace(invoke=lambda prompt: 'ideas'), hedge_percentile=0)
+    started = time.monotonic()
+    assert fast.invoke('prompt', timeout=1) == 'ideas'
+    assert time.monotonic() - started < 0.5
+    slow.release.set()
+
+
+def test_no_hedge_while_the_pool_is_busy(small_pool):
+    slow = BlockingLLM()
+    llm = ResilientLLM(slow, hedge_min_samples=1, hedge_min_delay=0.01)
+    llm.latencies.add(0.01)
+    # An abandoned call still holds one of the two threads
+    with pytest.raises(TimeoutError):
+        ResilientLLM(slow, hedge_percentile=0).invoke('prompt', timeout=0.05)
+
+    fired, skipped = hedges('fired'), hedges('skipped')
+    with pytest.raises(TimeoutError):
+        llm.invoke('prompt', timeout=0.2)
+    assert hedges('fired') == fired
+    assert hedges('skipped') == skipped + 1
+    slow.release.set()
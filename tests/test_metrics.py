@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import pytest
+import app as app_module
+from services import metrics
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_metrics_are_served_without_a_token(client, monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    assert b'idea_cache_requests_total' in response.data
+
+
+def test_metrics_require_the_bearer_token_when_set(client, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'secret'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_scrape_hooks_refresh_gauges_and_survive_errors(monkeypatch):
+    monkeypatch.setattr(metrics, '_scrape_hooks', [])
+    metrics.on_scrape(lambda: 1 / 0)
+    metrics.on_scrape(lambda: metrics.JOB_QUEUE_PENDING.set(7))
+
+    body, _ = metrics.render_metrics()
+    assert b'idea_job_queue_pending 7.0' in body
+
+
+WORKER = """
+from services.metrics import CACHE_REQUESTS, GENERATIONS_IN_FLIGHT
+CACHE_REQUESTS.labels(cache='ideas', result='hit').inc(3)
+GENERATIONS_IN_FLIGHT.inc(2)
+"""
+
+SCRAPER = """
+from services.metrics import CACHE_REQUESTS, GENERATIONS_IN_FLIGHT, render_metrics
+CACHE_REQUESTS.labels(cache='ideas', result='hit').inc()
+GENERATIONS_IN_FLIGHT.inc()
+print(render_metrics()[0].decode())
+"""
+
+
+def test_multiprocess_mode_aggregates_workers_and_drops_dead_live_gauges(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', WORKER], cwd=root, env=env, check=True)
+    scraped = subprocess.run([sys.executable, '-c', SCRAPER], cwd=root, env=env, check=True,
+                             capture_output=True, text=True).stdout
+
+    # Counters from the exited worker still count; its live gauge was dropped at exit
+    assert 'idea_cache_requests_total{cache="ideas",result="hit"} 4.0' in scraped
+    assert 'idea_generations_in_flight 1.0' in scraped
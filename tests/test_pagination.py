@@ -0,0 +1,52 @@
+import pytest
+from models import BusinessIdea
+
+
+@pytest.fixture
+def user_id(storage):
+    user_id = storage.create_user('pager@example.com', 'hash', '2026-01-01T00:00:00')['id']
+    # Two rows share a timestamp, so ordering must fall back to the id
+    storage.insert_ideas([{
+        'user_id': user_id,
+        'niche': f'niche {i}',
+        'ideas': [{'name': f'idea {i}'}],
+        'created_at': f'2026-01-01T00:00:{min(i, 5):02d}'
+    } for i in range(7)])
+    return user_id
+
+
+def niches(ideas):
+    return [idea.niche for idea in ideas]
+
+
+def test_cursor_round_trip():
+    cursor = BusinessIdea.encode_cursor('2026-01-01T00:00:00', 42)
+    assert BusinessIdea.decode_cursor(cursor) == ('2026-01-01T00:00:00', 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', BusinessIdea.encode_cursor('x', 1)[:-2]])
+def test_malformed_cursor_decodes_to_none(cursor):
+    assert BusinessIdea.decode_cursor(cursor) is None
+
+
+def test_pages_forward_newest_first_without_gaps(user_id):
+    first, has_more = BusinessIdea.get_page(user_id, per_page=3)
+    assert niches(first) == ['niche 6', 'niche 5', 'niche 4']
+    assert has_more
+
+    second, has_more = BusinessIdea.get_page(user_id, per_page=3, before=BusinessIdea.decode_cursor(first[-1].cursor))
+    assert niches(second) == ['niche 3', 'niche 2', 'niche 1']
+    assert has_more
+
+    last, has_more = BusinessIdea.get_page(user_id, per_page=3, before=BusinessIdea.decode_cursor(second[-1].cursor))
+    assert niches(last) == ['niche 0']
+    assert not has_more
+
+
+def test_pages_backward_in_newest_first_order(user_id):
+    first, _ = BusinessIdea.get_page(user_id, per_page=3)
+    second, _ = BusinessIdea.get_page(user_id, per_page=3, before=BusinessIdea.decode_cursor(first[-1].cursor))
+
+    previous, has_more = BusinessIdea.get_page(user_id, per_page=3, after=BusinessIdea.decode_cursor(second[0].cursor))
+    assert niches(previous) == niches(first)
+    assert not has_more
@@ -0,0 +1,93 @@
+import time
+import pytest
+from werkzeug.security import generate_password_hash, check_password_hash
+import app as app_module
+from models import User
+from routes import auth as auth_routes
+from services.password_hashing import PasswordHasher, HashingBusyError, normalize_method
+
+
+def test_normalize_method_fills_in_werkzeug_defaults():
+    assert normalize_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+    assert normalize_method('pbkdf2:sha512').startswith('pbkdf2:sha512:')
+    assert normalize_method('pbkdf2') == normalize_method('pbkdf2:sha256')
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    assert normalize_method('scrypt:16384') == 'scrypt:16384:8:1'
+
+
+def test_needs_rehash_when_method_or_cost_changed():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000')
+    assert not hasher.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:1000'))
+    assert hasher.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:500'))
+    assert hasher.needs_rehash(generate_password_hash('secret', 'scrypt:16384:8:1'))
+
+
+def test_pool_hashes_and_verifies_in_worker_processes():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', max_workers=1)
+    try:
+        pwhash = hasher.hash('secret')
+        assert pwhash.startswith('pbkdf2:sha256:1000$')
+        assert hasher.verify(pwhash, 'secret')
+        assert not hasher.verify(pwhash, 'wrong')
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_pool_fails_fast_and_timed_out_work_keeps_its_slot():
+    hasher = PasswordHasher(max_workers=1, max_pending=1, timeout=0.2)
+    try:
+        hasher._run(abs, 1)  # start the worker process outside the timed part
+        with pytest.raises(HashingBusyError, match='timed out'):
+            hasher._run(time.sleep, 1)
+        # The abandoned sleep still occupies the only slot
+        with pytest.raises(HashingBusyError, match='saturated'):
+            hasher._run(abs, 1)
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                assert hasher._run(abs, -2) == 2
+                break
+            except HashingBusyError:
+                time.sleep(0.05)
+        else:
+            pytest.fail('the slot was never released')
+    finally:
+        hasher.shutdown()
+
+
+@pytest.fixture
+def login(storage, monkeypatch):
+    """Log in through the real app with an inline hasher configured for pbkdf2:sha256:1000"""
+    monkeypatch.setitem(app_module.app.config, 'WTF_CSRF_ENABLED', False)
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000')
+    monkeypatch.setattr(hasher, '_run', lambda fn, *args: fn(*args))
+    monkeypatch.setattr(auth_routes, 'get_password_hasher', lambda: hasher)
+    client = app_module.app.test_client()
+
+    def login(email, password):
+        return client.post('/auth/login', data={'email': email, 'password': password})
+    return login
+
+
+def test_login_upgrades_an_outdated_hash(login):
+    user = User.create('old@example.com', generate_password_hash('secret', 'pbkdf2:sha256:500'))
+
+    response = login('old@example.com', 'secret')
+    assert response.status_code == 302
+    upgraded = User.get_by_email('old@example.com').password_hash
+    assert upgraded.startswith('pbkdf2:sha256:1000$')
+    assert check_password_hash(upgraded, 'secret')
+    assert User.get_by_email('old@example.com').id == user.id
+
+
+def test_login_keeps_a_current_hash_and_never_rehashes_on_failure(login):
+    current = generate_password_hash('secret', 'pbkdf2:sha256:1000')
+    User.create('current@example.com', current)
+    outdated = generate_password_hash('secret', 'pbkdf2:sha256:500')
+    User.create('old@example.com', outdated)
+
+    assert login('current@example.com', 'secret').status_code == 302
+    assert User.get_by_email('current@example.com').password_hash == current
+    assert login('old@example.com', 'wrong').status_code == 200
+    assert User.get_by_email('old@example.com').password_hash == outdated
@@ -0,0 +1,62 @@
+import pytest
+from services import prompt_builder
+from services.prompt_builder import PromptBuilder
+
+
+@pytest.fixture
+def builder(monkeypatch):
+    # Four characters per token, so budgets do not depend on tiktoken's BPE files
+    monkeypatch.setattr(prompt_builder, '_encoding', lambda model_name: None)
+    return PromptBuilder('gpt-4o-mini', context_tokens=500)
+
+
+def test_repeated_sentences_are_kept_once(builder):
+    web_data = ("Pet food sales grew 8% last year. Premium brands lead.\n"
+                "pet food sales grew 8% last year! Subscription boxes are rising.")
+    assert builder.compress_context(web_data) == (
+        "Pet food sales grew 8% last year. Premium brands lead.\n"
+        "Subscription boxes are rising.")
+
+
+def test_budget_cuts_at_whole_sentences(builder):
+    builder.context_tokens = 20
+    # Each sentence is 10 estimated tokens plus one for the separator
+    sentences = [f"Sentence number {i} about pet food." for i in range(5)]
+    assert [builder.count_tokens(s) + 1 for s in sentences] == [10] * 5
+
+    assert builder.compress_context(' '.join(sentences)) == ' '.join(sentences[:2])
+
+
+def test_empty_research_or_budget_gives_no_context(builder):
+    assert builder.compress_context('') == ''
+    builder.context_tokens = 0
+    assert builder.compress_context('Pet food sales grew.') == ''
+
+
+def test_scaffolding_and_short_navigation_lines_are_dropped(builder):
+    web_data = ("Recent market insights:\n"
+                "1. [market size] Pet food outlook\n"
+                "Sign up for our newsletter\n"
+                "Privacy Policy | Terms of Service\n"
+                "Source: https://example.com/pet-food\n"
+                "Demand for fresh pet food keeps growing.")
+    assert builder.compress_context(web_data, 'pet food') == (
+        "1. [market size] Pet food outlook\n"
+        "Demand for fresh pet food keeps growing.")
+
+
+def test_boilerplate_words_inside_longer_text_are_kept(builder):
+    web_data = ("Cookiecutter kits and blogin tools are popular.\n"
+                "Brands that subscribe customers to monthly deliveries retain far more of them over a year.")
+    assert builder.compress_context(web_data, 'meal kits') == web_data
+
+
+def test_lines_that_mention_the_niche_are_never_dropped(builder):
+    web_data = "Subscribe to meal kits weekly\nSubscribe to our newsletter"
+    assert builder.compress_context(web_data, 'meal kits') == "Subscribe to meal kits weekly"
+
+
+def test_build_puts_compressed_context_in_the_user_message(builder):
+    system, user = builder.build('pet food', 'Source: https://example.com\nPet food sales grew.')
+    assert system.content == prompt_builder.STATIC_INSTRUCTIONS
+    assert user.content == 'Niche: "pet food"\n\nRecent market research and trends:\nPet food sales grew.'
@@ -0,0 +1,63 @@
+import pytest
+from services.request_coalescing import InFlightRegistry
+
+TOKEN = 'form-token-1234'
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return InFlightRegistry(str(tmp_path / 'inflight.sqlite3'), result_seconds=10, token_seconds=600,
+                            stale_seconds=90, poll_interval=0.01)
+
+
+def test_key_normalizes_the_niche():
+    assert InFlightRegistry.make_key(1, 'AI for healthcare', True) == InFlightRegistry.make_key(1, 'Healthcare AI', True)
+
+
+@pytest.mark.parametrize('other', [
+    (2, 'healthcare ai', True, False),
+    (1, 'fintech', True, False),
+    (1, 'healthcare ai', False, False),
+    (1, 'healthcare ai', True, True),
+])
+def test_key_separates_user_niche_and_flags(other):
+    assert InFlightRegistry.make_key(1, 'healthcare ai', True, False) != InFlightRegistry.make_key(*other)
+
+
+def test_token_key_still_includes_niche_and_flags():
+    key = InFlightRegistry.make_key(1, 'healthcare ai', True, token=TOKEN)
+    assert key == InFlightRegistry.make_key(1, 'AI for healthcare', True, token=TOKEN)
+    assert key != InFlightRegistry.make_key(1, 'fintech', True, token=TOKEN)
+    assert key != InFlightRegistry.make_key(1, 'healthcare ai', False, token=TOKEN)
+    assert key != InFlightRegistry.make_key(1, 'healthcare ai', True)
+
+
+def test_malformed_token_is_ignored():
+    assert InFlightRegistry.make_key(1, 'healthcare ai', True, token='x|y') == InFlightRegistry.make_key(1, 'healthcare ai', True)
+
+
+def test_followers_share_the_leaders_result(registry):
+    key = registry.make_key(1, 'healthcare ai', True)
+    assert registry.claim(key)
+    assert not registry.claim(key)
+
+    registry.complete(key, {'ideas': ['a']})
+    assert registry.wait(key) == {'ideas': ['a']}
+
+
+def test_abandoned_leader_reports_failure_and_frees_the_key(registry):
+    key = registry.make_key(1, 'healthcare ai', True)
+    assert registry.claim(key)
+    registry.abandon(key)
+
+    assert registry.wait(key) is None
+    assert registry.claim(key)
+
+
+def test_reused_token_with_another_niche_does_not_replay(registry):
+    first = registry.make_key(1, 'healthcare ai', True, token=TOKEN)
+    assert registry.claim(first)
+    registry.complete(first, {'ideas': ['a']})
+
+    assert not registry.claim(first)
+    assert registry.claim(registry.make_key(1, 'fintech', True, token=TOKEN))
@@ -0,0 +1,98 @@
+import threading
+import pytest
+from types import SimpleNamespace
+from services.research import ResearchService, normalize_url
+
+
+def service(results=None, **kwargs):
+    """A ResearchService over a fake search whose rows are looked up by query angle"""
+    def search(query, max_results):
+        angle = next(angle for angle, text in research.queries('pet food').items() if text == query)
+        rows = (results or {}).get(angle, [])
+        return rows() if callable(rows) else rows
+    research = ResearchService(SimpleNamespace(available=lambda: True, results=search), **kwargs)
+    return research
+
+
+def row(url, content, score=0.5, title='Title'):
+    return {'url': url, 'content': content, 'score': score, 'title': title}
+
+
+def test_normalize_url_drops_scheme_www_tracking_and_trailing_slash():
+    assert normalize_url('https://www.Example.com/pets/?utm_source=x&b=2&a=1#top') == 'example.com/pets?a=1&b=2'
+    assert normalize_url('http://example.com/pets?fbclid=abc') == 'example.com/pets'
+    assert normalize_url('example.com/pets?page=2') != normalize_url('example.com/pets?page=3')
+
+
+def test_same_page_from_several_angles_is_merged():
+    research = service()
+    merged = research._dedupe({
+        'trends': [row('https://www.example.com/pets/?utm_source=feed', 'Short.', score=0.4)],
+        'pricing': [row('http://example.com/pets', 'A longer snippet about pet food pricing.', score=0.9)],
+    })
+    assert len(merged) == 1
+    assert merged[0]['angles'] == ['trends', 'pricing']
+    assert merged[0]['score'] == 0.9
+    assert merged[0]['content'] == 'A longer snippet about pet food pricing.'
+
+
+def test_near_identical_content_keeps_the_higher_scored_copy():
+    text = 'Premium pet food sales grew twelve percent as owners shift toward fresh and organic recipes'
+    research = service()
+    unique = research._dedupe({'trends': [
+        row('https://a.com/1', text, score=0.3),
+        row('https://b.com/2', text + ' this year', score=0.8),
+        row('https://c.com/3', 'Subscription boxes for dog treats are a crowded market', score=0.5),
+        row('https://d.com/4', '', title=''),
+    ]})
+    assert [r['url'] for r in unique] == ['https://b.com/2', 'https://c.com/3']
+
+
+def test_rank_weighs_score_niche_coverage_and_angle_count():
+    ranked = ResearchService._rank('pet food', [
+        dict(row('a', 'Unrelated logistics news', score=0.6), angles=['trends']),
+        dict(row('b', 'Pet food demand', score=0.4), angles=['trends']),
+        dict(row('c', 'Pet supplies', score=0.3), angles=['trends', 'pricing', 'competitors']),
+    ])
+    # b: 0.2 + 0.4 coverage; c: 0.15 + 0.2 half coverage + 0.2 for two extra angles; a: 0.3 only
+    assert [r['url'] for r in ranked] == ['b', 'c', 'a']
+    assert [r['relevance'] for r in ranked] == pytest.approx([0.6, 0.55, 0.3])
+
+
+def test_pack_stays_within_max_chars_and_lists_sources():
+    research = service(max_chars=120, snippet_chars=40)
+    packed = research._pack([
+        dict(row('https://a.com', 'First snippet. ' * 5, title='A'), angles=['pain_points']),
+        dict(row('https://b.com', 'x' * 200, title='B'), angles=['trends']),
+        dict(row('', 'Third snippet without a link.', title='C'), angles=['pricing']),
+    ])
+    assert packed['text'].startswith('Recent Market Insights:\n1. [pain points] A\n')
+    assert '2. [pricing] C' in packed['text']
+    assert 'b.com' not in packed['text']
+    assert packed['sources'] == [{'title': 'A', 'url': 'https://a.com'}]
+
+
+def test_research_survives_failed_and_late_queries():
+    release = threading.Event()
+
+    def fail():
+        raise RuntimeError('Tavily error')
+
+    research = service({
+        'trends': [row('https://a.com', 'Pet food grows.', score=0.9)],
+        'competitors': fail,
+        'pain_points': lambda: release.wait(2) and [row('https://late.com', 'Too late.')],
+        'pricing': lambda: None,
+    }, deadline=0.2)
+    result = research.research('pet food')
+    release.set()
+
+    assert result['sources'] == [{'title': 'Title', 'url': 'https://a.com'}]
+    assert 'late.com' not in result['text']
+
+
+def test_research_returns_none_when_nothing_answered_or_search_is_off():
+    assert service({angle: (lambda: None) for angle in ('trends', 'competitors', 'pain_points', 'pricing')}
+                   ).research('pet food') is None
+    off = ResearchService(SimpleNamespace(available=lambda: False))
+    assert off.research('pet food') is None
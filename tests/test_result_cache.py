@@ -0,0 +1,113 @@
+import json
+from services import result_cache
+from services.result_cache import IdeaResultCache, normalize_niche
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def result(name='Idea', padding=''):
+    return {'ideas': [{'name': name, 'pitch': padding}]}
+
+
+def test_normalize_niche_ignores_case_order_punctuation_and_stopwords():
+    assert normalize_niche('AI for healthcare') == 'ai healthcare'
+    assert normalize_niche('Healthcare,  AI!') == 'ai healthcare'
+    assert normalize_niche('the healthcare of AI') == 'ai healthcare'
+
+
+def test_normalize_niche_keeps_stopwords_when_nothing_else_is_left():
+    assert normalize_niche('For The') == 'for the'
+    assert normalize_niche('') == ''
+    assert normalize_niche(None) == ''
+
+
+def test_make_key_separates_web_search_and_model():
+    key = IdeaResultCache.make_key('AI for healthcare', True, 'gpt-4o-mini')
+    assert key == IdeaResultCache.make_key('healthcare ai', True, 'gpt-4o-mini')
+    assert key != IdeaResultCache.make_key('healthcare ai', False, 'gpt-4o-mini')
+    assert key != IdeaResultCache.make_key('healthcare ai', True, 'gpt-4o')
+
+
+def test_evicts_least_recently_used_entry():
+    cache = IdeaResultCache(max_entries=2)
+    cache.set('a', result('a'))
+    cache.set('b', result('b'))
+    assert cache.get('a') == result('a')
+    cache.set('c', result('c'))
+
+    assert cache.get('b') is None
+    assert cache.get('a') == result('a')
+    assert cache.get('c') == result('c')
+
+
+def test_evicts_to_stay_within_byte_bound():
+    size = len(json.dumps(result('a', 'x' * 100)))
+    cache = IdeaResultCache(max_entries=100, max_bytes=int(size * 2.5))
+    for name in 'abc':
+        cache.set(name, result(name, 'x' * 100))
+
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+    assert cache.get('c') is not None
+
+
+def test_skips_values_larger_than_byte_bound():
+    cache = IdeaResultCache(max_bytes=10)
+    cache.set('a', result('a', 'x' * 100))
+    assert cache.get('a') is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache.time, 'time', clock)
+    cache = IdeaResultCache(ttl_seconds=60)
+    cache.set('a', result())
+
+    clock.now += 59
+    assert cache.get('a') == result()
+    clock.now += 2
+    assert cache.get('a') is None
+
+
+def test_sqlite_tier_is_shared_and_capped(tmp_path):
+    path = str(tmp_path / 'results.sqlite3')
+    writer = IdeaResultCache(sqlite_path=path, sqlite_max_entries=2)
+    reader = IdeaResultCache(sqlite_path=path)
+    for name in 'abc':
+        writer.set(name, result(name))
+
+    assert reader.get('c') == result('c')
+    rows = reader._connection().execute('SELECT COUNT(*) FROM idea_results').fetchone()[0]
+    assert rows == 2
+
+
+def test_stats_count_hits_misses_and_hits_per_entry():
+    cache = IdeaResultCache()
+    cache.set('a', result('a'))
+    cache.set('b', result('b'))
+    cache.get('a')
+    cache.get('a')
+    cache.get('missing')
+
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['entry_hits'] == {'a': 2, 'b': 0}
+
+
+def test_entry_promoted_from_sqlite_tier_counts_its_first_hit(tmp_path):
+    path = str(tmp_path / 'results.sqlite3')
+    IdeaResultCache(sqlite_path=path).set('a', result('a'))
+    reader = IdeaResultCache(sqlite_path=path)
+
+    assert reader.get('a') == result('a')
+    assert reader.get('a') == result('a')
+    assert reader.stats()['entry_hits'] == {'a': 2}
+    assert reader.stats()['hits'] == 2
@@ -0,0 +1,43 @@
+from storage.search_index import build_fts5_query, build_tsquery
+from storage.sqlite_backend import SQLiteBackend
+
+
+def add_idea(backend, user_id, niche, name, pitch='', created_at='2026-01-01T00:00:00'):
+    backend.insert_ideas([{'user_id': user_id, 'niche': niche, 'ideas': [{'name': name, 'pitch': pitch}],
+                           'created_at': created_at}])
+
+
+def test_queries_match_every_word_as_prefix_and_drop_syntax():
+    assert build_fts5_query('Pet food') == '"pet"* AND "food"*'
+    assert build_fts5_query('pet "OR" food* pet') == '"pet"* AND "food"*'
+    assert build_tsquery('pet & !food') == 'pet:* & food:*'
+    assert build_fts5_query('the a') is None
+
+
+def test_search_is_ranked_and_scoped_to_the_user(storage):
+    owner = storage.create_user('owner@example.com', 'hash', '2026-01-01T00:00:00')['id']
+    other = storage.create_user('other@example.com', 'hash', '2026-01-01T00:00:00')['id']
+    # The niche outweighs the pitch, even for an older row
+    add_idea(storage, owner, 'Pet food', 'Kibble Box', created_at='2026-01-01T00:00:00')
+    add_idea(storage, owner, 'Fintech', 'Ledger', pitch='Invoicing for pet shops', created_at='2026-01-02T00:00:00')
+    for niche in ('Gardening', 'Travel', 'Fitness', 'Music', 'Cooking'):
+        add_idea(storage, owner, niche, f'{niche} Hub')
+    add_idea(storage, other, 'Pet grooming', 'Groom Van')
+
+    results = storage.search_ideas(owner, 'pet', limit=10)
+    assert [row['niche'] for row in results] == ['Pet food', 'Fintech']
+    assert results[0]['rank'] > results[1]['rank']
+    assert storage.search_ideas(owner, 'kib box', limit=10)[0]['headline_name'] == 'Kibble Box'
+    assert storage.search_ideas(owner, 'pet', limit=1, offset=1)[0]['niche'] == 'Fintech'
+
+
+def test_rows_written_by_another_connection_are_searchable(tmp_path):
+    path = str(tmp_path / 'ideas.sqlite3')
+    reader, writer = SQLiteBackend(path), SQLiteBackend(path)
+    user_id = writer.create_user('owner@example.com', 'hash', '2026-01-01T00:00:00')['id']
+    assert reader.search_ideas(user_id, 'drone', limit=10) == []
+
+    add_idea(writer, user_id, 'Drone delivery', 'Sky Drop')
+    assert [row['niche'] for row in reader.search_ideas(user_id, 'drone', limit=10)] == ['Drone delivery']
+    reader.close()
+    writer.close()
@@ -0,0 +1,36 @@
+import json
+import sqlite3
+import time
+from services import search_cache
+from services.search_cache import SearchCache
+
+
+def test_entries_are_fresh_then_stale_then_gone(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(search_cache.time, 'time', lambda: clock[0])
+    cache = SearchCache(str(tmp_path / 'search.sqlite3'), fresh_seconds=60, stale_seconds=120)
+    rows = [{'url': 'https://example.com', 'content': 'Pet food', 'score': 0.9}]
+    cache.set('Pet  Food trends', 5, rows)
+
+    assert cache.get('pet food TRENDS', 5) == (rows, False)
+    assert cache.get('pet food trends', 3) is None
+    clock[0] += 61
+    assert cache.get('pet food trends', 5) == (rows, True)
+    clock[0] += 120
+    assert cache.get('pet food trends', 5) is None
+
+
+def test_rows_from_the_old_formatted_schema_are_discarded(tmp_path):
+    path = str(tmp_path / 'search.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE search_results (query TEXT NOT NULL, max_results INTEGER NOT NULL,'
+                 ' value TEXT NOT NULL, fetched_at REAL NOT NULL, PRIMARY KEY (query, max_results))')
+    conn.execute('INSERT INTO search_results VALUES (?, ?, ?, ?)',
+                 ('pet food', 5, json.dumps({'text': 'formatted', 'sources': []}), time.time()))
+    conn.commit()
+    conn.close()
+
+    cache = SearchCache(path)
+    assert cache.get('pet food', 5) is None
+    tables = {row[0] for row in cache._connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {search_cache.TABLE}
@@ -0,0 +1,16 @@
+from benchmarks.startup_benchmark import LAZY_MODULES, child_environment, eager_imports, run_once
+
+
+def test_import_app_loads_no_heavy_modules(tmp_path, monkeypatch):
+    # A fresh interpreter, as a uvicorn worker starts, with the app's default settings
+    monkeypatch.delenv('WORKFLOW_PREWARM', raising=False)
+    result = run_once(child_environment(str(tmp_path)))
+
+    assert result['status'] == 200
+    assert eager_imports(result['modules']) == []
+
+
+def test_eager_imports_matches_packages_and_submodules():
+    assert 'langchain_core' in LAZY_MODULES
+    assert eager_imports(['flask', 'langchain_core.messages', 'langchain_corex', 'services.ai_workflow']) == [
+        'langchain_core.messages', 'services.ai_workflow']
@@ -0,0 +1,107 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from services import write_behind
+from services.write_behind import WriteBehindBuffer
+
+
+class FakeCreateMany:
+    """Stands in for BusinessIdea.create_many; fails the first `failures` calls"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                return []
+            self.batches.append([row['niche'] for row in rows])
+            return list(rows)
+
+
+@pytest.fixture
+def make_buffer(monkeypatch):
+    buffers = []
+
+    def make(failures=0, **kwargs):
+        create_many = FakeCreateMany(failures)
+        monkeypatch.setattr(write_behind.BusinessIdea, 'create_many', create_many)
+        options = {'flush_size': 2, 'flush_interval': 60, 'max_retries': 2, 'base_backoff': 0}
+        options.update(kwargs)
+        buffer = WriteBehindBuffer(**options)
+        buffers.append(buffer)
+        return buffer, create_many
+
+    yield make
+    for buffer in buffers:
+        buffer.close()
+
+
+def submit(buffer, *niches):
+    for niche in niches:
+        assert buffer.submit(1, niche, [{'name': niche}])
+
+
+def test_flush_writes_batches_in_submission_order(make_buffer):
+    buffer, create_many = make_buffer(flush_size=100)
+    submit(buffer, 'a', 'b', 'c', 'd', 'e')
+    buffer.flush_size = 2
+
+    assert buffer.flush() == 5
+    assert create_many.batches == [['a', 'b'], ['c', 'd'], ['e']]
+    assert buffer.depth() == 0
+
+
+def test_failed_batch_is_retried(make_buffer):
+    buffer, create_many = make_buffer(failures=2, flush_size=100)
+    submit(buffer, 'a')
+
+    assert buffer.flush() == 1
+    assert create_many.batches == [['a']]
+    assert buffer.written == 1
+    assert buffer.dropped == 0
+
+
+def test_batch_is_dropped_after_max_retries(make_buffer):
+    buffer, create_many = make_buffer(failures=3, flush_size=100, max_retries=2)
+    submit(buffer, 'a')
+
+    assert buffer.flush() == 0
+    assert create_many.batches == []
+    assert buffer.dropped == 1
+
+
+def test_full_buffer_rejects_rows(make_buffer):
+    buffer, _ = make_buffer(flush_size=100, max_buffer=1)
+    assert buffer.submit(1, 'a', [])
+    assert not buffer.submit(1, 'b', [])
+
+
+def test_close_drains_and_rejects_new_rows(make_buffer):
+    buffer, create_many = make_buffer(flush_size=100)
+    submit(buffer, 'a')
+    buffer.close()
+
+    assert create_many.batches == [['a']]
+    assert not buffer.submit(1, 'b', [])
+
+
+def test_rows_left_after_a_batch_keep_their_enqueue_time(make_buffer, monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(write_behind, 'time', SimpleNamespace(monotonic=lambda: clock.now, sleep=time.sleep))
+    buffer, create_many = make_buffer(flush_size=100)
+    for niche in 'abc':
+        submit(buffer, niche)
+        clock.now += 10
+    buffer.flush_size = 2
+
+    # Seen from inside each write: the interval for what is left counts from 'c', not from the take
+    remaining = []
+    monkeypatch.setattr(write_behind.BusinessIdea, 'create_many',
+                        lambda rows: remaining.append(list(buffer._enqueued_at)) or create_many(rows))
+    assert buffer.flush() == 3
+    assert remaining == [[20.0], []]